@@ -2,7 +2,7 @@
 
 import os
 import tempfile
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 
 import requests
@@ -167,7 +167,8 @@ def process(
     merge_sentences: bool = True,
     merge_short_sentences: bool = True,
     batch_size_s: int = 300,
-    hotword: str = "Obsidian"
+    hotword: str = "Obsidian",
+    model: Optional[Any] = None,
 ) -> List[Dict]:
     """处理音频并返回标准化列表
 
@@ -177,6 +178,7 @@ def process(
         merge_short_sentences: 是否合并少于4个字的句子到下一句
         batch_size_s: 批处理大小（秒）
         hotword: 热词
+        model: 推理模型，默认使用全局 ASR 模型；分块并行识别时传入 ChunkedASRPipeline
 
     Returns:
         list[dict(index, spk_id, sentence, start_time, end_time)]
@@ -197,7 +199,8 @@ def process(
             raise FileNotFoundError(f"音频文件不存在: {actual_path}")
 
         # 获取模型（缓存）
-        model = get_model()
+        if model is None:
+            model = get_model()
 
         # 执行推理
         print(f"开始 ASR 推理: {actual_path}")
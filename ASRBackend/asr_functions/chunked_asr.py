@@ -0,0 +1,359 @@
+"""VAD 分块并行识别模块
+
+本地模式下 FunASR 对整个文件做一次 generate，只能用到一个进程。
+本模块先用 fsmn-vad 检测语音区间，在静音处把音频切成不超过 chunk_max_s 秒的块，
+分发到进程池中的模型进程并行识别，再把各块的时间戳加上块偏移拼接回来。
+
+长音频不会整体解码到内存：VAD 按 VAD_WINDOW_MS 的窗口逐段解码检测，
+模型进程只接收文件路径和块的起止时间，用 ffmpeg -ss/-t 自行解码所负责的块，
+内存占用只与窗口和块的长度有关，与音频总时长无关。
+
+说话人聚类必须在全局进行（各块各自聚类得到的编号互不对应），
+因此模型进程中不加载说话人模型，只为每句计算 cam++ 声纹向量，
+由主进程对全部句子的向量统一聚类后分配说话人编号。
+
+ChunkedASRPipeline.generate 与 FunASR AutoModel.generate 的返回格式相同，
+可以直接替换 asr_sentence_segments.process 中使用的模型。
+"""
+
+import os
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from funasr import AutoModel
+except ImportError:
+    AutoModel = None
+
+try:
+    from funasr.models.campplus.cluster_backend import ClusterBackend
+except ImportError:
+    ClusterBackend = None
+
+SAMPLE_RATE = 16000
+# 计算声纹向量的最短音频（毫秒），过短的句子向两侧扩展
+MIN_EMBEDDING_MS = 1000
+# VAD 每次解码的窗口长度（毫秒），10 分钟的 float32 波形约 38MB
+VAD_WINDOW_MS = 600 * 1000
+# 语音区间首尾距窗口边界不超过该值时视为被窗口切断，与上一窗口的区间拼接
+VAD_WINDOW_JOIN_MS = 200
+
+# 模型进程内的全局模型（每个进程各自加载一份）
+_worker_asr_model = None
+_worker_spk_model = None
+
+
+def probe_duration_ms(audio_path: str) -> int:
+    """用 ffprobe 读取音频时长
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        时长（毫秒）
+
+    Raises:
+        RuntimeError: ffprobe 读取失败
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", audio_path,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True, text=True).stdout
+        return int(float(out.strip()) * 1000)
+    except (subprocess.CalledProcessError, ValueError) as e:
+        raise RuntimeError(f"读取音频时长失败: {audio_path}") from e
+
+
+def load_audio(
+    audio_path: str, offset_ms: int = 0, duration_ms: Optional[int] = None
+) -> np.ndarray:
+    """用 ffmpeg 将音频（的一段）解码为 16kHz 单声道 float32 波形
+
+    Args:
+        audio_path: 音频文件路径
+        offset_ms: 开始位置（毫秒）
+        duration_ms: 解码时长（毫秒），None 表示解码到文件末尾
+
+    Returns:
+        取值范围 [-1, 1] 的一维波形
+
+    Raises:
+        RuntimeError: ffmpeg 解码失败
+    """
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if offset_ms:
+        cmd += ["-ss", f"{offset_ms / 1000:.3f}"]
+    if duration_ms is not None:
+        cmd += ["-t", f"{duration_ms / 1000:.3f}"]
+    cmd += [
+        "-i", audio_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"音频解码失败: {e.stderr.decode(errors='ignore')[-500:]}") from e
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def plan_chunks(
+    speech_regions: List[List[int]], chunk_max_ms: int
+) -> List[Tuple[int, int]]:
+    """把相邻的语音区间合并成不超过 chunk_max_ms 的块，只在静音处切分
+
+    Args:
+        speech_regions: VAD 输出的语音区间 [[开始毫秒, 结束毫秒], ...]
+        chunk_max_ms: 每块最长毫秒数（单个区间超过时独占一块）
+
+    Returns:
+        [(块开始毫秒, 块结束毫秒), ...]
+    """
+    chunks: List[Tuple[int, int]] = []
+    for beg, end in sorted(speech_regions):
+        if chunks and end - chunks[-1][0] <= chunk_max_ms:
+            chunks[-1] = (chunks[-1][0], max(chunks[-1][1], end))
+        else:
+            chunks.append((beg, end))
+    return chunks
+
+
+def stitch_chunk_results(
+    chunks: List[Tuple[int, int]], chunk_results: Iterable[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """按块的顺序拼接各块的识别结果，时间戳加上块的起始偏移
+
+    Args:
+        chunks: plan_chunks 输出的块
+        chunk_results: 与 chunks 一一对应的句子列表（时间相对块开始）
+
+    Returns:
+        时间相对音频开始的句子列表
+    """
+    sentences: List[Dict[str, Any]] = []
+    for (chunk_beg, _), result in zip(chunks, chunk_results):
+        for s in result:
+            s["start"] += chunk_beg
+            s["end"] += chunk_beg
+            sentences.append(s)
+    return sentences
+
+
+def renumber_speakers(labels: Iterable[int]) -> List[int]:
+    """把聚类标签按首次出现的顺序重新编号，与 FunASR 的说话人编号习惯一致"""
+    mapping: Dict[int, int] = {}
+    return [mapping.setdefault(int(label), len(mapping)) for label in labels]
+
+
+def _init_worker(model_kwargs: Dict[str, Any], spk_model: str, num_threads: int) -> None:
+    """模型进程初始化：限制 torch 线程数并加载模型"""
+    global _worker_asr_model, _worker_spk_model
+    import torch
+
+    # 多个进程共享 CPU，每个进程只使用分到的核数，避免线程争抢
+    torch.set_num_threads(num_threads)
+    _worker_asr_model = AutoModel(**model_kwargs)
+    _worker_spk_model = AutoModel(model=spk_model)
+
+
+def _transcribe_chunk(
+    audio_path: str, beg_ms: int, end_ms: int, batch_size_s: int, hotword: str
+) -> List[Dict[str, Any]]:
+    """在模型进程中解码并识别一块音频
+
+    Returns:
+        句子列表，时间相对块开始：[{"text", "start", "end", "embedding"}, ...]
+    """
+    waveform = load_audio(audio_path, beg_ms, end_ms - beg_ms)
+    if waveform.size == 0:
+        return []
+
+    res = _worker_asr_model.generate(
+        input=waveform,
+        batch_size_s=batch_size_s,
+        hotword=hotword,
+        sentence_timestamp=True,
+    )
+    if not res:
+        return []
+
+    sentences = []
+    for s in res[0].get("sentence_info") or []:
+        text = (s.get("text") or "").strip()
+        if not text:
+            continue
+        sentences.append({"text": text, "start": int(s["start"]), "end": int(s["end"])})
+
+    if not sentences:
+        return []
+
+    # 为每句计算声纹向量，过短的句子以句子中点向两侧扩展到 MIN_EMBEDDING_MS
+    duration_ms = len(waveform) * 1000 // SAMPLE_RATE
+    slices = []
+    for s in sentences:
+        beg, end = s["start"], s["end"]
+        if end - beg < MIN_EMBEDDING_MS:
+            mid = (beg + end) // 2
+            beg = max(0, mid - MIN_EMBEDDING_MS // 2)
+            end = min(duration_ms, beg + MIN_EMBEDDING_MS)
+        slices.append(waveform[beg * SAMPLE_RATE // 1000:end * SAMPLE_RATE // 1000])
+
+    spk_res = _worker_spk_model.generate(input=slices)
+    for s, item in zip(sentences, spk_res):
+        s["embedding"] = np.asarray(item["spk_embedding"]).reshape(-1).tolist()
+    return sentences
+
+
+class ChunkedASRPipeline:
+    """VAD 分块并行识别流水线
+
+    主进程加载 VAD 模型负责切块和说话人聚类；进程池中的每个进程各自加载
+    识别模型和声纹模型。进程池在首次识别时创建并一直复用，多个识别请求
+    可以共享同一个进程池。
+    """
+
+    def __init__(
+        self,
+        model_kwargs: Dict[str, Any],
+        spk_model: str = "cam++",
+        num_workers: int = 0,
+        chunk_max_s: int = 60,
+    ):
+        """初始化流水线
+
+        Args:
+            model_kwargs: 模型进程中 AutoModel 的参数（识别、VAD、标点模型，不含说话人模型）
+            spk_model: 计算声纹向量的模型
+            num_workers: 模型进程数，0 表示使用 CPU 核数
+            chunk_max_s: 每块最长秒数
+        """
+        if AutoModel is None:
+            raise ImportError("funasr 未安装。请安装本地版本依赖")
+
+        self.model_kwargs = model_kwargs
+        self.spk_model = spk_model
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunk_max_ms = chunk_max_s * 1000
+
+        self._vad_model = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_vad_model(self):
+        """获取主进程中的 VAD 模型"""
+        with self._lock:
+            if self._vad_model is None:
+                self._vad_model = AutoModel(
+                    model=self.model_kwargs["vad_model"],
+                    model_revision=self.model_kwargs.get("vad_model_revision"),
+                )
+            return self._vad_model
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """获取模型进程池（spawn 方式启动，避免 fork 后 torch 线程状态异常）"""
+        with self._lock:
+            if self._pool is None:
+                print(f"启动 {self.num_workers} 个 ASR 模型进程...")
+                num_threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_kwargs, self.spk_model, num_threads),
+                )
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        """模型进程异常退出后丢弃进程池，下次识别时重建"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _detect_speech(self, audio_path: str, duration_ms: int) -> List[List[int]]:
+        """按 VAD_WINDOW_MS 的窗口逐段解码并检测语音区间（毫秒）
+
+        被窗口边界切断的语音区间与上一窗口的区间拼接，避免在说话中途切块。
+        """
+        vad_model = self._get_vad_model()
+        regions: List[List[int]] = []
+        for window_beg in range(0, duration_ms, VAD_WINDOW_MS):
+            waveform = load_audio(audio_path, window_beg, VAD_WINDOW_MS)
+            if waveform.size == 0:
+                break
+            res = vad_model.generate(input=waveform, fs=SAMPLE_RATE)
+            for beg, end in (res[0].get("value", []) if res else []):
+                beg, end = beg + window_beg, end + window_beg
+                if (
+                    regions
+                    and beg - window_beg <= VAD_WINDOW_JOIN_MS
+                    and window_beg - regions[-1][1] <= VAD_WINDOW_JOIN_MS
+                ):
+                    regions[-1][1] = end
+                else:
+                    regions.append([beg, end])
+        return regions
+
+    def _cluster_speakers(self, sentences: List[Dict[str, Any]]) -> None:
+        """对全部句子的声纹向量统一聚类，写入 spk 字段"""
+        embeddings = np.array([s.pop("embedding") for s in sentences], dtype=np.float32)
+        if ClusterBackend is None or len(sentences) < 2:
+            labels = np.zeros(len(sentences), dtype=int)
+        else:
+            labels = ClusterBackend()(embeddings)
+
+        for s, spk in zip(sentences, renumber_speakers(labels)):
+            s["spk"] = spk
+
+    def generate(
+        self, input: str, batch_size_s: int = 300, hotword: str = "", **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        """分块并行识别音频文件
+
+        Args:
+            input: 音频文件路径
+            batch_size_s: 每个模型进程内的批处理大小（秒）
+            hotword: 热词
+
+        Returns:
+            与 AutoModel.generate 相同格式的结果：
+            [{"key", "text", "sentence_info": [{"text", "start", "end", "spk"}]}]
+        """
+        duration_ms = probe_duration_ms(input)
+        if duration_ms <= 0:
+            return []
+
+        chunks = plan_chunks(self._detect_speech(input, duration_ms), self.chunk_max_ms)
+        if not chunks:
+            return []
+        print(f"音频切分为 {len(chunks)} 块，使用 {self.num_workers} 个进程并行识别")
+
+        # 只向模型进程传递文件路径和块的起止时间，由模型进程自行解码
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_transcribe_chunk, input, beg, end, batch_size_s, hotword)
+            for beg, end in chunks
+        ]
+
+        try:
+            sentences = stitch_chunk_results(chunks, (f.result() for f in futures))
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise
+
+        if not sentences:
+            return []
+
+        self._cluster_speakers(sentences)
+        return [{
+            "key": os.path.splitext(os.path.basename(input))[0],
+            "text": "".join(s["text"] for s in sentences),
+            "sentence_info": sentences,
+        }]
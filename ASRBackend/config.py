@@ -46,6 +46,12 @@ class ASRBackendSettings(BaseSettings):
     local_punc_model: str = "ct-punc-c"
     local_punc_model_revision: str = "v2.0.4"
     local_spk_model: str = "cam++"
+    # 分块并行识别：用 VAD 在静音处切块，分发到多个模型进程并行识别（适合多核 CPU 处理长音频）
+    local_chunked_asr: bool = False
+    # 模型进程数，0 表示使用 CPU 核数；每个进程各自加载一份模型，注意内存占用
+    local_asr_workers: int = 0
+    # 每块最长秒数
+    local_chunk_max_seconds: int = 60
 
     # ========== 云端模式配置 ==========
     # 仅在 asr_mode == "cloud" 时使用
@@ -62,6 +68,19 @@ class ASRBackendSettings(BaseSettings):
     supabase_admin_email: str = ""
     supabase_admin_password: str = ""
 
+    # ========== 音频输入配置 ==========
+    # 与后端共享的存储目录（逗号分隔），位于其中的文件可以直接按路径识别，无需上传；
+    # 为空时禁用按路径识别
+    shared_media_roots_str: str = ""
+    # 上传文件落盘时每次读取的字节数
+    upload_spool_chunk_size: int = 1024 * 1024
+
+    # ========== 异步任务配置 ==========
+    # 同时执行的识别任务数（本地模式受 CPU/显存限制，云端模式可适当调大）
+    asr_max_concurrent_jobs: int = 2
+    # 已结束任务的结果保留秒数，超时后查询返回 404
+    asr_job_ttl: int = 3600
+
     # 文件名映射记录文件路径
     filename_mapping_file: str = os.path.join(
         os.path.dirname(__file__), "cache", "filename_mapping.json"
@@ -83,6 +102,15 @@ class ASRBackendSettings(BaseSettings):
             if origin.strip()
         ]
 
+    @property
+    def shared_media_roots(self) -> List[str]:
+        """允许按路径识别的共享目录列表（已规范化为绝对路径）"""
+        return [
+            os.path.realpath(root.strip())
+            for root in self.shared_media_roots_str.split(",")
+            if root.strip()
+        ]
+
     @property
     def cors_allow_methods(self) -> List[str]:
         """CORS 允许的方法"""
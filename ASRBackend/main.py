@@ -28,11 +28,12 @@ app.include_router(asr_router)
 
 @app.get("/health")
 async def health_check():
-    """健康检查接口，返回服务状态和运行模式"""
+    """健康检查接口，返回服务状态、运行模式和是否支持异步任务接口"""
     return {
         "status": "healthy",
         "service": "ASR Backend",
         "mode": settings.asr_mode,
+        "async_jobs": True,
     }
 
 
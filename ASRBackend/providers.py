@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 from config import settings
@@ -70,7 +71,25 @@ class LocalASRProvider(ASRProvider):
             from asr_functions.segment_normalizer import extract_text
             from asr_functions.utils import detect_language
 
-            self._process = process
+            if settings.local_chunked_asr:
+                from asr_functions.chunked_asr import ChunkedASRPipeline
+
+                pipeline = ChunkedASRPipeline(
+                    model_kwargs={
+                        "model": settings.local_model_name,
+                        "model_revision": settings.local_model_revision,
+                        "vad_model": settings.local_vad_model,
+                        "vad_model_revision": settings.local_vad_model_revision,
+                        "punc_model": settings.local_punc_model,
+                        "punc_model_revision": settings.local_punc_model_revision,
+                    },
+                    spk_model=settings.local_spk_model,
+                    num_workers=settings.local_asr_workers,
+                    chunk_max_s=settings.local_chunk_max_seconds,
+                )
+                self._process = functools.partial(process, model=pipeline)
+            else:
+                self._process = process
             self._extract_text = extract_text
             self._detect_language = detect_language
             self._initialized = True
@@ -2,21 +2,32 @@
 
 提供语音识别相关的 API 接口，支持本地和云端两种模式。
 
-支持的三种输入方式：
+支持的四种输入方式：
 - /transcribe/bytes: 本地字节流识别（本地模式）
 - /transcribe/url: URL 直接识别（云端模式）
 - /transcribe/upload: 文件上传到 Supabase 后识别（云端模式）
+- /transcribe/path: 共享存储路径识别（两种模式，无需传输文件内容）
+
+以上接口在识别完成后才返回。长音频可使用异步任务接口：
+- POST /jobs: 提交识别任务（file / path / url 三选一），立即返回任务 ID
+- GET /jobs/{job_id}: 查询任务状态，完成后返回识别结果
+
+上传的文件分块写入临时文件后直接交给识别流程，不会整体读入内存。
 """
 
 from __future__ import annotations
 
+import os
 from typing import Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
 
 from config import settings
-from services.asr_service import ASRService
+from services.asr_job_service import ASRJobService, asr_job_store
+from services.asr_service import (SUPPORTED_AUDIO_EXTENSIONS, ASRService,
+                                  resolve_shared_media_path,
+                                  spool_upload_to_temp)
 
 router = APIRouter(prefix="/asr", tags=["ASR"])
 
@@ -35,15 +46,48 @@ async def transcribe_from_bytes(file: UploadFile = File(...)) -> JSONResponse:
         识别结果的 JSON 响应
     """
     # 文件格式校验
-    if not file.filename.lower().endswith((".wav", ".mp3", ".m4a", ".flac", ".ogg")):
+    if not file.filename.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS):
         raise HTTPException(
             status_code=400,
             detail="不支持的文件格式。支持的格式：wav, mp3, m4a, flac, ogg",
         )
 
+    temp_file_path = None
+    try:
+        temp_file_path = await spool_upload_to_temp(file)
+        result = await ASRService.transcribe_from_file(temp_file_path, file.filename)
+        return JSONResponse(content=result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"语音识别失败: {str(e)}")
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+
+@router.post("/transcribe/path")
+async def transcribe_from_path(path: str = Form(...)) -> JSONResponse:
+    """从共享存储中的音频文件进行语音识别
+
+    后端与 ASR 服务挂载同一存储卷时，只传文件路径，不传输文件内容。
+    路径必须位于配置项 shared_media_roots_str 指定的目录中。
+
+    Args:
+        path: 音频文件在 ASR 服务中的路径
+
+    Returns:
+        识别结果的 JSON 响应
+    """
+    try:
+        file_path = resolve_shared_media_path(path)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        audio_data = await file.read()
-        result = await ASRService.transcribe_from_bytes(audio_data, file.filename)
+        result = await ASRService.transcribe_from_path(file_path)
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"语音识别失败: {str(e)}")
@@ -97,17 +141,97 @@ async def transcribe_from_file_with_upload(file: UploadFile = File(...)) -> JSON
         识别结果的 JSON 响应，包含上传的 URL 信息
     """
     # 文件格式校验
-    if not file.filename.lower().endswith((".wav", ".mp3", ".m4a", ".flac", ".ogg")):
+    if not file.filename.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS):
         raise HTTPException(
             status_code=400,
             detail="不支持的文件格式。支持的格式：wav, mp3, m4a, flac, ogg",
         )
 
+    temp_file_path = None
     try:
-        audio_data = await file.read()
-        result = await ASRService.transcribe_from_file_with_upload(audio_data, file.filename)
+        temp_file_path = await spool_upload_to_temp(file)
+        result = await ASRService.transcribe_file_path_with_upload(
+            temp_file_path, file.filename
+        )
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"语音识别失败: {str(e)}")
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
 
 
+
+
+@router.post("/jobs", status_code=202)
+async def submit_asr_job(
+    file: Optional[UploadFile] = File(None),
+    path: Optional[str] = Form(None),
+    url: Optional[str] = Form(None),
+) -> JSONResponse:
+    """提交异步识别任务
+
+    立即返回任务 ID，识别在后台执行，通过 GET /asr/jobs/{job_id} 查询结果。
+    调用方不需要在识别期间保持连接，适合长音频。
+
+    Args:
+        file: 音频文件（上传方式）
+        path: 音频文件在 ASR 服务中的路径（共享存储方式）
+        url: 音频文件 URL（云端模式）
+
+    Returns:
+        包含 job_id 和 status 的 JSON 响应（202）
+    """
+    provided = [value for value in (file, path, url) if value]
+    if len(provided) != 1:
+        raise HTTPException(status_code=400, detail="file、path、url 必须且只能提供一个")
+
+    if path:
+        try:
+            file_path = resolve_shared_media_path(path)
+        except PermissionError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        job = ASRJobService.submit("path", file_path, os.path.basename(file_path))
+    elif url:
+        if not url.startswith(('http://', 'https://')):
+            raise HTTPException(status_code=400, detail="URL 必须以 http:// 或 https:// 开头")
+        job = ASRJobService.submit("url", url, url.rsplit("/", 1)[-1])
+    else:
+        if not file.filename or not file.filename.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS):
+            raise HTTPException(
+                status_code=400,
+                detail="不支持的文件格式。支持的格式：wav, mp3, m4a, flac, ogg",
+            )
+        try:
+            temp_file_path = await spool_upload_to_temp(file)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"保存上传文件失败: {str(e)}")
+        # 临时文件由任务结束时删除
+        job = ASRJobService.submit(
+            "file", temp_file_path, file.filename, temp_file_path=temp_file_path
+        )
+
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["job_id"], "status": job["status"]},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_asr_job(job_id: str) -> JSONResponse:
+    """查询异步识别任务
+
+    Args:
+        job_id: 提交任务时返回的任务 ID
+
+    Returns:
+        任务信息的 JSON 响应，status 为 success 时 result 字段包含识别结果
+    """
+    job = asr_job_store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"任务不存在或已过期: {job_id}")
+    return JSONResponse(content=job)
@@ -0,0 +1,195 @@
+"""ASR 异步任务服务模块
+
+提供提交/轮询式的识别任务：提交后立即返回任务 ID，识别在后台执行，
+调用方通过任务 ID 查询状态和结果，不再需要保持长时间的 HTTP 连接。
+
+任务保存在进程内存中（服务以单进程运行），服务重启后未完成的任务会丢失，
+调用方查询到 404 时应重新提交。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from config import settings
+from services.asr_service import ASRService
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCESS = "success"
+JOB_ERROR = "error"
+FINISHED_STATUSES = (JOB_SUCCESS, JOB_ERROR)
+
+
+class ASRJobStore:
+    """识别任务存储
+
+    保存任务状态和结果，已结束的任务超过 ttl 秒后自动清理。
+    """
+
+    def __init__(self, ttl: int):
+        """初始化任务存储
+
+        Args:
+            ttl: 已结束任务的保留秒数
+        """
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, source: str, filename: str) -> Dict[str, Any]:
+        """创建任务
+
+        Args:
+            source: 音频来源类型（file / path / url）
+            filename: 文件名
+
+        Returns:
+            任务信息字典
+        """
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": JOB_PENDING,
+            "source": source,
+            "filename": filename,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._purge_expired(now)
+            self._jobs[job["job_id"]] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务信息，不存在或已过期时返回 None"""
+        with self._lock:
+            self._purge_expired(time.time())
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """更新任务字段"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+                job["updated_at"] = time.time()
+
+    def count_unfinished(self) -> int:
+        """未结束的任务数"""
+        with self._lock:
+            return sum(
+                1 for job in self._jobs.values() if job["status"] not in FINISHED_STATUSES
+            )
+
+    def _purge_expired(self, now: float) -> None:
+        """清理已结束且超过保留时间的任务（调用方持有锁）"""
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["status"] in FINISHED_STATUSES and now - job["updated_at"] > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# 全局任务存储
+asr_job_store = ASRJobStore(ttl=settings.asr_job_ttl)
+
+# 限制同时执行的识别任务数，其余任务保持 pending 排队
+_job_semaphore = asyncio.Semaphore(settings.asr_max_concurrent_jobs)
+# 持有后台任务的引用，避免被垃圾回收
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class ASRJobService:
+    """ASR 异步任务服务类"""
+
+    @classmethod
+    def submit(
+        cls,
+        source: str,
+        value: str,
+        filename: str,
+        temp_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """提交识别任务并在后台执行
+
+        Args:
+            source: 音频来源类型
+                - "file": 已落盘的上传文件，value 为临时文件路径，任务结束后删除
+                - "path": 共享存储中的文件路径（已校验）
+                - "url": 音频 URL
+            value: 文件路径或 URL
+            filename: 文件名
+            temp_file_path: 任务结束后需要删除的临时文件
+
+        Returns:
+            任务信息字典
+        """
+        job = asr_job_store.create(source, filename)
+        task = asyncio.create_task(
+            cls._run_job(job["job_id"], source, value, filename, temp_file_path)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        logger.info(f"ASR任务已提交 - 任务: {job['job_id']}, 来源: {source}, 文件: {filename}")
+        return job
+
+    @classmethod
+    async def _run_job(
+        cls,
+        job_id: str,
+        source: str,
+        value: str,
+        filename: str,
+        temp_file_path: Optional[str],
+    ) -> None:
+        """执行识别任务，结果写入任务存储"""
+        try:
+            async with _job_semaphore:
+                asr_job_store.update(job_id, status=JOB_RUNNING, started_at=time.time())
+
+                if source == "path":
+                    result = await ASRService.transcribe_from_path(value)
+                elif source == "url":
+                    result = await ASRService.transcribe_from_url(value)
+                elif settings.is_cloud_mode():
+                    result = await ASRService.transcribe_file_path_with_upload(value, filename)
+                else:
+                    result = await ASRService.transcribe_from_file(value, filename)
+
+            status = JOB_SUCCESS if result.get("status") == "success" else JOB_ERROR
+            asr_job_store.update(
+                job_id,
+                status=status,
+                result=result,
+                error=result.get("error"),
+                finished_at=time.time(),
+            )
+            logger.info(f"ASR任务结束 - 任务: {job_id}, 状态: {status}")
+        except Exception as e:
+            logger.exception(f"ASR任务异常 - 任务: {job_id}, 异常: {e}")
+            asr_job_store.update(
+                job_id,
+                status=JOB_ERROR,
+                error=f"ASR服务异常: {str(e)}",
+                finished_at=time.time(),
+            )
+        finally:
+            if temp_file_path and os.path.exists(temp_file_path):
+                try:
+                    os.remove(temp_file_path)
+                    logger.debug(f"临时文件已清理: {temp_file_path}")
+                except Exception as e:
+                    logger.warning(f"清理临时文件失败: {temp_file_path}, 错误: {e}")
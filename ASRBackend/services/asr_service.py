@@ -2,25 +2,87 @@
 
 提供语音识别业务逻辑服务，支持本地和云端两种模式。
 
-支持三种输入方式：
-- 本地字节流 (transcribe_from_bytes) - 本地模式
+支持四种输入方式：
+- 本地字节流 (transcribe_from_bytes / transcribe_from_file) - 本地模式
 - URL 直接识别 (transcribe_from_url) - 云端模式
-- 文件上传到 Supabase 后识别 (transcribe_from_file_with_upload) - 云端模式
+- 文件上传到 Supabase 后识别 (transcribe_from_file_with_upload / transcribe_file_path_with_upload) - 云端模式
+- 共享存储路径 (transcribe_from_path) - 两种模式均可，无需传输文件内容
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
+import shutil
 import tempfile
 import logging
 import subprocess
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from providers import ASRProviderFactory
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# 支持的音频文件扩展名
+SUPPORTED_AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg")
+
+
+async def spool_upload_to_temp(upload_file: Any, chunk_size: Optional[int] = None) -> str:
+    """将上传文件分块写入临时文件，不在内存中保留完整文件内容
+
+    Args:
+        upload_file: FastAPI 的 UploadFile
+        chunk_size: 每次复制的字节数，默认使用配置 upload_spool_chunk_size
+
+    Returns:
+        临时文件路径（由调用方负责删除）
+    """
+    chunk_size = chunk_size or settings.upload_spool_chunk_size
+    suffix = os.path.splitext(upload_file.filename or "")[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+        temp_file_path = temp_file.name
+        try:
+            # 在线程中复制，避免大文件的磁盘 IO 阻塞事件循环
+            await asyncio.to_thread(
+                shutil.copyfileobj, upload_file.file, temp_file, chunk_size
+            )
+        except Exception:
+            temp_file.close()
+            os.remove(temp_file_path)
+            raise
+    return temp_file_path
+
+
+def resolve_shared_media_path(path: str) -> str:
+    """校验并规范化共享存储中的音频路径
+
+    只允许访问 shared_media_roots 配置的目录，防止通过路径读取任意文件。
+
+    Args:
+        path: 后端传入的文件路径
+
+    Returns:
+        规范化后的绝对路径
+
+    Raises:
+        PermissionError: 未启用共享存储或路径不在允许的目录中
+        FileNotFoundError: 文件不存在
+        ValueError: 文件格式不支持
+    """
+    roots = settings.shared_media_roots
+    if not roots:
+        raise PermissionError("未配置共享存储目录，不支持按路径识别")
+
+    real_path = os.path.realpath(path)
+    if not any(os.path.commonpath([real_path, root]) == root for root in roots):
+        raise PermissionError(f"路径不在共享存储目录中: {path}")
+    if not os.path.isfile(real_path):
+        raise FileNotFoundError(f"音频文件不存在: {path}")
+    if not real_path.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS):
+        raise ValueError("不支持的文件格式。支持的格式：wav, mp3, m4a, flac, ogg")
+    return real_path
+
 
 def validate_audio_file(file_path: str) -> bool:
     """验证音频文件是否有效"""
@@ -63,7 +125,7 @@ def convert_audio_format(input_path: str, output_path: str, target_format: str =
     try:
         # 使用 ffmpeg 转换音频格式
         result = subprocess.run(
-            ['ffmpeg', '-i', input_path, '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1', output_path],
+            ['ffmpeg', '-y', '-i', input_path, '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1', output_path],
             capture_output=True,
             text=True,
             timeout=60
@@ -119,6 +181,58 @@ class ASRService:
                 "filename": filename,
             }
 
+    @classmethod
+    async def transcribe_from_file(cls, file_path: str, filename: str) -> Dict[str, Any]:
+        """从服务可直接读取的音频文件进行语音识别（本地模式）
+
+        用于已落盘的上传文件或共享存储中的文件，FunASR 直接读取该文件，
+        不再经过内存中的字节数据和额外的临时文件。
+
+        Args:
+            file_path: 音频文件路径
+            filename: 原始文件名
+
+        Returns:
+            识别结果字典
+        """
+        try:
+            provider = ASRProviderFactory.get_provider()
+            result = await provider.transcribe_file(file_path)
+            result["filename"] = filename
+
+            logger.debug(f"ASR转录结果 - 本地文件: {filename}, 状态: {result.get('status')}")
+
+            if result.get("status") == "error":
+                logger.warning(
+                    f"ASR转录失败 - 本地文件: {filename}, 错误: {result.get('error')}"
+                )
+
+            return result
+        except Exception as e:
+            logger.exception(f"ASR服务异常 - 本地文件: {filename}, 异常: {e}")
+            return {
+                "status": "error",
+                "error": f"ASR服务异常: {str(e)}",
+                "filename": filename,
+            }
+
+    @classmethod
+    async def transcribe_from_path(cls, file_path: str) -> Dict[str, Any]:
+        """从共享存储路径进行语音识别
+
+        本地模式直接交给 FunASR 读取；云端模式从该文件上传到 Supabase 后识别。
+
+        Args:
+            file_path: 已通过 resolve_shared_media_path 校验的文件路径
+
+        Returns:
+            识别结果字典
+        """
+        filename = os.path.basename(file_path)
+        if settings.is_cloud_mode():
+            return await cls.transcribe_file_path_with_upload(file_path, filename)
+        return await cls.transcribe_from_file(file_path, filename)
+
     @classmethod
     async def transcribe_from_url(cls, url: str) -> Dict[str, Any]:
         """从音频 URL 进行语音识别（云端模式）
@@ -175,16 +289,42 @@ class ASRService:
             识别结果字典，包含上传的 URL 信息
         """
         temp_file_path = None
-        converted_file_path = None
-        uploaded_uuid = None
         try:
-            # 1. 保存临时文件
+            # 保存临时文件
             with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1], delete=False) as temp_file:
                 temp_file.write(audio_data)
                 temp_file_path = temp_file.name
 
-            # 验证临时文件
-            if os.path.getsize(temp_file_path) == 0:
+            return await cls.transcribe_file_path_with_upload(temp_file_path, filename)
+        finally:
+            if temp_file_path and os.path.exists(temp_file_path):
+                try:
+                    os.remove(temp_file_path)
+                    logger.debug(f"临时文件已清理: {temp_file_path}")
+                except Exception as e:
+                    logger.warning(f"清理临时文件失败: {temp_file_path}, 错误: {e}")
+
+    @classmethod
+    async def transcribe_file_path_with_upload(
+        cls, file_path: str, filename: str
+    ) -> Dict[str, Any]:
+        """将音频文件上传到 Supabase 后进行语音识别（云端模式）
+
+        直接从磁盘文件上传，不把文件内容读入内存。
+        文件本身由调用方管理，这里只清理格式转换产生的文件和 Supabase 上的文件。
+
+        Args:
+            file_path: 音频文件路径
+            filename: 原始文件名
+
+        Returns:
+            识别结果字典，包含上传的 URL 信息
+        """
+        converted_file_path = None
+        uploaded_uuid = None
+        try:
+            # 1. 验证文件
+            if os.path.getsize(file_path) == 0:
                 logger.error(f"上传的文件为空: {filename}")
                 return {
                     "status": "error",
@@ -192,15 +332,18 @@ class ASRService:
                     "filename": filename,
                 }
 
-            logger.info(f"临时文件大小: {os.path.getsize(temp_file_path)} bytes")
+            logger.info(f"待上传文件大小: {os.path.getsize(file_path)} bytes")
 
             # 2. 验证音频文件格式
-            file_to_upload = temp_file_path
-            if not validate_audio_file(temp_file_path):
+            file_to_upload = file_path
+            if not validate_audio_file(file_path):
                 logger.warning(f"音频文件验证失败，尝试转换格式: {filename}")
                 # 尝试转换格式
-                converted_file_path = temp_file_path + '_converted.wav'
-                if convert_audio_format(temp_file_path, converted_file_path):
+                # 转换结果写入临时目录（共享存储可能是只读挂载），
+                # 使用唯一文件名，同一文件的并发任务不会互相覆盖和删除
+                with tempfile.NamedTemporaryFile(suffix='_converted.wav', delete=False) as temp_file:
+                    converted_file_path = temp_file.name
+                if convert_audio_format(file_path, converted_file_path):
                     file_to_upload = converted_file_path
                     filename = os.path.splitext(filename)[0] + '.wav'
                 else:
@@ -241,14 +384,13 @@ class ASRService:
                 "filename": filename,
             }
         finally:
-            # 7. 清理临时文件
-            for temp_path in [temp_file_path, converted_file_path]:
-                if temp_path and os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                        logger.debug(f"临时文件已清理: {temp_path}")
-                    except Exception as e:
-                        logger.warning(f"清理临时文件失败: {temp_path}, 错误: {e}")
+            # 7. 清理格式转换产生的临时文件
+            if converted_file_path and os.path.exists(converted_file_path):
+                try:
+                    os.remove(converted_file_path)
+                    logger.debug(f"临时文件已清理: {converted_file_path}")
+                except Exception as e:
+                    logger.warning(f"清理临时文件失败: {converted_file_path}, 错误: {e}")
 
             # 8. 删除 Supabase 上的文件
             if uploaded_uuid:
@@ -0,0 +1,119 @@
+"""测试 VAD 分块并行识别的切块、时间偏移拼接和说话人编号"""
+
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+
+from ASRBackend.asr_functions import chunked_asr
+from ASRBackend.asr_functions.chunked_asr import (
+    ChunkedASRPipeline,
+    plan_chunks,
+    renumber_speakers,
+    stitch_chunk_results,
+)
+
+
+def test_plan_chunks_merges_regions_up_to_limit():
+    """相邻区间合并到不超过上限，只在区间之间切分"""
+    regions = [[55000, 70000], [0, 20000], [25000, 50000], [71000, 200000], [201000, 203000]]
+
+    assert plan_chunks(regions, 60000) == [
+        (0, 50000),
+        (55000, 70000),
+        (71000, 200000),
+        (201000, 203000),
+    ]
+
+
+def test_plan_chunks_empty():
+    assert plan_chunks([], 60000) == []
+
+
+def test_stitch_chunk_results_adds_chunk_offset():
+    chunks = [(0, 30000), (45000, 90000)]
+    chunk_results = [
+        [{"text": "第一句", "start": 100, "end": 2000}],
+        [
+            {"text": "第二句", "start": 0, "end": 1500},
+            {"text": "第三句", "start": 1500, "end": 4000},
+        ],
+    ]
+
+    sentences = stitch_chunk_results(chunks, chunk_results)
+
+    assert [(s["text"], s["start"], s["end"]) for s in sentences] == [
+        ("第一句", 100, 2000),
+        ("第二句", 45000, 46500),
+        ("第三句", 46500, 49000),
+    ]
+
+
+def test_renumber_speakers_by_first_appearance():
+    assert renumber_speakers([3, 3, 1, 3, 0, 1]) == [0, 0, 1, 0, 2, 1]
+
+
+def test_cluster_speakers_across_chunks(monkeypatch):
+    """不同块中的句子统一聚类，编号按首次出现顺序分配"""
+
+    class FakeClusterBackend:
+        def __call__(self, embeddings):
+            # 以向量第一维区分说话人
+            return [int(e[0]) for e in embeddings]
+
+    monkeypatch.setattr(chunked_asr, "ClusterBackend", FakeClusterBackend)
+
+    sentences = stitch_chunk_results(
+        [(0, 10000), (20000, 30000)],
+        [
+            [
+                {"text": "a", "start": 0, "end": 1000, "embedding": [5.0, 0.0]},
+                {"text": "b", "start": 1000, "end": 2000, "embedding": [2.0, 0.0]},
+            ],
+            [{"text": "c", "start": 0, "end": 1000, "embedding": [5.0, 0.0]}],
+        ],
+    )
+    pipeline = ChunkedASRPipeline.__new__(ChunkedASRPipeline)
+    pipeline._cluster_speakers(sentences)
+
+    assert [s["spk"] for s in sentences] == [0, 1, 0]
+    assert all("embedding" not in s for s in sentences)
+
+
+def test_detect_speech_in_windows(monkeypatch):
+    """按窗口解码检测，区间加上窗口偏移，被窗口边界切断的区间重新拼接"""
+    window_ms = chunked_asr.VAD_WINDOW_MS
+    loaded = []
+
+    def fake_load_audio(audio_path, offset_ms=0, duration_ms=None):
+        loaded.append((offset_ms, duration_ms))
+        return np.zeros(16, dtype=np.float32)
+
+    class FakeVADModel:
+        def __init__(self):
+            self.outputs = [
+                [[1000, 5000], [window_ms - 3000, window_ms]],
+                [[0, 2000], [10000, 12000]],
+            ]
+
+        def generate(self, input, fs):
+            return [{"value": self.outputs.pop(0)}]
+
+    monkeypatch.setattr(chunked_asr, "load_audio", fake_load_audio)
+    pipeline = ChunkedASRPipeline.__new__(ChunkedASRPipeline)
+    pipeline._vad_model = FakeVADModel()
+    pipeline._lock = chunked_asr.threading.Lock()
+
+    regions = pipeline._detect_speech("audio.wav", window_ms + 20000)
+
+    assert loaded == [(0, window_ms), (window_ms, window_ms)]
+    assert regions == [
+        [1000, 5000],
+        [window_ms - 3000, window_ms + 2000],
+        [window_ms + 10000, window_ms + 12000],
+    ]
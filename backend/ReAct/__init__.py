@@ -1,15 +1,22 @@
 # ReAct 核心模块
 
-from .action_parser import parse_response
+from .action_parser import (
+    StreamingActionParser,
+    parse_actions,
+    parse_response,
+)
 from .actions import ActionExecutor
 from .base_agent import BaseAgent
 from .chat_agent import ChatAgent
 from .models import AgentResult, StreamCallback, ToolCallable, TraceStep
+from .observation_cache import ObservationCache
 from .react_loop import ReactLoop
 from .tool_manager import ToolManager
 from .utils import create_tool_wrapper, normalize_input
 
 __all__ = [
+    "StreamingActionParser",
+    "parse_actions",
     "parse_response",
     "ActionExecutor",
     "BaseAgent",
@@ -19,6 +26,7 @@ __all__ = [
     "StreamCallback",
     "ToolCallable",
     "TraceStep",
+    "ObservationCache",
     "ReactLoop",
     "ToolManager",
     "create_tool_wrapper",
@@ -2,7 +2,7 @@
 
 import json
 import re
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def parse_response(
@@ -61,3 +61,134 @@ def parse_response(
         final_answer = text.split("Final Answer:", 1)[-1].strip()
 
     return thought, action_name, action_input, final_answer
+
+
+def parse_actions(
+    text: str,
+) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    从 LLM 输出中解析同一步内的全部动作
+
+    支持在一步中输出多组互不依赖的动作：
+    Action: 动作名称1
+    Action Input: {"key": "value"}
+    Action: 动作名称2
+    Action Input: {"key": "value"}
+
+    参数:
+        text: LLM 输出的文本
+
+    返回:
+        按出现顺序排列的 (action_name, action_input) 列表，
+        缺少 Action Input 的动作其输入为 None
+    """
+    actions: List[List[Any]] = []
+    for line in text.splitlines():
+        # 与 StreamingActionParser 一致，允许模型输出带缩进的动作行
+        line = line.strip()
+        if line.startswith("Action:"):
+            action_name = line.replace("Action:", "").strip()
+            if action_name:
+                actions.append([action_name, None])
+        elif line.startswith("Action Input:"):
+            # Action Input 归属于最近一个尚未获得输入的动作
+            if not actions or actions[-1][1] is not None:
+                continue
+            try:
+                actions[-1][1] = json.loads(
+                    line.replace("Action Input:", "").strip()
+                )
+            except json.JSONDecodeError:
+                actions[-1][1] = {}
+
+    return [(name, action_input) for name, action_input in actions]
+
+
+class StreamingActionParser:
+    """
+    增量解析流式输出的 ReAct 响应，判断何时可以提前结束生成
+
+    每次只扫描新到达的完整行。当已经得到至少一组完整的
+    Action + Action Input，且随后出现了不属于动作块的内容
+    （例如模型自行编造的 Observation 或新的 Thought）时，
+    即认为本步动作已经完整，可以停止生成并立即执行工具。
+    多组连续的 Action / Action Input 会被完整保留。
+    """
+
+    def __init__(self):
+        self.text = ""  # 已接收的全部文本
+        self.response_text = ""  # 截断后用于解析的有效文本
+        self.stopped = False  # 是否已判定可以提前结束
+        self._scan_pos = 0  # 下一个待扫描行的起始位置
+        self._complete_actions = 0  # 已完整解析的动作数
+        self._awaiting_input = False  # 是否在等待 Action Input 行
+        self._final_answer = False  # 是否进入 Final Answer 部分
+
+    def feed(self, token: str) -> bool:
+        """
+        追加新的 token 并增量解析
+
+        参数:
+            token: 新生成的文本片段
+
+        返回:
+            是否可以提前结束生成
+        """
+        if self.stopped:
+            return True
+
+        self.text += token
+
+        while True:
+            line_end = self.text.find("\n", self._scan_pos)
+            if line_end < 0:
+                break
+            line = self.text[self._scan_pos : line_end]
+            if self._should_stop_at(line, complete=True):
+                return self._stop_at(self._scan_pos)
+            self._consume_line(line)
+            self._scan_pos = line_end + 1
+
+        # 检查尚未结束的最后一行，能够确定不是动作行时立即停止
+        tail = self.text[self._scan_pos :]
+        if self._should_stop_at(tail, complete=False):
+            return self._stop_at(self._scan_pos)
+
+        self.response_text = self.text
+        return False
+
+    def _consume_line(self, line: str) -> None:
+        """根据完整的一行更新解析状态"""
+        line = line.strip()
+        if line.startswith("Final Answer:"):
+            self._final_answer = True
+        elif line.startswith("Action:"):
+            self._awaiting_input = True
+        elif line.startswith("Action Input:") and self._awaiting_input:
+            # 与 parse_response 一致：JSON 解析失败时也视为动作输入已结束
+            self._awaiting_input = False
+            self._complete_actions += 1
+
+    def _should_stop_at(self, line: str, complete: bool) -> bool:
+        """判断某一行是否标志着动作块已经结束"""
+        if (
+            self._final_answer
+            or self._awaiting_input
+            or not self._complete_actions
+        ):
+            return False
+
+        stripped = line.strip()
+        if not stripped:
+            return False
+        if complete:
+            return not stripped.startswith("Action:")
+        # 未完整的行：只有在已能确定其不以 "Action:" 开头时才停止
+        prefix = stripped[: len("Action:")]
+        return not "Action:".startswith(prefix)
+
+    def _stop_at(self, position: int) -> bool:
+        """在指定位置截断文本并标记为停止"""
+        self.stopped = True
+        self.response_text = self.text[:position].rstrip()
+        return True
@@ -1,17 +1,75 @@
 """动作执行模块"""
 
+import asyncio
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .models import ToolCallable
+from .observation_cache import (
+    CacheKey,
+    ObservationCache,
+    shared_observation_cache,
+)
+from .utils import is_tool_error
 
 
 class ActionExecutor:
     """执行各个动作"""
 
-    def __init__(self, llm_router: Any, llm_model: str):
+    def __init__(
+        self,
+        llm_router: Any,
+        llm_model: str,
+        max_concurrency: int = 4,
+        observation_cache: Optional[ObservationCache] = None,
+        cacheable_tools: Optional[Iterable[str]] = None,
+    ):
+        """
+        初始化动作执行器
+
+        参数:
+            llm_router: LLM 路由器实例
+            llm_model: 使用的模型名称
+            max_concurrency: 同一步内并行执行动作的最大并发数
+            observation_cache: 会话级工具结果缓存，为 None 时新建
+            cacheable_tools: 可跨会话缓存结果的幂等工具名称
+        """
         self.llm_router = llm_router
         self.llm_model = llm_model
+        self.max_concurrency = max(1, max_concurrency)
+        self.observation_cache = observation_cache or ObservationCache()
+        self.cacheable_tools = set(cacheable_tools or [])
+        # 正在执行中的工具调用，相同调用并发发起时共享同一结果
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+    async def execute_actions(
+        self,
+        actions: List[Tuple[str, Optional[Dict[str, Any]]]],
+        available_tools: Dict[str, ToolCallable],
+    ) -> List[str]:
+        """
+        并行执行同一步内的多个独立动作
+
+        参数:
+            actions: (动作名称, 动作输入参数) 列表
+            available_tools: 可用工具字典
+
+        返回:
+            与 actions 顺序一致的动作执行结果列表
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(
+            action_name: str, action_input: Optional[Dict[str, Any]]
+        ) -> str:
+            async with semaphore:
+                return await self.execute_action(
+                    action_name, action_input or {}, available_tools
+                )
+
+        return await asyncio.gather(
+            *(run_one(name, action_input) for name, action_input in actions)
+        )
 
     async def execute_action(
         self,
@@ -52,11 +110,44 @@ class ActionExecutor:
         """
         执行外部工具
 
+        相同工具和输入的调用结果会被缓存：会话内缓存对所有工具生效，
+        声明为可缓存的幂等工具还会写入跨会话共享缓存。
+
         参数:
             tool_name: 工具名称
             action_input: 动作输入参数
             available_tools: 可用工具字典
         """
+        cache_key = ObservationCache.make_key(tool_name, action_input)
+        cached = self._get_cached_observation(cache_key)
+        if cached is not None:
+            return cached
+
+        # 相同调用正在执行时，等待其结果而不是重复执行
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            result = await self._call_tool(
+                tool_name, action_input, available_tools
+            )
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[cache_key]
+
+    async def _call_tool(
+        self,
+        tool_name: str,
+        action_input: Dict[str, Any],
+        available_tools: Dict[str, ToolCallable],
+    ) -> str:
+        """调用外部工具并缓存成功的结果"""
         try:
             # 将输入参数序列化为 JSON 字符串传递给工具
             result = await available_tools[tool_name](json.dumps(action_input))
@@ -64,10 +155,33 @@ class ActionExecutor:
             if not result:
                 return "工具执行未返回结果"
 
+            if not is_tool_error(tool_name, result):
+                self._store_observation(
+                    ObservationCache.make_key(tool_name, action_input), result
+                )
             return result
         except Exception as e:
             return f"工具执行失败: {str(e)}"
 
+    def _get_cached_observation(self, cache_key: CacheKey) -> Optional[str]:
+        """依次查询会话缓存和跨会话共享缓存"""
+        observation = self.observation_cache.get(cache_key)
+        if observation is not None:
+            return observation
+
+        tool_name = cache_key[0]
+        if tool_name in self.cacheable_tools:
+            observation = shared_observation_cache.get(cache_key)
+            if observation is not None:
+                self.observation_cache.set(cache_key, observation)
+        return observation
+
+    def _store_observation(self, cache_key: CacheKey, observation: str) -> None:
+        """写入会话缓存，可缓存工具同时写入共享缓存"""
+        self.observation_cache.set(cache_key, observation)
+        if cache_key[0] in self.cacheable_tools:
+            shared_observation_cache.set(cache_key, observation)
+
     async def _action_finish(self, action_input: Dict[str, Any]) -> str:
         """
         结束动作 - 返回最终答案
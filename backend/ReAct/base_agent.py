@@ -79,6 +79,9 @@ class BaseAgent:
         Action: 工具名（必须是下面列表中的一个：{allowed_list}）
         Action Input: （这里是传给工具的参数，如果是 JSON 就直接写 JSON 字符串）
 
+        如果需要调用多个互不依赖的工具，可以在同一步中连续输出多组 Action 和 Action Input，
+        它们会被并行执行，所有结果会在同一个 Observation 中按编号返回。
+
         当你已经拿到足够信息并且可以给出最终答案时，必须输出：
 
         Thought: （这里说明你已经可以回答问题了）
@@ -5,6 +5,7 @@ from typing import List, Optional
 from .base_agent import BaseAgent
 from .chat_prompt_builder import build_chat_agent_system_prompt
 from .memory_manager import MemoryManager
+from .observation_cache import ObservationCache
 from .react_loop import ReactLoop
 
 
@@ -39,6 +40,9 @@ class ChatAgent(BaseAgent):
         # 初始化记忆管理器
         self.memory_manager = MemoryManager()
 
+        # 会话级工具结果缓存，在同一对话的多次提问之间复用
+        self.observation_cache = ObservationCache()
+
     async def generate_answer(
         self,
         question: str,
@@ -56,7 +60,10 @@ class ChatAgent(BaseAgent):
         返回:
             AgentResult 包含最终答案、推理步骤、消息历史和错误信息
         """
-        # 检查是否需要总结记忆
+        # 等待上一轮回答后启动的后台记忆总结
+        await self.memory_manager.wait_for_summary()
+
+        # 后台总结尚未覆盖时（例如首次超限），在本轮开始前同步总结
         if self.memory_manager.should_summarize():
             await self._summarize_memory()
 
@@ -72,7 +79,11 @@ class ChatAgent(BaseAgent):
 
         # 创建临时的ReactLoop，使用自定义prompt_builder
         temp_react_loop = ReactLoop(
-            self.llm_router, self.llm_model, self.tool_manager, prompt_builder_with_transcript_ids
+            self.llm_router,
+            self.llm_model,
+            self.tool_manager,
+            prompt_builder_with_transcript_ids,
+            observation_cache=self.observation_cache,
         )
 
         # 调用ReactLoop.run，但需要传入正确的参数
@@ -83,6 +94,9 @@ class ChatAgent(BaseAgent):
         if result.final_answer:
             self.memory_manager.add_message({"role": "assistant", "content": result.final_answer})
 
+        # 回答已生成，在后台进行记忆总结，不阻塞本轮返回
+        self.memory_manager.schedule_summarize()
+
         return result
 
     async def _summarize_memory(self) -> None:
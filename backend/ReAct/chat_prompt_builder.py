@@ -47,7 +47,8 @@ def build_chat_agent_system_prompt(
     3. 每次调用工具时，精确描述需要查找的内容
     4. 基于工具返回的结果进行分析和总结
     5. 如果信息不够完整，可以再次调用工具获取更多信息
-    6. 最终回答要基于检索到的具体内容，包括时间戳信息
+    6. 需要分别检索多个视频或多个互不依赖的问题时，可以在同一步中连续输出多组 Action 和 Action Input，它们会被并行执行，结果在同一个 Observation 中按编号返回
+    7. 最终回答要基于检索到的具体内容，包括时间戳信息
 
     # 工具使用指南
 
@@ -0,0 +1,190 @@
+"""MCP 客户端连接池模块"""
+
+import asyncio
+import contextlib
+import time
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Client
+from fastmcp.client.messages import MessageHandler
+from fastmcp.exceptions import ToolError
+
+# 工具列表缓存的默认有效期（秒）
+DEFAULT_TOOLS_CACHE_TTL = 300.0
+
+
+class _ToolListChangedHandler(MessageHandler):
+    """监听服务端的工具列表变更通知，使本地工具缓存失效"""
+
+    def __init__(self, pool: "MCPClientPool"):
+        super().__init__()
+        self._pool = pool
+
+    async def on_tool_list_changed(self, notification: Any) -> None:
+        self._pool.invalidate_tools_cache()
+
+
+class MCPClientPool:
+    """
+    按工具服务 URL 维护长连接的 MCP 客户端会话。
+
+    主要功能：
+    - 复用同一个已连接的 fastmcp.Client，避免每次调用都重新建立连接
+    - 连接断开或调用失败时自动重连并重试
+    - 缓存工具列表，支持 TTL 过期和服务端变更通知刷新
+
+    客户端会话绑定在创建它的事件循环上，如果在新的事件循环中使用
+    （例如 Celery 任务中的 asyncio.run），会自动重新建立连接。
+    """
+
+    def __init__(self, tools_url: str, max_retries: int = 1):
+        """
+        初始化连接池。
+
+        参数:
+            tools_url: MCP 工具后端服务的 URL
+            max_retries: 连接类错误时的最大重试次数
+        """
+        self.tools_url = tools_url
+        self.max_retries = max_retries
+
+        self._client: Optional[Client] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._tools_cache: Optional[List[Any]] = None
+        self._tools_cache_time = 0.0
+
+    def _get_lock(self) -> asyncio.Lock:
+        """获取绑定到当前事件循环的锁"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _is_client_usable(self) -> bool:
+        """当前客户端是否可在本事件循环中直接使用"""
+        return (
+            self._client is not None
+            and self._client_loop is asyncio.get_running_loop()
+            and self._client.is_connected()
+        )
+
+    async def _get_client(self) -> Client:
+        """获取已连接的客户端，必要时建立新连接"""
+        if self._is_client_usable():
+            return self._client
+
+        async with self._get_lock():
+            # 等待锁期间可能已被其他协程重连
+            if self._is_client_usable():
+                return self._client
+
+            await self._close_client()
+            client = Client(
+                self.tools_url,
+                message_handler=_ToolListChangedHandler(self),
+            )
+            await client.__aenter__()
+            self._client = client
+            self._client_loop = asyncio.get_running_loop()
+            return client
+
+    async def _close_client(self) -> None:
+        """关闭当前客户端连接（仅在其所属事件循环中执行关闭）"""
+        client, client_loop = self._client, self._client_loop
+        self._client = None
+        self._client_loop = None
+        if client is None:
+            return
+        if client_loop is asyncio.get_running_loop():
+            with contextlib.suppress(Exception):
+                await client.__aexit__(None, None, None)
+
+    async def _run(self, operation):
+        """
+        在已连接的客户端上执行操作，连接类错误时重连并重试。
+
+        工具本身返回的错误（ToolError）不触发重连，直接抛出。
+        """
+        attempt = 0
+        while True:
+            client = await self._get_client()
+            try:
+                return await operation(client)
+            except ToolError:
+                raise
+            except Exception:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                async with self._get_lock():
+                    if self._client is client:
+                        await self._close_client()
+
+    async def list_tools(
+        self, ttl: Optional[float] = None, force_refresh: bool = False
+    ) -> List[Any]:
+        """
+        获取工具列表，优先使用缓存。
+
+        参数:
+            ttl: 缓存有效期（秒），为 None 时使用默认值
+            force_refresh: 是否忽略缓存强制刷新
+
+        返回:
+            MCP 工具对象列表
+        """
+        ttl = DEFAULT_TOOLS_CACHE_TTL if ttl is None else ttl
+        cache_age = time.monotonic() - self._tools_cache_time
+        if (
+            not force_refresh
+            and self._tools_cache is not None
+            and cache_age < ttl
+        ):
+            return self._tools_cache
+
+        tools = await self._run(lambda client: client.list_tools())
+        self._tools_cache = tools
+        self._tools_cache_time = time.monotonic()
+        return tools
+
+    def invalidate_tools_cache(self) -> None:
+        """使工具列表缓存失效，下次获取时重新拉取"""
+        self._tools_cache = None
+        self._tools_cache_time = 0.0
+
+    async def call_tool(self, tool_name: str, params: Dict[str, Any]) -> Any:
+        """
+        调用指定工具。
+
+        参数:
+            tool_name: 工具名称
+            params: 工具参数字典
+
+        返回:
+            fastmcp 的工具调用结果对象
+        """
+        return await self._run(
+            lambda client: client.call_tool(tool_name, params)
+        )
+
+    async def close(self) -> None:
+        """关闭连接池持有的客户端连接"""
+        async with self._get_lock():
+            await self._close_client()
+
+
+# 全局连接池：工具服务 URL -> 连接池
+_client_pools: Dict[str, MCPClientPool] = {}
+
+
+def get_client_pool(tools_url: str) -> MCPClientPool:
+    """获取指定工具服务 URL 的全局连接池"""
+    pool = _client_pools.get(tools_url)
+    if pool is None:
+        pool = MCPClientPool(tools_url)
+        _client_pools[tools_url] = pool
+    return pool
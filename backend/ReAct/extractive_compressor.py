@@ -0,0 +1,147 @@
+"""检索结果抽取式压缩器"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# 英文/数字按单词切分，连续的中文按字切分后组成二元组
+_TERM_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+
+# 疑问词等与内容无关的常见词项，不参与相关度计算
+_STOP_TERMS = {
+    "什么", "么是", "是什", "怎么", "如何", "为什", "哪些", "哪个", "视频",
+    "提到", "中提", "介绍", "一下", "请问", "the", "a", "an", "is", "are",
+    "was", "what", "how", "why", "which", "of", "to", "in", "and", "do",
+    "does", "video",
+}
+
+
+def segment_text(segment: Dict[str, Any]) -> str:
+    """句子文本：检索结果中为 sentence 字段，兼容使用 text 字段的片段"""
+    return (segment.get("sentence") or segment.get("text") or "").strip()
+
+
+def segment_time_range(segment: Dict[str, Any]) -> Tuple[float, float]:
+    """句子时间范围：检索结果中为 start_time/end_time，兼容 start/end"""
+    start = segment.get("start_time", segment.get("start"))
+    end = segment.get("end_time", segment.get("end"))
+    return float(start or 0), float(end or 0)
+
+
+def tokenize_terms(text: str) -> List[str]:
+    """
+    将文本切分为用于相关度计算的词项。
+
+    英文和数字按单词切分；中文没有分词器依赖，使用相邻字的二元组，
+    单字的中文片段保留为单字。
+    """
+    terms: List[str] = []
+    for piece in _TERM_PATTERN.findall(text.lower()):
+        if "\u4e00" <= piece[0] <= "\u9fff" and len(piece) > 1:
+            terms.extend(piece[i : i + 2] for i in range(len(piece) - 1))
+        else:
+            terms.append(piece)
+    return [term for term in terms if term not in _STOP_TERMS]
+
+
+class ExtractiveCompressor:
+    """检索结果抽取式压缩器
+
+    使用 BM25 计算每个句子与用户问题的相关度，按相关度挑选句子直到
+    达到长度预算，并保持句子原有顺序和时间戳。整个过程不调用 LLM。
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        参数:
+            k1: BM25 词频饱和参数
+            b: BM25 长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+
+    def score_segments(
+        self, question: str, segments: List[Dict[str, Any]]
+    ) -> List[float]:
+        """
+        计算每个句子与问题的 BM25 相关度
+
+        参数:
+            question: 用户问题
+            segments: 句子片段列表
+
+        返回:
+            与 segments 顺序一致的相关度分数列表
+        """
+        query_terms = set(tokenize_terms(question))
+        docs = [
+            Counter(tokenize_terms(segment_text(segment)))
+            for segment in segments
+        ]
+        if not query_terms or not docs:
+            return [0.0] * len(segments)
+
+        doc_count = len(docs)
+        avg_length = sum(sum(doc.values()) for doc in docs) / doc_count
+        avg_length = avg_length or 1.0
+        doc_freq = {
+            term: sum(1 for doc in docs if term in doc) for term in query_terms
+        }
+
+        scores = []
+        for doc in docs:
+            doc_length = sum(doc.values())
+            score = 0.0
+            for term in query_terms:
+                freq = doc.get(term, 0)
+                if not freq:
+                    continue
+                df = doc_freq[term]
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (
+                    1 - self.b + self.b * doc_length / avg_length
+                )
+                score += idf * freq * (self.k1 + 1) / (freq + norm)
+            scores.append(score)
+        return scores
+
+    def select_segments(
+        self,
+        question: str,
+        segments: List[Dict[str, Any]],
+        max_length: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        按相关度挑选句子，总长度不超过预算
+
+        参数:
+            question: 用户问题
+            segments: 句子片段列表
+            max_length: 选中句子（含时间戳）的最大字符数
+
+        返回:
+            选中的句子片段，保持原有顺序；没有任何句子与问题相关时返回空列表
+        """
+        scores = self.score_segments(question, segments)
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score > 0),
+            key=lambda i: scores[i],
+            reverse=True,
+        )
+
+        selected = []
+        used_length = 0
+        for i in ranked:
+            segment = segments[i]
+            text = segment_text(segment)
+            if not text:
+                continue
+            # 与层次化内容中的行格式保持一致："  [start-end] text"
+            line_length = len(text) + 20
+            if used_length + line_length > max_length:
+                continue
+            selected.append(i)
+            used_length += line_length
+
+        return [segments[i] for i in sorted(selected)]
@@ -1,14 +1,23 @@
 """记忆管理器"""
 
-from typing import List, Dict, Any
+import asyncio
+import contextlib
+from typing import List, Dict, Any, Optional
 from backend.config import settings
 from backend.startup import get_llm_router
+from backend.utils.token_utils.calculate_tokens import get_token_calculator
+
+# 每条消息在聊天格式中的额外 token 开销（角色标记等）
+MESSAGE_TOKEN_OVERHEAD = 4
 
 
 class MemoryManager:
     """对话记忆管理器
 
     负责监控对话上下文长度，自动进行记忆总结，避免超出LLM上下文限制。
+
+    上下文长度按 token 计算，并在增删消息时增量维护，无需每轮重新统计。
+    总结可以在回答返回后放到后台执行，不占用对话的关键路径。
     """
 
     def __init__(self, context_limit: int = None):
@@ -16,12 +25,21 @@ class MemoryManager:
         初始化记忆管理器
 
         参数:
-            context_limit: 上下文长度限制，默认使用settings.llm_context_length
+            context_limit: 上下文长度限制（token 数），默认使用settings.llm_context_length
         """
         self.context_limit = context_limit or settings.llm_context_length or 8000
         self.conversation_summary = ""  # 对话总结
         self.message_buffer: List[Dict[str, str]] = []  # 消息缓冲区
         self.llm_router = get_llm_router()
+        self.token_calculator = get_token_calculator()
+
+        # 与 message_buffer 一一对应的消息 token 数，以及当前上下文 token 总数
+        self._message_tokens: List[int] = []
+        self._summary_tokens = 0
+        self._total_tokens = 0
+
+        # 后台总结任务
+        self._summary_task: Optional[asyncio.Task] = None
 
     async def summarize_memory(self) -> str:
         """
@@ -83,7 +101,7 @@ class MemoryManager:
 摘要："""
 
         try:
-            response = self.llm_router.completion(
+            response = await self.llm_router.acompletion(
                 model=settings.llm_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
@@ -94,6 +112,9 @@ class MemoryManager:
 
             # 更新摘要
             self.conversation_summary = new_summary
+            self._total_tokens -= self._summary_tokens
+            self._summary_tokens = self.token_calculator.count_tokens(new_summary)
+            self._total_tokens += self._summary_tokens
 
             # 压缩消息缓冲区，保留系统消息和最近几条消息
             self._compress_message_buffer()
@@ -114,20 +135,23 @@ class MemoryManager:
         - 保留最近5轮对话（10条消息：5个用户问题 + 5个助手回复）
         - 确保至少保留最近的用户问题
         """
-        system_messages = [msg for msg in self.message_buffer if msg["role"] == "system"]
-        non_system_messages = [msg for msg in self.message_buffer if msg["role"] != "system"]
+        system_indices = [i for i, msg in enumerate(self.message_buffer) if msg["role"] == "system"]
+        non_system_indices = [i for i, msg in enumerate(self.message_buffer) if msg["role"] != "system"]
 
         # 保留最近5轮对话（10条消息：5个用户问题 + 5个助手回复）
         # 但至少要保留最近的用户问题
-        recent_messages = non_system_messages[-10:]  # 最近10条消息
+        recent_indices = non_system_indices[-10:]  # 最近10条消息
 
         # 确保至少有最近的用户问题
-        user_messages = [msg for msg in recent_messages if msg["role"] == "user"]
-        if not user_messages:
+        has_user_message = any(self.message_buffer[i]["role"] == "user" for i in recent_indices)
+        if not has_user_message:
             # 如果没有用户消息，保留最近的一条非系统消息（通常是用户问题）
-            recent_messages = non_system_messages[-1:] if non_system_messages else []
+            recent_indices = non_system_indices[-1:]
 
-        self.message_buffer = system_messages + recent_messages
+        kept_indices = system_indices + recent_indices
+        self.message_buffer = [self.message_buffer[i] for i in kept_indices]
+        self._message_tokens = [self._message_tokens[i] for i in kept_indices]
+        self._total_tokens = self._summary_tokens + sum(self._message_tokens)
 
     def add_message(self, message: Dict[str, str]) -> None:
         """
@@ -136,7 +160,10 @@ class MemoryManager:
         参数:
             message: 消息字典，包含role和content
         """
+        message_tokens = self._count_message_tokens(message)
         self.message_buffer.append(message)
+        self._message_tokens.append(message_tokens)
+        self._total_tokens += message_tokens
 
     def should_summarize(self) -> bool:
         """
@@ -145,12 +172,35 @@ class MemoryManager:
         返回:
             是否需要总结
         """
-        # 计算当前消息总长度
-        total_length = self._calculate_total_length()
-
-        # 当长度超过80%的阈值时触发总结
+        # 当 token 数超过80%的阈值时触发总结
         threshold = int(self.context_limit * 0.8)
-        return total_length > threshold
+        return self._total_tokens > threshold
+
+    def schedule_summarize(self) -> bool:
+        """
+        在后台启动记忆总结（如果需要且没有正在进行的总结）
+
+        应在本轮回答返回给用户之后调用，避免总结阻塞当前回答。
+
+        返回:
+            是否启动了新的后台总结任务
+        """
+        if self._summary_task is not None and not self._summary_task.done():
+            return False
+        if not self.should_summarize():
+            return False
+
+        self._summary_task = asyncio.create_task(self.summarize_memory())
+        return True
+
+    async def wait_for_summary(self) -> None:
+        """等待后台总结完成（通常在用户输入下一问题期间已经完成）"""
+        task = self._summary_task
+        if task is None:
+            return
+        self._summary_task = None
+        with contextlib.suppress(Exception):
+            await task
 
     def get_context_messages(self) -> List[Dict[str, str]]:
         """
@@ -176,19 +226,35 @@ class MemoryManager:
 
         return self.message_buffer
 
-    def _calculate_total_length(self) -> int:
+    def _count_message_tokens(self, message: Dict[str, str]) -> int:
+        """
+        计算单条消息的 token 数
+
+        参数:
+            message: 消息字典，包含role和content
+
+        返回:
+            消息内容的 token 数加上消息格式开销
+        """
+        content = message.get("content", "") or ""
+        return self.token_calculator.count_tokens(content) + MESSAGE_TOKEN_OVERHEAD
+
+    def get_total_tokens(self) -> int:
         """
-        计算消息缓冲区中所有消息的总长度
+        获取当前上下文（总结 + 消息缓冲区）的 token 总数
 
         返回:
-            总字符数
+            总 token 数
         """
-        total = 0
-        for message in self.message_buffer:
-            total += len(message.get("content", ""))
-        return total
+        return self._total_tokens
 
     def reset_memory(self) -> None:
         """重置记忆，清空总结和消息缓冲区"""
+        if self._summary_task is not None and not self._summary_task.done():
+            self._summary_task.cancel()
+        self._summary_task = None
         self.conversation_summary = ""
-        self.message_buffer = []
\ No newline at end of file
+        self.message_buffer = []
+        self._message_tokens = []
+        self._summary_tokens = 0
+        self._total_tokens = 0
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""工具观察结果缓存模块"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str]
+
+
+class ObservationCache:
+    """
+    工具观察结果的 LRU 缓存。
+
+    以 (工具名称, 规范化 JSON 输入) 为键，避免同一会话中
+    重复执行相同的工具调用（例如相同问题和转录ID的知识库检索）。
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: Optional[float] = None):
+        """
+        初始化缓存。
+
+        参数:
+            max_entries: 最大缓存条目数，超出时淘汰最久未使用的条目
+            ttl: 条目有效期（秒），为 None 时不过期
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str]]" = (
+            OrderedDict()
+        )
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(tool_name: str, action_input: Any) -> CacheKey:
+        """根据工具名称和输入参数生成缓存键（字段顺序无关）"""
+        canonical_input = json.dumps(
+            action_input,
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        return tool_name, canonical_input
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """读取缓存，未命中或已过期时返回 None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        stored_at, observation = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return observation
+
+    def set(self, key: CacheKey, observation: str) -> None:
+        """写入缓存"""
+        self._entries[key] = (time.monotonic(), observation)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total_requests = self._hits + self._misses
+        hit_rate = self._hits / total_requests if total_requests > 0 else 0
+
+        return {
+            "cache_hits": self._hits,
+            "cache_misses": self._misses,
+            "hit_rate": f"{hit_rate:.2%}",
+            "cache_size": len(self._entries),
+        }
+
+
+# 跨会话共享缓存：仅用于配置中声明为可缓存（幂等）的工具
+shared_observation_cache = ObservationCache(max_entries=512, ttl=600)
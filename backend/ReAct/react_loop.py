@@ -17,17 +17,25 @@ ReAct 是一种让大语言模型通过交替进行推理(Reasoning)和行动(Ac
 
 支持功能：
 - 流式响应：实时输出推理过程和结果
+- 提前结束：动作完整后立即停止生成并执行工具
 - 工具集成：通过 ToolManager 管理外部工具调用
+- 并行动作：同一步内的多个独立动作并发执行，观察结果一次性反馈
 - 错误处理：完善的异常捕获和错误信息返回
 - 推理追踪：记录完整的推理步骤用于调试和分析
 """
 
+import contextlib
 import json
 from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
-from .action_parser import parse_response
+from .action_parser import (
+    StreamingActionParser,
+    parse_actions,
+    parse_response,
+)
 from .actions import ActionExecutor
 from .models import AgentResult, StreamCallback, ToolCallable, TraceStep
+from .observation_cache import ObservationCache
 
 
 class ReactLoop:
@@ -51,6 +59,8 @@ class ReactLoop:
         tool_manager: Any,
         prompt_builder: Callable[[List[str], str], str],
         max_loops: int = 10,
+        max_parallel_actions: int = 4,
+        observation_cache: Optional[ObservationCache] = None,
     ):
         """
         初始化 ReAct 循环处理器
@@ -61,15 +71,75 @@ class ReactLoop:
             tool_manager: 工具管理器实例，负责工具的加载和调用
             prompt_builder: 系统提示构建函数，根据可用工具生成提示文本
             max_loops: 最大推理循环次数，防止无限循环，默认10次
+            max_parallel_actions: 同一步内多个动作并行执行的最大并发数，默认4
+            observation_cache: 工具结果缓存，传入同一实例可在多轮对话间复用
         """
         self.llm_router = llm_router
         self.llm_model = llm_model
         self.tool_manager = tool_manager
         self.prompt_builder = prompt_builder
         # 创建动作执行器，传入 LLM 路由器（用于可能的内部动作处理）
-        self.action_executor = ActionExecutor(llm_router, llm_model)
+        self.action_executor = ActionExecutor(
+            llm_router,
+            llm_model,
+            max_concurrency=max_parallel_actions,
+            observation_cache=observation_cache,
+            cacheable_tools=tool_manager.get_cacheable_tools(),
+        )
         self.max_loops = max_loops
 
+    async def _generate_step(
+        self,
+        messages: List[Dict[str, str]],
+        token_callback: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """
+        流式调用 LLM 生成一个推理步骤
+
+        使用 StreamingActionParser 增量解析输出，一旦动作及其输入已经完整
+        （后续内容不再属于动作块），立即结束生成，省去模型继续编造
+        Observation 等尾部 token 的时间和费用。
+
+        参数:
+            messages: 当前的消息历史
+            token_callback: token 回调函数，为 None 时不推送 token
+
+        返回:
+            本步的有效响应文本（提前结束时已截断多余内容）
+        """
+        # 使用异步调用，避免阻塞事件循环，使同一进程可并发处理多个对话
+        response = await self.llm_router.acompletion(
+            model=self.llm_model,
+            messages=messages,
+            temperature=0.2,  # 较低温度保证推理稳定性
+            max_tokens=800,  # 限制输出长度
+            stream=True,
+        )
+
+        parser = StreamingActionParser()
+        emitted_length = 0
+        async for chunk in response:
+            if not (chunk.choices and chunk.choices[0].delta.content):
+                continue
+
+            should_stop = parser.feed(chunk.choices[0].delta.content)
+
+            # 只推送截断后的有效内容
+            if token_callback:
+                new_text = parser.response_text[emitted_length:]
+                emitted_length += len(new_text)
+                await token_callback(new_text)
+
+            if should_stop:
+                # 提前结束生成，关闭底层流式连接
+                close_stream = getattr(response, "aclose", None)
+                if close_stream:
+                    with contextlib.suppress(Exception):
+                        await close_stream()
+                break
+
+        return parser.response_text
+
     async def run(
         self,
         question: str,
@@ -171,32 +241,10 @@ class ReactLoop:
                 step_index = loop_count + 1  # 步骤编号从1开始
 
                 # 调用 LLM 生成推理步骤
-                # 根据是否启用流式模式选择不同的调用方式
-                if token_callback:
-                    # 流式调用：实时接收 token 并通过回调推送
-                    response = self.llm_router.completion(
-                        model=self.llm_model,
-                        messages=messages,
-                        temperature=0.2,  # 较低温度保证推理稳定性
-                        max_tokens=800,  # 限制输出长度
-                        stream=True,
-                    )
-                    response_text = ""
-                    for chunk in response:
-                        if chunk.choices[0].delta.content:
-                            token = chunk.choices[0].delta.content
-                            response_text += token
-                            if token_callback:
-                                await token_callback(token)
-                else:
-                    # 非流式调用：等待完整响应
-                    response = self.llm_router.completion(
-                        model=self.llm_model,
-                        messages=messages,
-                        temperature=0.2,  # 较低温度保证推理稳定性
-                        max_tokens=800,  # 限制输出长度
-                    )
-                    response_text = response.choices[0].message.content
+                # 动作完整后会提前结束生成，立即进入工具执行
+                response_text = await self._generate_step(
+                    messages, token_callback
+                )
 
                 # 将 LLM 响应添加到消息历史中
                 messages.append(
@@ -247,8 +295,69 @@ class ReactLoop:
 
                 # ===== 第五阶段：执行动作 =====
 
+                # 解析本步的全部动作，多个独立动作将并行执行
+                actions = parse_actions(response_text) if action_name else []
+
+                if len(actions) > 1:
+                    # 发送每个动作的执行信息到流式回调
+                    for action_idx, (name, step_input) in enumerate(
+                        actions, 1
+                    ):
+                        await emit(
+                            "action",
+                            {
+                                "step": step_index,
+                                "index": action_idx,
+                                "name": name,
+                                "input": step_input,
+                            },
+                        )
+
+                    # 在并发上限内同时执行所有动作
+                    observations = (
+                        await self.action_executor.execute_actions(
+                            actions, available_tools
+                        )
+                    )
+
+                    observation_parts = []
+                    for action_idx, ((name, step_input), observation) in (
+                        enumerate(zip(actions, observations), 1)
+                    ):
+                        # 每个动作单独记录一条推理轨迹
+                        trace.append(
+                            TraceStep(
+                                step=step_index,
+                                thought=thought,
+                                action=name,
+                                action_input=step_input,
+                                observation=observation,
+                                raw_response=response_text,
+                            )
+                        )
+                        await emit(
+                            "observation",
+                            {
+                                "step": step_index,
+                                "index": action_idx,
+                                "content": observation,
+                            },
+                        )
+                        observation_parts.append(
+                            f"[{action_idx}] {name}: {observation}"
+                        )
+
+                    # 所有观察结果合并为一条消息反馈给 LLM
+                    messages.append(
+                        {
+                            "role": "user",
+                            "content": "Observation:\n"
+                            + "\n\n".join(observation_parts),
+                        }
+                    )
+
                 # 如果解析到了动作名称，需要执行相应的工具
-                if action_name:
+                elif action_name:
                     # 发送动作执行信息到流式回调
                     await emit(
                         "action",
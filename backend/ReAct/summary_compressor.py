@@ -5,15 +5,22 @@ from typing import List, Dict, Any
 from backend.startup import get_llm_router
 from backend.config import settings
 
+from .extractive_compressor import (ExtractiveCompressor, segment_text,
+                                    segment_time_range)
+
 
 class RetrievalSummaryCompressor:
     """检索结果信息压缩器
 
     负责将冗长的检索结果压缩为关键信息，避免记忆爆炸。
+
+    内容超出长度限制时，先用抽取式压缩（BM25 相关度挑选句子）处理，
+    仅在仍超出限制或无法判断相关度时才调用 LLM 压缩。
     """
 
     def __init__(self):
         self.llm_router = get_llm_router()
+        self.extractive_compressor = ExtractiveCompressor()
 
     async def compress_multiple_files_results(
         self,
@@ -62,7 +69,18 @@ class RetrievalSummaryCompressor:
                 summary = "\n".join(file_summaries)
                 return f"检索结果概览:\n{summary}\n\n详细内容:\n{raw_content}"
 
-            # 内容过长，需要压缩
+            # 内容过长，先尝试不调用 LLM 的抽取式压缩
+            extracted_content = self._extractive_compress(
+                question, retrieval_results_list, max_length
+            )
+            if extracted_content and len(extracted_content) <= max_length:
+                summary = "\n".join(file_summaries)
+                return f"检索结果概览:\n{summary}\n\n相关内容:\n{extracted_content}"
+
+            # 仍然过长时使用 LLM 压缩，优先基于抽取后的内容以减少输入
+            if extracted_content:
+                raw_content = extracted_content
+
             compression_prompt = f"""
             请基于用户问题，从以下多个视频文件的检索内容中提取最相关和最重要的信息。
 
@@ -92,7 +110,7 @@ class RetrievalSummaryCompressor:
             请按文件分类总结最相关的内容:
             """
 
-            response = self.llm_router.completion(
+            response = await self.llm_router.acompletion(
                 model=settings.llm_model,
                 messages=[{"role": "user", "content": compression_prompt}],
                 temperature=0.3,
@@ -113,6 +131,63 @@ class RetrievalSummaryCompressor:
 
             return f"压缩失败，返回文件概览:\n" + "\n".join(file_summaries)
 
+    def _extractive_compress(
+        self,
+        question: str,
+        retrieval_results_list: List[Dict[str, Any]],
+        max_length: int,
+    ) -> str:
+        """
+        抽取式压缩：按与问题的相关度挑选句子，保留时间戳和文件分组
+
+        参数:
+            question: 用户问题
+            retrieval_results_list: 多个检索结果字典的列表
+            max_length: 压缩后文本的最大长度
+
+        返回:
+            压缩后的层次化内容，没有句子与问题相关时返回空字符串
+        """
+        # 所有文件的句子一起计算相关度，使分数在文件之间可比较
+        tagged_segments = []
+        for file_idx, retrieval_results in enumerate(retrieval_results_list):
+            for segment in retrieval_results.get("segments", []):
+                tagged_segments.append((file_idx, segment))
+
+        # 为文件和块标签预留空间；选中的句子不连续时块标签更多，
+        # 组装结果仍超出限制就按比例缩小句子预算重新挑选
+        sentence_budget = int(max_length * 0.8)
+        content = ""
+        for _ in range(5):
+            selected = self.extractive_compressor.select_segments(
+                question,
+                [segment for _, segment in tagged_segments],
+                sentence_budget,
+            )
+            if not selected:
+                return ""
+
+            selected_ids = {id(segment) for segment in selected}
+            content_parts = []
+            for file_idx, retrieval_results in enumerate(retrieval_results_list):
+                file_segments = [
+                    segment
+                    for idx, segment in tagged_segments
+                    if idx == file_idx and id(segment) in selected_ids
+                ]
+                if file_segments:
+                    filename = retrieval_results.get("filename", "unknown")
+                    content_parts.append(
+                        self._build_hierarchical_content(file_segments, filename)
+                    )
+
+            content = "\n\n".join(content_parts)
+            if len(content) <= max_length:
+                break
+            sentence_budget = int(sentence_budget * max_length / len(content) * 0.9)
+
+        return content
+
     def _build_hierarchical_content(self, segments: List[Dict[str, Any]], filename: str) -> str:
         """
         使用层次化标签系统构建文件内容
@@ -144,9 +219,8 @@ class RetrievalSummaryCompressor:
                     chunk_end_index = current_chunk[-1].get("index", 0)
                     content_lines.append(f"  [块开始: {chunk_num} - 索引: {chunk_start_index}-{chunk_end_index}]")
                     for segment in current_chunk:
-                        start_time = segment.get("start", 0)
-                        end_time = segment.get("end", 0)
-                        text = segment.get("text", "").strip()
+                        start_time, end_time = segment_time_range(segment)
+                        text = segment_text(segment)
                         if text:
                             time_str = f"[{start_time:.2f}-{end_time:.2f}]"
                             content_lines.append(f"  {time_str} {text}")
@@ -163,9 +237,8 @@ class RetrievalSummaryCompressor:
                 chunk_end_index = current_chunk[-1].get("index", 0)
                 content_lines.append(f"  [块开始: {chunk_num} - 索引: {chunk_start_index}-{chunk_end_index}]")
                 for segment in current_chunk:
-                    start_time = segment.get("start", 0)
-                    end_time = segment.get("end", 0)
-                    text = segment.get("text", "").strip()
+                    start_time, end_time = segment_time_range(segment)
+                    text = segment_text(segment)
                     if text:
                         time_str = f"[{start_time:.2f}-{end_time:.2f}]"
                         content_lines.append(f"  {time_str} {text}")
@@ -195,4 +268,27 @@ class RetrievalSummaryCompressor:
             压缩后的关键信息
         """
         # 直接调用多文件压缩方法，传入单文件结果列表
-        return await self.compress_multiple_files_results(question, [retrieval_results], max_length)
\ No newline at end of file
+        return await self.compress_multiple_files_results(question, [retrieval_results], max_length)
+
+    async def compress_single_file_results(
+        self,
+        question: str,
+        retrieval_results: Dict[str, Any],
+        max_length: int = 2000
+    ) -> str:
+        """
+        压缩单个检索结果字典（可包含来自多个转录的句子）
+
+        参数:
+            question: 用户问题
+            retrieval_results: 检索结果字典
+            max_length: 压缩后文本的最大长度
+
+        返回:
+            压缩后的关键信息
+        """
+        return await self.compress_multiple_files_results(question, [retrieval_results], max_length)
+
+
+# 全局实例
+summary_compressor = RetrievalSummaryCompressor()
\ No newline at end of file
@@ -2,10 +2,9 @@
 
 import json
 import os
-from typing import Any, Dict, List, Optional
-
-from fastmcp import Client
+from typing import Any, Dict, List, Optional, Tuple
 
+from .client_pool import get_client_pool
 from .models import ToolCallable
 from .utils import create_tool_wrapper
 
@@ -15,59 +14,114 @@ class ToolManager:
     负责工具列表、工具配置和工具描述的管理。
 
     主要功能：
-    - 从 MCP 服务获取可用工具列表
+    - 从 MCP 服务获取可用工具列表（经连接池复用长连接并缓存）
     - 管理工具配置和权限控制
     - 生成工具描述文本供 LLM 使用
     - 创建工具调用包装器
     """
 
-    def __init__(self, tools_url: str, config_path: Optional[str] = None):
+    def __init__(
+        self,
+        tools_url: str,
+        config_path: Optional[str] = None,
+        tools_cache_ttl: Optional[float] = None,
+    ):
         """
         初始化工具管理器。
 
         参数:
             tools_url: MCP 工具后端服务的 URL
-            config_path: 工具配置文件路径（JSON 数组格式）
+            config_path: 工具配置文件路径（JSON 数组或对象格式，见 load_tool_config）
+            tools_cache_ttl: 工具列表缓存有效期（秒），为 None 时使用默认值
         """
         self.tools_url = tools_url
         self.config_path = config_path
+        self.tools_cache_ttl = tools_cache_ttl
+        self.client_pool = get_client_pool(tools_url)
 
-    async def list_available_tools(self):
-        """
-        直接从 MCP 服务端获取工具列表。
+        # 工具配置只在创建时读取一次
+        self._allowed_tools, self._cacheable_tools = self._parse_tool_config(
+            self._read_tool_config()
+        )
 
-        通过 FastMCP 客户端连接到工具后端服务，
-        获取所有注册的工具信息。
+    async def list_available_tools(self, force_refresh: bool = False):
         """
-        client = Client(self.tools_url)
-        async with client:
-            return await client.list_tools()
+        从 MCP 服务端获取工具列表。
 
-    def load_tool_config(self) -> List[str]:
+        通过同一工具服务 URL 共享的长连接获取工具信息，结果按 TTL 缓存，
+        服务端发出工具列表变更通知时缓存自动失效。
+
+        参数:
+            force_refresh: 是否忽略缓存强制刷新
         """
-        从配置文件加载允许使用的工具列表。
+        return await self.client_pool.list_tools(
+            ttl=self.tools_cache_ttl, force_refresh=force_refresh
+        )
+
+    def invalidate_tools_cache(self) -> None:
+        """使工具列表缓存失效"""
+        self.client_pool.invalidate_tools_cache()
 
-        文件格式：JSON 数组，包含允许的工具名称
+    def _read_tool_config(self) -> Any:
+        """
+        读取工具配置文件的原始内容。
 
         返回:
-            允许的工具名称列表，如果文件不存在或格式错误则返回空列表
+            解析后的 JSON 内容，如果文件不存在或格式错误则返回 None
         """
         if self.config_path is None:
-            return []
+            return None
 
         try:
             with open(self.config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                if isinstance(config, list):
-                    return config
+                return json.load(f)
         except FileNotFoundError:
             print(f"工具配置文件未找到: {self.config_path}")
-            return []
         except json.JSONDecodeError as e:
             print(f"工具配置文件格式错误: {e}")
-            return []
+        return None
+
+    @staticmethod
+    def _parse_tool_config(config: Any) -> Tuple[List[str], List[str]]:
+        """
+        解析工具配置。
 
-        return []
+        文件格式：
+        - JSON 数组，包含允许的工具名称（不缓存任何工具结果）
+        - JSON 对象，allowed_tools 字段为允许的工具名称，
+          cacheable_tools 字段为结果可跨会话缓存的幂等工具名称
+
+        返回:
+            (允许的工具名称列表, 可缓存的工具名称列表)，格式错误时为空列表
+        """
+        if isinstance(config, list):
+            return config, []
+        if isinstance(config, dict):
+            allowed_tools = config.get("allowed_tools")
+            cacheable_tools = config.get("cacheable_tools")
+            return (
+                allowed_tools if isinstance(allowed_tools, list) else [],
+                cacheable_tools if isinstance(cacheable_tools, list) else [],
+            )
+        return [], []
+
+    def load_tool_config(self) -> List[str]:
+        """
+        获取配置文件中允许使用的工具列表。
+
+        返回:
+            允许的工具名称列表，如果文件不存在或格式错误则返回空列表
+        """
+        return list(self._allowed_tools)
+
+    def get_cacheable_tools(self) -> List[str]:
+        """
+        获取配置文件中可跨会话缓存结果的幂等工具列表。
+
+        返回:
+            可缓存的工具名称列表，未配置时返回空列表
+        """
+        return list(self._cacheable_tools)
 
     def get_allowed_tools(
         self, allowed_tools: Optional[List[str]] = None
@@ -13,6 +13,9 @@ from backend.services.knowledge_base_service import knowledge_base
 from backend.db.transcript_crud import get_transcript_by_id
 from backend.schemas import Segment
 from backend.ReAct.summary_compressor import summary_compressor
+from backend.ReAct.utils import (RETRIEVAL_FAILED_PREFIX,
+                                 RETRIEVAL_INVALID_IDS_PREFIX,
+                                 RETRIEVAL_NO_CONTENT)
 
 
 class KnowledgeRetrievalTool:
@@ -36,7 +39,7 @@ class KnowledgeRetrievalTool:
         if isinstance(transcript_ids, int):
             transcript_ids = [transcript_ids]
         elif not isinstance(transcript_ids, list):
-            return f"无效的transcript_ids参数: {transcript_ids}"
+            return f"{RETRIEVAL_INVALID_IDS_PREFIX}{transcript_ids}"
 
         try:
             all_segments = []
@@ -56,7 +59,7 @@ class KnowledgeRetrievalTool:
 
             # 如果没有检索到内容，返回错误
             if not all_segments:
-                return "No relevant content found in the selected transcripts"
+                return RETRIEVAL_NO_CONTENT
 
             # 获取文件名（如果只有一个transcript_id）
             filename = None
@@ -88,7 +91,7 @@ class KnowledgeRetrievalTool:
             return compressed_info
 
         except Exception as e:
-            return f"检索失败: {str(e)}"
+            return f"{RETRIEVAL_FAILED_PREFIX}{str(e)}"
 
 
 # 全局实例
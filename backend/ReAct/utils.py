@@ -3,10 +3,25 @@ import os
 import re
 from typing import Any, Dict, List, Optional
 
-from fastmcp import Client
-
+from .client_pool import get_client_pool
 from .models import ToolCallable
 
+# 工具调用失败时包装器返回的提示前缀
+TOOL_ERROR_PREFIX = "调用工具 '{tool_name}' 时发生错误: "
+
+# 知识库检索工具以普通返回值报告的失败和空结果
+RETRIEVAL_FAILED_PREFIX = "检索失败: "
+RETRIEVAL_INVALID_IDS_PREFIX = "无效的transcript_ids参数: "
+RETRIEVAL_NO_CONTENT = "No relevant content found in the selected transcripts"
+
+# 以这些前缀开头的工具结果不是成功结果，不能写入缓存：
+# 暂时性的数据库/LLM 错误，或知识库尚未建好索引时的空结果，稍后重试可能成功
+UNCACHEABLE_RESULT_PREFIXES = (
+    RETRIEVAL_FAILED_PREFIX,
+    RETRIEVAL_INVALID_IDS_PREFIX,
+    RETRIEVAL_NO_CONTENT,
+)
+
 
 def normalize_input(input_data: Any):
     """解析工具调用输入，支持 JSON 文本或普通字符串。"""
@@ -25,16 +40,25 @@ def normalize_input(input_data: Any):
 
 
 def create_tool_wrapper(tools_url, tool_name: str) -> ToolCallable:
-    """为工具创建调用包装器，统一处理字符串/JSON 输入。"""
+    """为工具创建调用包装器，统一处理字符串/JSON 输入。
+
+    调用通过全局 MCP 连接池复用长连接，不再为每次调用新建客户端。
+    """
+    client_pool = get_client_pool(tools_url)
 
     async def tool_wrapper(input_str: str) -> str:
         try:
             params = normalize_input(input_str)
-            client = Client(tools_url)
-            async with client:
-                result = await client.call_tool(tool_name, params)
-                return str(result.data)
+            result = await client_pool.call_tool(tool_name, params)
+            return str(result.data)
         except Exception as e:
-            return f"调用工具 '{tool_name}' 时发生错误: {str(e)}"
+            return TOOL_ERROR_PREFIX.format(tool_name=tool_name) + str(e)
 
     return tool_wrapper
+
+
+def is_tool_error(tool_name: str, observation: str) -> bool:
+    """判断工具结果是否为失败提示：包装器的调用失败，或工具以返回值报告的失败和空结果。"""
+    return observation.startswith(
+        (TOOL_ERROR_PREFIX.format(tool_name=tool_name),) + UNCACHEABLE_RESULT_PREFIXES
+    )
@@ -6,52 +6,220 @@ ASR 音频处理模块（ASRBackend 客户端版本）
 ASRBackend 已预处理分段和规范化逻辑，本模块直接使用其结果。
 
 支持本地和云端两种模式的 ASRBackend，自动选择合适的接口。
+与 ASRBackend 共享存储时只传文件路径；否则以流式 multipart 上传，
+不会把整个音频文件读入内存。
+
+所有请求共用一个带连接池和重试策略的 requests.Session，
+健康检查结果（运行模式、是否支持异步任务）按 TTL 缓存，调用失败时重新检测。
+
+除同步识别 process() 外，还提供异步任务接口 submit_asr_job / get_asr_job：
+提交后立即返回任务 ID，由调用方轮询结果，不必在识别期间占用连接。
 """
 
+import logging
+import mimetypes
 import os
-from typing import Dict, List
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from backend.config import settings
 
+# 流式上传时每次读取的字节数
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 服务暂时不可用时按状态码重试（仅限 GET，识别请求不重复提交）
+RETRY_STATUS_CODES = (502, 503, 504)
 
-def _get_asr_mode() -> str:
-    """检测 ASRBackend 的运行模式。
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# ASRBackend 健康检查结果缓存：(响应内容, 检测时间)
+_cached_health: Optional[Dict] = None
+_cached_health_at = 0.0
+
+
+def _get_session() -> requests.Session:
+    """获取到 ASRBackend 的共享会话（keep-alive 连接池 + 重试策略）
+
+    连接失败时所有请求都会重试（请求尚未发出，重试安全）；
+    读超时和 5xx 状态只对 GET 重试，避免重复提交耗时的识别任务。
+    会话在首次使用时创建，Celery prefork 子进程各自持有自己的连接。
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=settings.asr_http_retries,
+                    connect=settings.asr_http_retries,
+                    read=settings.asr_http_retries,
+                    status=settings.asr_http_retries,
+                    backoff_factor=0.5,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    allowed_methods=frozenset({"GET", "HEAD"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=settings.asr_http_pool_size,
+                    pool_maxsize=settings.asr_http_pool_size,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _invalidate_asr_health() -> None:
+    """清除缓存的健康检查结果，下次调用时重新检测"""
+    global _cached_health
+    _cached_health = None
+
+
+class _StreamingMultipartBody:
+    """分块生成只包含一个文件字段的 multipart/form-data 请求体。
+
+    requests 的 files 参数会先把整个文件读入内存再拼接请求体，
+    这里改为边读边发，并提前计算 Content-Length。
+    """
+
+    def __init__(self, audio_path: str, field_name: str = "file", chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.audio_path = audio_path
+        self.chunk_size = chunk_size
+        self.boundary = uuid.uuid4().hex
+
+        filename = os.path.basename(audio_path).replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+        file_type = mimetypes.guess_type(audio_path)[0] or "application/octet-stream"
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: {file_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._length = len(self._head) + os.path.getsize(audio_path) + len(self._tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        with open(self.audio_path, "rb") as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        yield self._tail
+
+
+def _post_audio_file(url: str, audio_path: str, timeout: int) -> requests.Response:
+    """以流式 multipart 上传音频文件"""
+    body = _StreamingMultipartBody(audio_path)
+    return _get_session().post(
+        url,
+        data=body,
+        headers={"Content-Type": body.content_type},
+        timeout=timeout,
+    )
+
+
+def _parse_asr_result(result: Dict) -> List[Dict]:
+    """检查 ASRBackend 的返回状态并取出分段"""
+    if result.get("status") != "success":
+        error_msg = result.get("error", "未知错误")
+        raise RuntimeError(f"ASR 识别失败: {error_msg}")
+
+    return result.get("segments", [])
+
+
+def _to_asr_path(audio_path: str) -> str:
+    """将后端的文件路径映射为 ASRBackend 中的路径"""
+    path = os.path.abspath(audio_path)
+    if settings.asr_shared_path_map:
+        local_prefix, _, remote_prefix = settings.asr_shared_path_map.partition("=")
+        if local_prefix and path.startswith(local_prefix):
+            return remote_prefix + path[len(local_prefix):]
+    return path
+
+
+def _transcribe_by_path(audio_path: str, asr_url: str) -> Optional[List[Dict]]:
+    """共享存储模式下只传文件路径。
 
     Returns:
-        'local' 或 'cloud'
+        分段列表；ASRBackend 无法按路径读取该文件时返回 None，由调用方改为上传
     """
-    if settings.asr_mode:
-        return settings.asr_mode
-    
+    response = _get_session().post(
+        f"{asr_url}/asr/transcribe/path",
+        data={"path": _to_asr_path(audio_path)},
+        timeout=600,
+    )
+    if response.status_code in (400, 403, 404):
+        logging.warning(
+            f"ASRBackend 无法按路径读取音频（{response.status_code}: {response.text}），改为上传文件"
+        )
+        return None
+    response.raise_for_status()
+    return _parse_asr_result(response.json())
+
+
+def _get_asr_health() -> Optional[Dict]:
+    """获取 ASRBackend 的健康检查结果。
+
+    结果缓存 asr_mode_cache_ttl 秒；健康检查失败时返回 None，
+    不缓存失败结果，下次调用会重新检测。
+    """
+    global _cached_health, _cached_health_at
+    if _cached_health is not None and time.monotonic() - _cached_health_at < settings.asr_mode_cache_ttl:
+        return _cached_health
+
     asr_url = settings.asr_backend_url.rstrip("/")
     try:
-        response = requests.get(f"{asr_url}/health", timeout=5)
+        response = _get_session().get(f"{asr_url}/health", timeout=5)
         response.raise_for_status()
         data = response.json()
-        return data.get("mode", "local")
     except requests.RequestException:
-        return "local"
+        return None
+
+    _cached_health = data
+    _cached_health_at = time.monotonic()
+    return _cached_health
+
+
+def _get_asr_mode() -> str:
+    """检测 ASRBackend 的运行模式。
+
+    Returns:
+        'local' 或 'cloud'；健康检查失败时回退为 'local'
+    """
+    if settings.asr_mode:
+        return settings.asr_mode
+
+    health = _get_asr_health()
+    return health.get("mode", "local") if health else "local"
+
+
+def _asr_jobs_supported() -> bool:
+    """ASRBackend 是否支持异步任务接口（旧版本的健康检查不含 async_jobs 字段）"""
+    health = _get_asr_health()
+    return bool(health and health.get("async_jobs"))
 
 
 def _transcribe_local_mode(audio_path: str, asr_url: str) -> List[Dict]:
     """本地模式下调用字节流接口。"""
-    with open(audio_path, "rb") as f:
-        files = {"file": (os.path.basename(audio_path), f, "audio/mpeg")}
-        response = requests.post(
-            f"{asr_url}/asr/transcribe/bytes",
-            files=files,
-            timeout=300,
-        )
-        response.raise_for_status()
-
-    result = response.json()
-    if result.get("status") != "success":
-        error_msg = result.get("error", "未知错误")
-        raise RuntimeError(f"ASR 识别失败: {error_msg}")
+    response = _post_audio_file(f"{asr_url}/asr/transcribe/bytes", audio_path, timeout=300)
+    response.raise_for_status()
 
-    return result.get("segments", [])
+    return _parse_asr_result(response.json())
 
 
 def _transcribe_cloud_mode(audio_path: str, asr_url: str) -> List[Dict]:
@@ -65,26 +233,100 @@ def _transcribe_cloud_mode(audio_path: str, asr_url: str) -> List[Dict]:
     
     print(f"准备上传音频文件到ASRBackend: {filename} (大小: {file_size_mb:.2f} MB)")
     
-    with open(audio_path, "rb") as f:
-        files = {"file": (filename, f)}
-        try:
-            response = requests.post(
-                f"{asr_url}/asr/transcribe/upload",
-                files=files,
-                timeout=600,
+    response = _post_audio_file(f"{asr_url}/asr/transcribe/upload", audio_path, timeout=600)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        print(f"ASRBackend 返回错误状态码: {response.status_code}")
+        print(f"响应内容: {response.text}")
+        raise
+
+    return _parse_asr_result(response.json())
+
+
+class ASRJobNotFoundError(RuntimeError):
+    """ASRBackend 中不存在该任务（已过期或服务重启后丢失）"""
+
+
+def submit_asr_job(audio_path: str) -> Optional[str]:
+    """向 ASRBackend 提交异步识别任务。
+
+    先根据（缓存的）健康检查结果确认 ASRBackend 支持异步任务接口，旧版本服务
+    直接返回 None，不会先上传一遍文件再发现接口不存在。
+    共享存储模式下只传文件路径，ASRBackend 无法按路径读取时改为流式上传。
+
+    Args:
+        audio_path: 本地音频文件路径
+
+    Returns:
+        任务 ID；ASRBackend 不支持异步任务接口时返回 None，由调用方改用同步识别
+
+    Raises:
+        FileNotFoundError: 音频文件不存在
+        requests.RequestException: ASRBackend 服务调用失败
+    """
+    if not os.path.isfile(audio_path):
+        raise FileNotFoundError(f"音频文件不存在: {audio_path}")
+
+    if not _asr_jobs_supported():
+        logging.info("ASRBackend 不支持异步任务接口或暂时不可达，改用同步识别")
+        return None
+
+    jobs_url = f"{settings.asr_backend_url.rstrip('/')}/asr/jobs"
+
+    response = None
+    if settings.asr_shared_storage:
+        response = _get_session().post(
+            jobs_url, data={"path": _to_asr_path(audio_path)}, timeout=30
+        )
+        if response.status_code in (400, 403, 404):
+            logging.warning(
+                f"ASRBackend 无法按路径读取音频（{response.status_code}: {response.text}），改为上传文件"
             )
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            print(f"ASRBackend 返回错误状态码: {response.status_code}")
-            print(f"响应内容: {response.text}")
-            raise
+            response = None
 
-    result = response.json()
-    if result.get("status") != "success":
-        error_msg = result.get("error", "未知错误")
-        raise RuntimeError(f"ASR 识别失败: {error_msg}")
+    if response is None:
+        response = _post_audio_file(jobs_url, audio_path, timeout=600)
 
-    return result.get("segments", [])
+    if response.status_code in (404, 405):
+        # 缓存的健康检查结果已过时（服务被替换为旧版本），重新检测
+        _invalidate_asr_health()
+        logging.warning("ASRBackend 不支持异步任务接口，改用同步识别")
+        return None
+    response.raise_for_status()
+    return response.json()["job_id"]
+
+
+def get_asr_job(job_id: str) -> Dict:
+    """查询 ASRBackend 异步任务。
+
+    Args:
+        job_id: submit_asr_job 返回的任务 ID
+
+    Returns:
+        任务信息字典，status 为 pending / running / success / error
+
+    Raises:
+        ASRJobNotFoundError: 任务不存在
+        requests.RequestException: ASRBackend 服务调用失败
+    """
+    asr_url = settings.asr_backend_url.rstrip("/")
+    response = _get_session().get(f"{asr_url}/asr/jobs/{job_id}", timeout=30)
+    if response.status_code == 404:
+        raise ASRJobNotFoundError(f"ASR 任务不存在: {job_id}")
+    response.raise_for_status()
+    return response.json()
+
+
+def parse_asr_job_result(job: Dict) -> List[Dict]:
+    """从已结束的异步任务中取出分段
+
+    Raises:
+        RuntimeError: ASR 识别失败
+    """
+    if job.get("status") != "success":
+        raise RuntimeError(f"ASR 识别失败: {job.get('error') or '未知错误'}")
+    return _parse_asr_result(job.get("result") or {})
 
 
 def process(
@@ -123,22 +365,29 @@ def process(
     asr_url = settings.asr_backend_url.rstrip("/")
 
     try:
-        mode = _get_asr_mode()
-        if mode == "local":
-            segments = _transcribe_local_mode(audio_path, asr_url)
-        else:
-            segments = _transcribe_cloud_mode(audio_path, asr_url)
+        segments = None
+        if settings.asr_shared_storage:
+            segments = _transcribe_by_path(audio_path, asr_url)
+
+        if segments is None:
+            mode = _get_asr_mode()
+            if mode == "local":
+                segments = _transcribe_local_mode(audio_path, asr_url)
+            else:
+                segments = _transcribe_cloud_mode(audio_path, asr_url)
 
         os.makedirs("results", exist_ok=True)
         return segments
 
     except FileNotFoundError as e:
         raise FileNotFoundError(f"音频文件不存在: {audio_path}") from e
-    except requests.exceptions.ConnectionError as e:
-        raise RuntimeError(
-            f"无法连接到 ASRBackend 服务（{asr_url}），请确保服务已启动"
-        ) from e
-    except requests.exceptions.Timeout as e:
-        raise RuntimeError(f"ASRBackend 服务请求超时") from e
     except requests.exceptions.RequestException as e:
+        # ASRBackend 可能已重启或切换了模式，下次调用重新检测
+        _invalidate_asr_health()
+        if isinstance(e, requests.exceptions.ConnectionError):
+            raise RuntimeError(
+                f"无法连接到 ASRBackend 服务（{asr_url}），请确保服务已启动"
+            ) from e
+        if isinstance(e, requests.exceptions.Timeout):
+            raise RuntimeError(f"ASRBackend 服务请求超时") from e
         raise RuntimeError(f"ASRBackend 服务调用失败: {str(e)}") from e
@@ -38,6 +38,7 @@ class Settings(BaseSettings):
     llm_context_length: Optional[int] = None
     llm_tpm: Optional[int] = None
     llm_rpm: Optional[int] = None
+    chat_max_windows: int = 1_000_000  # CHAT_MAX_WINDOWS：聊天和总结一次调用的输入 token 上限
 
     # --- Embedding 配置 ---
     embedding_provider: Optional[str] = None
@@ -55,6 +56,22 @@ class Settings(BaseSettings):
     # --- ASRBackend 服务 ---
     asr_backend_url: str = "http://localhost:8003"
     asr_mode: Optional[str] = None  # 'local' 或 'cloud'，None表示自动检测
+    asr_shared_storage: bool = False  # 与 ASRBackend 共享存储卷时直接传文件路径，不上传文件内容
+    asr_shared_path_map: Optional[str] = None  # 路径映射 "后端路径前缀=ASRBackend路径前缀"，挂载位置不同时使用
+    asr_mode_cache_ttl: int = 300  # 自动检测到的 ASR 模式缓存秒数
+    asr_http_retries: int = 3  # 连接 ASRBackend 失败时的重试次数
+    asr_http_pool_size: int = 10  # 到 ASRBackend 的连接池大小
+    asr_async_jobs: bool = True  # 通过 ASRBackend 异步任务接口识别，等待期间不占用 Celery worker
+    asr_job_poll_interval: int = 5  # 轮询 ASRBackend 任务状态的间隔秒数
+    asr_job_timeout: int = 3 * 3600  # 异步识别任务的最长等待秒数（从首次提交算起）
+    asr_job_max_resubmits: int = 3  # ASRBackend 中任务丢失后最多重新提交的次数
+
+    # --- 翻译配置 ---
+    translate_context_window: int = 0  # 每批提示词中附带的前后相邻原文句子数，0 表示不附带（会增加每批 token）
+    translate_glossary_size: int = 0  # 术语表最多包含的术语数，0 表示不使用（会增加每批 token）
+
+    # --- 总结配置 ---
+    auto_summarize_after_asr: bool = True  # ASR 完成后预生成分层总结（主题总结 + 全文概要）
 
     # --- Celery 配置 ---
     celery_broker_url: str = "redis://localhost:6379/0"
@@ -129,6 +146,14 @@ def create_celery_app() -> Celery:
             "exchange": "asr",
             "routing_key": "asr",
         },
+        "translate": {
+            "exchange": "translate",
+            "routing_key": "translate",
+        },
+        "summarize": {
+            "exchange": "summarize",
+            "routing_key": "summarize",
+        },
     }
 
     # 任务路由配置
@@ -137,6 +162,18 @@ def create_celery_app() -> Celery:
             "queue": "default",
             "routing_key": "default",
         },
+        "backend.queues.tasks.poll_asr_job_task": {
+            "queue": "default",
+            "routing_key": "default",
+        },
+        "backend.queues.tasks.translate_transcript_task": {
+            "queue": "translate",
+            "routing_key": "translate",
+        },
+        "backend.queues.tasks.summarize_transcript_task": {
+            "queue": "summarize",
+            "routing_key": "summarize",
+        },
     }
 
     # 自动发现任务
@@ -13,12 +13,15 @@ from .transcript_base_crud import (
 
 from .transcript_summary_crud import (
     save_summaries,
-    get_summaries
+    get_summaries,
+    get_summaries_with_hash,
+    get_summary_hierarchy
 )
 
 from .transcript_translation_crud import (
     save_translations,
-    get_translations
+    get_translations,
+    save_segment_translations
 )
 
 from .chat_message_crud import (
@@ -36,8 +39,11 @@ __all__ = [
     "get_all_transcript_ids",
     "save_summaries",
     "get_summaries",
+    "get_summaries_with_hash",
+    "get_summary_hierarchy",
     "save_translations",
     "get_translations",
+    "save_segment_translations",
     "save_chat_messages",
     "get_chat_messages",
     "clear_chat_messages"
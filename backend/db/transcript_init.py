@@ -41,6 +41,20 @@ def init_transcript_table(db_url: Optional[str] = None) -> None:
                     ADD COLUMN IF NOT EXISTS video_path TEXT;
                     """
                 )
+                # 生成总结时分句内容的哈希，用于判断已保存的总结是否可以直接复用
+                cur.execute(
+                    """
+                    ALTER TABLE IF EXISTS transcripts
+                    ADD COLUMN IF NOT EXISTS summaries_hash TEXT;
+                    """
+                )
+                # 全文概要：由主题总结再次归纳得到，是分层总结的最上层
+                cur.execute(
+                    """
+                    ALTER TABLE IF EXISTS transcripts
+                    ADD COLUMN IF NOT EXISTS summary_overview TEXT;
+                    """
+                )
                 cur.execute(
                     """
                     CREATE TABLE IF NOT EXISTS chat_sessions (
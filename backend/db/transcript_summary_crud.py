@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -12,7 +12,11 @@ from .conn_utils import connect_db
 
 
 def save_summaries(
-    db_url: Optional[str], transcript_id: int, summaries: List[Dict[str, Any]]
+    db_url: Optional[str],
+    transcript_id: int,
+    summaries: List[Dict[str, Any]],
+    content_hash: Optional[str] = None,
+    overview: Optional[str] = None,
 ) -> bool:
     """保存总结到数据库。
 
@@ -20,6 +24,9 @@ def save_summaries(
         db_url: 数据库连接 URL
         transcript_id: 转写记录 ID
         summaries: 总结列表
+        content_hash: 生成总结时分句内容的哈希，用于判断缓存是否有效；
+            手动保存（无法对应分句内容）时为 None
+        overview: 由主题总结归纳的全文概要；手动保存时为 None
 
     Returns:
         是否保存成功
@@ -32,10 +39,11 @@ def save_summaries(
                 cur.execute(
                     """
                     UPDATE transcripts 
-                    SET summaries_json = %s, updated_at = NOW()
+                    SET summaries_json = %s, summaries_hash = %s,
+                        summary_overview = %s, updated_at = NOW()
                     WHERE id = %s
                     """,
-                    (data, transcript_id),
+                    (data, content_hash, overview, transcript_id),
                 )
                 return cur.rowcount > 0
     finally:
@@ -70,4 +78,74 @@ def get_summaries(
                 except Exception:
                     return None
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def get_summaries_with_hash(
+    db_url: Optional[str], transcript_id: int
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """获取已保存的总结及其对应的分句内容哈希。
+
+    Args:
+        db_url: 数据库连接 URL
+        transcript_id: 转写记录 ID
+
+    Returns:
+        (总结列表, 内容哈希)，不存在时对应项为 None
+    """
+    conn = connect_db(db_url)
+    try:
+        with conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    "SELECT summaries_json, summaries_hash FROM transcripts WHERE id = %s",
+                    (int(transcript_id),),
+                )
+                row = cur.fetchone()
+                if not row or not row.get("summaries_json"):
+                    return None, None
+                try:
+                    return json.loads(row["summaries_json"]), row.get("summaries_hash")
+                except Exception:
+                    return None, None
+    finally:
+        conn.close()
+
+
+def get_summary_hierarchy(
+    db_url: Optional[str], transcript_id: int
+) -> Optional[Dict[str, Any]]:
+    """获取分层总结：全文概要和带时间范围的主题总结。
+
+    Args:
+        db_url: 数据库连接 URL
+        transcript_id: 转写记录 ID
+
+    Returns:
+        {"overview": 全文概要或 None, "sections": 主题总结列表, "hash": 生成时的分句内容哈希或 None}，
+        尚未生成主题总结时返回 None
+    """
+    conn = connect_db(db_url)
+    try:
+        with conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    "SELECT summaries_json, summaries_hash, summary_overview FROM transcripts WHERE id = %s",
+                    (int(transcript_id),),
+                )
+                row = cur.fetchone()
+                if not row or not row.get("summaries_json"):
+                    return None
+                try:
+                    sections = json.loads(row["summaries_json"])
+                except Exception:
+                    return None
+                if not sections:
+                    return None
+                return {
+                    "overview": row.get("summary_overview"),
+                    "sections": sections,
+                    "hash": row.get("summaries_hash"),
+                }
+    finally:
+        conn.close()
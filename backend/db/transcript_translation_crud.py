@@ -72,4 +72,72 @@ def get_translations(
                 except Exception:
                     return None
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+def save_segment_translations(
+    db_url: Optional[str],
+    transcript_id: int,
+    target_lang_code: str,
+    translations: Dict[int, str],
+) -> bool:
+    """将一批分句翻译增量写入 segments_json。
+
+    在数据库端按 index 合并到对应分句的 translation[target_lang_code]，
+    无需读出并回写整个分句列表，适合每批翻译完成后立即提交。
+
+    Args:
+        db_url: 数据库连接 URL
+        transcript_id: 转写记录 ID
+        target_lang_code: 目标语言代码
+        translations: {index: translation}
+
+    Returns:
+        是否保存成功
+    """
+    if not translations:
+        return True
+
+    conn = connect_db(db_url)
+    updates = json.dumps(
+        {str(index): text for index, text in translations.items()},
+        ensure_ascii=False,
+    )
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE transcripts
+                    SET segments_json = COALESCE((
+                        SELECT jsonb_agg(
+                            CASE
+                                WHEN t.translation IS NULL THEN s.seg
+                                ELSE jsonb_set(
+                                    CASE
+                                        WHEN jsonb_typeof(s.seg -> 'translation') = 'object'
+                                        THEN s.seg
+                                        ELSE s.seg || '{"translation": {}}'::jsonb
+                                    END,
+                                    ARRAY['translation', %(lang)s],
+                                    to_jsonb(t.translation)
+                                )
+                            END
+                            ORDER BY s.ord
+                        )
+                        FROM jsonb_array_elements(segments_json::jsonb)
+                            WITH ORDINALITY AS s(seg, ord)
+                        LEFT JOIN jsonb_each_text(%(updates)s::jsonb) AS t(idx, translation)
+                            ON s.seg ->> 'index' = t.idx
+                    ), '[]'::jsonb)::text,
+                    updated_at = NOW()
+                    WHERE id = %(transcript_id)s
+                    """,
+                    {
+                        "lang": target_lang_code,
+                        "updates": updates,
+                        "transcript_id": int(transcript_id),
+                    },
+                )
+                return cur.rowcount > 0
+    finally:
+        conn.close()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""翻译记忆 CRUD 操作模块"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from .conn_utils import connect_db
+
+
+def init_translation_memory_table(db_url: Optional[str] = None) -> None:
+    """初始化翻译记忆表。"""
+    conn = connect_db(db_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS translation_memory (
+                        source_hash TEXT NOT NULL,
+                        source_lang TEXT NOT NULL,
+                        target_lang TEXT NOT NULL,
+                        model TEXT NOT NULL,
+                        source_text TEXT NOT NULL,
+                        translation TEXT NOT NULL,
+                        hit_count INTEGER NOT NULL DEFAULT 0,
+                        created_at TIMESTAMP NOT NULL DEFAULT (now()),
+                        updated_at TIMESTAMP NOT NULL DEFAULT (now()),
+                        PRIMARY KEY (source_hash, source_lang, target_lang, model)
+                    );
+                    """
+                )
+    finally:
+        conn.close()
+
+
+def get_translation_memory(
+    db_url: Optional[str],
+    source_hashes: List[str],
+    source_lang: str,
+    target_lang: str,
+    model: str,
+) -> Dict[str, str]:
+    """批量查询翻译记忆，并累加命中次数。
+
+    Args:
+        db_url: 数据库连接 URL
+        source_hashes: 规范化原文的哈希列表
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+        model: 翻译所用的模型名称
+
+    Returns:
+        {source_hash: translation}，只包含命中的条目
+    """
+    if not source_hashes:
+        return {}
+
+    conn = connect_db(db_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE translation_memory
+                    SET hit_count = hit_count + 1
+                    WHERE source_hash = ANY(%s)
+                      AND source_lang = %s AND target_lang = %s AND model = %s
+                    RETURNING source_hash, translation
+                    """,
+                    (list(set(source_hashes)), source_lang, target_lang, model),
+                )
+                return {row[0]: row[1] for row in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def save_translation_memory(
+    db_url: Optional[str],
+    entries: List[Tuple[str, str, str]],
+    source_lang: str,
+    target_lang: str,
+    model: str,
+) -> int:
+    """批量写入翻译记忆，已存在的条目更新为最新译文。
+
+    Args:
+        db_url: 数据库连接 URL
+        entries: (source_hash, source_text, translation) 列表
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+        model: 翻译所用的模型名称
+
+    Returns:
+        写入的条目数
+    """
+    # 同一批中重复的原文只保留最后一条，避免 ON CONFLICT 重复更新同一行
+    unique_entries = {entry[0]: entry for entry in entries}
+    if not unique_entries:
+        return 0
+
+    conn = connect_db(db_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO translation_memory
+                        (source_hash, source_lang, target_lang, model, source_text, translation)
+                    VALUES %s
+                    ON CONFLICT (source_hash, source_lang, target_lang, model)
+                    DO UPDATE SET translation = EXCLUDED.translation, updated_at = NOW()
+                    """,
+                    [
+                        (source_hash, source_lang, target_lang, model, text, translation)
+                        for source_hash, text, translation in unique_entries.values()
+                    ],
+                )
+                return len(unique_entries)
+    finally:
+        conn.close()
@@ -2,6 +2,18 @@
 """Celery异步任务定义 - 模块化版本"""
 
 # 导入分解后的任务模块
-from .process_job_task import process_job_task, knowledge_retrieval_task
+from .process_job_task import (
+    process_job_task,
+    poll_asr_job_task,
+    knowledge_retrieval_task,
+    translate_transcript_task,
+    summarize_transcript_task,
+)
 
-__all__ = ["process_job_task", "knowledge_retrieval_task"]
\ No newline at end of file
+__all__ = [
+    "process_job_task",
+    "poll_asr_job_task",
+    "knowledge_retrieval_task",
+    "translate_transcript_task",
+    "summarize_transcript_task",
+]
\ No newline at end of file
@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
-"""ASR处理阶段"""
+"""ASR处理阶段
 
+同步模式下在 worker 中调用 ASRBackend 并等待识别完成；
+异步模式下只提交 ASRBackend 任务，由轮询任务定期查询结果，等待期间不占用 worker。
+"""
+
+import logging
+import time
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+import requests
+
+from backend.audio2text.asr_sentence_segments import (
+    ASRJobNotFoundError,
+    get_asr_job,
+    parse_asr_job_result,
+    submit_asr_job,
+)
 from backend.audio2text.asr_sentence_segments import process as asr_process
+from backend.config import settings
 from backend.db.transcript_crud import save_transcript
 from backend.db.job_store import update_job_result
+from backend.utils.token_utils.calculate_tokens import count_segment_tokens
 from .progress_utils import update_task_progress, create_progress_info
 
 
@@ -41,6 +58,29 @@ def handle_asr_stage(
     # 执行ASR
     segs = asr_process(audio_path)
 
+    transcript_id = save_asr_result(
+        audio_path, video_path, media_type, audio_basename, job_id, segs,
+        set_task_progress_func, redis_client, db_url
+    )
+    return transcript_id, segs
+
+
+def save_asr_result(
+    audio_path: str,
+    video_path: Optional[str],
+    media_type: str,
+    audio_basename: str,
+    job_id: int,
+    segs: List[Dict[str, Any]],
+    set_task_progress_func,
+    redis_client,
+    db_url: Optional[str] = None
+) -> int:
+    """保存识别结果：计算分句 token 数、保存转录并写入任务结果
+
+    Returns:
+        transcript_id
+    """
     # ASR后处理进度
     progress_info = create_progress_info(
         job_id, "processing", "asr_postprocessing", 80,
@@ -48,6 +88,9 @@ def handle_asr_stage(
     )
     update_task_progress(set_task_progress_func, redis_client, job_id, progress_info)
 
+    # 计算每句的 token 数并随分句一起保存，后续总结、翻译、聊天分批时直接使用
+    count_segment_tokens(segs)
+
     # 保存转录结果进度
     progress_info = create_progress_info(
         job_id, "processing", "saving_transcript", 90,
@@ -68,4 +111,114 @@ def handle_asr_stage(
     )
     update_task_progress(set_task_progress_func, redis_client, job_id, progress_info)
 
+    return transcript_id
+
+
+def submit_asr_job_stage(
+    audio_path: str,
+    audio_basename: str,
+    job_id: int,
+    set_task_progress_func,
+    redis_client,
+    db_url: Optional[str] = None,
+    submitted_at: Optional[float] = None,
+    resubmits: int = 0
+) -> Optional[str]:
+    """提交 ASRBackend 异步识别任务
+
+    任务 ID、提交时间和重新提交次数写入任务结果，轮询任务和 worker 重启后的恢复都从这里读取。
+
+    Args:
+        submitted_at: 首次提交时间；重新提交时沿用，保证 asr_job_timeout 从首次提交算起
+        resubmits: 已重新提交的次数
+
+    Returns:
+        ASRBackend 任务 ID；不支持异步任务时返回 None，由调用方改用同步识别
+    """
+    progress_info = create_progress_info(
+        job_id, "processing", "asr_preprocessing", 5,
+        filename=audio_basename, message="正在提交语音识别任务..."
+    )
+    update_task_progress(set_task_progress_func, redis_client, job_id, progress_info)
+
+    asr_job_id = submit_asr_job(audio_path)
+    if not asr_job_id:
+        return None
+
+    update_job_result(db_url, job_id, {
+        "asr_job_id": asr_job_id,
+        "asr_submitted_at": submitted_at or time.time(),
+        "asr_resubmits": resubmits,
+    })
+
+    progress_info = create_progress_info(
+        job_id, "processing", "asr_recognizing", 10,
+        filename=audio_basename, message="语音识别任务已提交,等待识别..."
+    )
+    update_task_progress(set_task_progress_func, redis_client, job_id, progress_info)
+    return asr_job_id
+
+
+def poll_asr_job_stage(
+    res: Dict[str, Any],
+    job_id: int,
+    set_task_progress_func,
+    redis_client,
+    db_url: Optional[str] = None
+) -> Optional[tuple[int, List[Dict[str, Any]]]]:
+    """查询一次 ASRBackend 异步任务
+
+    - 任务仍在排队或识别中：返回 None，由调用方稍后再次查询
+    - 查询时 ASRBackend 暂时不可达：同样返回 None，超过 asr_job_timeout 后失败
+    - ASRBackend 中任务不存在（服务重启丢失）：沿用首次提交时间重新提交后返回 None，
+      重新提交超过 asr_job_max_resubmits 次后失败
+    - 识别完成：保存转录并返回 (transcript_id, segments)
+
+    Args:
+        res: 任务结果（包含 audio_path、asr_job_id、asr_submitted_at 等）
+
+    Raises:
+        RuntimeError: 识别失败或等待超时
+    """
+    logger = logging.getLogger(__name__)
+    audio_path = str(res["audio_path"])
+    audio_basename = res.get("basename") or Path(audio_path).name
+    asr_job_id = res["asr_job_id"]
+
+    elapsed = time.time() - float(res.get("asr_submitted_at") or time.time())
+    if elapsed > settings.asr_job_timeout:
+        raise RuntimeError(f"语音识别超时（已等待 {int(elapsed)} 秒）")
+
+    try:
+        asr_job = get_asr_job(asr_job_id)
+    except ASRJobNotFoundError:
+        resubmits = int(res.get("asr_resubmits") or 0)
+        if resubmits >= settings.asr_job_max_resubmits:
+            raise RuntimeError(f"语音识别任务已丢失 {resubmits + 1} 次，放弃重新提交")
+        logger.warning(f"ASR 任务 {asr_job_id} 已丢失，重新提交（第 {resubmits + 1} 次）")
+        if not submit_asr_job_stage(
+            audio_path, audio_basename, job_id, set_task_progress_func, redis_client, db_url,
+            submitted_at=res.get("asr_submitted_at"), resubmits=resubmits + 1
+        ):
+            raise RuntimeError("ASRBackend 已不支持异步任务接口，请重新提交任务")
+        return None
+    except requests.RequestException as e:
+        logger.warning(f"查询 ASR 任务 {asr_job_id} 失败，稍后重试: {e}")
+        return None
+
+    status = asr_job.get("status")
+    if status in ("pending", "running"):
+        message = "语音识别排队中..." if status == "pending" else "正在进行语音识别,请稍候..."
+        progress_info = create_progress_info(
+            job_id, "processing", "asr_recognizing", 10,
+            filename=audio_basename, message=message
+        )
+        update_task_progress(set_task_progress_func, redis_client, job_id, progress_info)
+        return None
+
+    segs = parse_asr_job_result(asr_job)
+    transcript_id = save_asr_result(
+        audio_path, res.get("video_path"), res.get("media_type", "audio"), audio_basename,
+        job_id, segs, set_task_progress_func, redis_client, db_url
+    )
     return transcript_id, segs
\ No newline at end of file
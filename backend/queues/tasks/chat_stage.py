@@ -18,6 +18,7 @@ def handle_streaming_chat_stage(
     job_id: int,
     set_task_progress: Any,
     progress_redis_client: Any,
+    mode: str = "auto",
 ) -> Dict[str, Any]:
     """处理流式聊天任务阶段。
 
@@ -28,6 +29,7 @@ def handle_streaming_chat_stage(
         job_id: 任务ID
         set_task_progress: 进度更新函数
         progress_redis_client: Redis客户端
+        mode: 回答模式（auto / summary / retrieval）
 
     Returns:
         聊天结果字典
@@ -89,7 +91,8 @@ def handle_streaming_chat_stage(
             question=question,
             transcript_ids=transcript_ids,
             chat_max_windows=chat_max_windows,
-            stream_callback=stream_callback
+            stream_callback=stream_callback,
+            mode=mode,
         )
 
         # 消费生成器以确保执行完成
@@ -7,7 +7,7 @@ from pathlib import Path
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
-from backend.config import create_celery_app
+from backend.config import create_celery_app, settings
 from backend.db.job_store import (
     finish_job_failed,
     finish_job_success,
@@ -15,15 +15,48 @@ from backend.db.job_store import (
     update_job_status,
 )
 from .download_stage import handle_download_stage
-from .asr_stage import handle_asr_stage
+from .asr_stage import handle_asr_stage, poll_asr_job_stage, submit_asr_job_stage
 from .knowledge_base_stage import handle_knowledge_base_stage, handle_knowledge_retrieval_stage
 from .translate_stage import handle_translate_stage
+from .summarize_stage import dispatch_summarize_after_asr, handle_summarize_stage
 from .progress_utils import update_task_progress, create_progress_info
 
 # 创建Celery应用实例
 app = create_celery_app()
 
 
+def _finish_job(db_url, job_id, res, audio_path, set_task_progress, progress_redis_client) -> None:
+    """完成任务并推送最终进度"""
+    finish_job_success(db_url, job_id, res)
+
+    audio_basename = res.get("basename") or Path(str(audio_path)).name
+    progress_info = create_progress_info(
+        job_id, "success", "completed", 100,
+        filename=audio_basename, message="任务处理完成"
+    )
+    update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
+
+
+def _fail_job(db_url, job_id, error: Exception, set_task_progress, progress_redis_client) -> None:
+    """标记任务失败并推送失败进度"""
+    progress_info = create_progress_info(
+        job_id, "failed", "error", 0,
+        message=f"任务处理失败: {str(error)}",
+        error=str(error)
+    )
+    update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
+
+    finish_job_failed(db_url, job_id, str(error))
+
+
+def _schedule_asr_job_poll(job_id: int, db_url: Optional[str]) -> None:
+    """稍后查询 ASRBackend 异步任务"""
+    poll_asr_job_task.apply_async(
+        kwargs={"job_id": job_id, "db_url": db_url},
+        countdown=settings.asr_job_poll_interval,
+    )
+
+
 @app.task(
     bind=True,
     name="backend.queues.tasks.knowledge_retrieval_task",
@@ -66,7 +99,10 @@ def process_job_task(
 
     分两阶段执行：
     1. 下载阶段：下载视频并记录media_path（如果是上传文件则跳过）
-    2. ASR阶段：执行语音识别并保存transcript
+    2. ASR阶段：执行语音识别并保存transcript，完成后投递分层总结任务
+
+    启用 asr_async_jobs 时 ASR 阶段只提交 ASRBackend 异步任务，后续阶段交给
+    poll_asr_job_task，当前任务立即返回，识别期间不占用 worker。
 
     Args:
         job_id: 任务ID
@@ -110,6 +146,17 @@ def process_job_task(
             media_type = res.get("media_type", "audio")
             audio_basename = res.get("basename") or Path(str(audio_path)).name
 
+            # 异步模式：提交识别任务（重新投递时复用已提交的任务），由轮询任务接手后续阶段
+            if settings.asr_async_jobs:
+                asr_job_id = res.get("asr_job_id") or submit_asr_job_stage(
+                    str(audio_path), audio_basename,
+                    job_id, set_task_progress, progress_redis_client, db_url
+                )
+                if asr_job_id:
+                    res["asr_job_id"] = asr_job_id
+                    _schedule_asr_job_poll(job_id, db_url)
+                    return res
+
             transcript_id, segs = handle_asr_stage(
                 str(audio_path), video_path, media_type, audio_basename,
                 job_id, set_task_progress, progress_redis_client, db_url
@@ -120,31 +167,151 @@ def process_job_task(
             # 将转写句子段添加到知识库
             handle_knowledge_base_stage(job_id, transcript_id, segs)
 
-        # Step C: 完成任务
-        finish_job_success(db_url, job_id, res)
+            # 预生成分层总结，供总结页和聊天中的概括性问题直接使用
+            dispatch_summarize_after_asr(transcript_id, db_url)
 
-        audio_basename = res.get("basename") or Path(str(audio_path)).name
-        progress_info = create_progress_info(
-            job_id, "success", "completed", 100,
-            filename=audio_basename, message="任务处理完成"
-        )
-        update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
+        # Step C: 完成任务
+        _finish_job(db_url, job_id, res, audio_path, set_task_progress, progress_redis_client)
 
         return res
 
     except Exception as e:
         # 设置失败进度
-        progress_info = create_progress_info(
-            job_id, "failed", "error", 0,
-            message=f"任务处理失败: {str(e)}",
-            error=str(e)
+        _fail_job(db_url, job_id, e, set_task_progress, progress_redis_client)
+        raise
+
+
+@app.task(
+    bind=True,
+    name="backend.queues.tasks.poll_asr_job_task",
+)
+def poll_asr_job_task(
+    self,
+    job_id: int,
+    db_url: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """轮询 ASRBackend 异步识别任务的Celery任务。
+
+    每次只查询一次识别状态：未完成时延迟 asr_job_poll_interval 秒重新投递自身后立即返回，
+    等待期间不占用 worker；识别完成后保存转录、写入知识库、投递分层总结并完成任务。
+
+    Args:
+        job_id: 任务ID
+        db_url: 数据库连接URL
+
+    Returns:
+        任务完成时返回任务结果字典，仍在识别中时返回 None
+    """
+    from backend.routers.progress_router import set_task_progress, redis_client as progress_redis_client
+
+    try:
+        info = get_job(db_url, job_id) or {}
+        res = dict(info.get("result") or {})
+
+        # 重复投递时任务可能已经完成
+        if res.get("transcript_id"):
+            return res
+
+        asr_result = poll_asr_job_stage(
+            res, job_id, set_task_progress, progress_redis_client, db_url
         )
-        update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
+        if asr_result is None:
+            _schedule_asr_job_poll(job_id, db_url)
+            return None
 
-        finish_job_failed(db_url, job_id, str(e))
+        transcript_id, segs = asr_result
+        res.update({"transcript_id": transcript_id, "media_type": res.get("media_type", "audio")})
+
+        # 将转写句子段添加到知识库
+        handle_knowledge_base_stage(job_id, transcript_id, segs)
+
+        # 预生成分层总结，供总结页和聊天中的概括性问题直接使用
+        dispatch_summarize_after_asr(transcript_id, db_url)
+
+        _finish_job(db_url, job_id, res, res["audio_path"], set_task_progress, progress_redis_client)
+        return res
+
+    except Exception as e:
+        _fail_job(db_url, job_id, e, set_task_progress, progress_redis_client)
         raise
 
 
+@app.task(
+    bind=True,
+    name="backend.queues.tasks.translate_transcript_task",
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def translate_transcript_task(
+    self,
+    transcript_id: int,
+    target_lang_code: str,
+    max_tokens: int = 4096,
+    source_lang_code: str = "",
+    source_lang_display_name: str = "",
+    target_lang_display_name: str = "",
+    lock_token: Optional[str] = None,
+    db_url: Optional[str] = None,
+    force_retranslate: bool = False,
+) -> Dict[str, Any]:
+    """翻译转写记录的Celery任务。
+
+    运行在独立的 translate 队列上。任务在执行完成后才确认（acks_late），
+    worker 异常退出时任务会重新投递；每批译文已逐批写入 segments_json，
+    重新执行时只翻译剩余分句。
+
+    Args:
+        transcript_id: 转写记录ID
+        target_lang_code: 目标语言代码
+        max_tokens: 每批翻译的最大输出token数
+        source_lang_code: 源语言代码
+        source_lang_display_name: 源语言显示名称
+        target_lang_display_name: 目标语言显示名称
+        lock_token: 投递时获取的转录锁令牌
+        db_url: 数据库连接URL
+        force_retranslate: 是否强制重新翻译（不复用翻译记忆）
+
+    Returns:
+        翻译结果统计字典
+    """
+    return handle_translate_stage(
+        transcript_id,
+        target_lang_code,
+        max_tokens,
+        source_lang_code,
+        source_lang_display_name,
+        target_lang_display_name,
+        lock_token,
+        db_url,
+        force_retranslate,
+    )
+
+
+@app.task(
+    bind=True,
+    name="backend.queues.tasks.summarize_transcript_task",
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def summarize_transcript_task(
+    self,
+    transcript_id: int,
+    lock_token: Optional[str] = None,
+    db_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """总结转写记录的Celery任务，运行在独立的 summarize 队列上。
+
+    Args:
+        transcript_id: 转写记录ID
+        lock_token: 投递时获取的转录锁令牌
+        db_url: 数据库连接URL
+
+    Returns:
+        总结结果统计字典
+    """
+    return handle_summarize_stage(transcript_id, lock_token, db_url)
+
+
 @app.task(
     bind=True,
     name="backend.queues.tasks.process_streaming_chat_task",
@@ -159,6 +326,7 @@ def process_streaming_chat_task(
     transcript_ids: List[int],
     chat_max_windows: int,
     db_url: Optional[str] = None,
+    mode: str = "auto",
 ) -> Dict[str, Any]:
     """处理流式聊天任务的Celery任务。
 
@@ -168,6 +336,7 @@ def process_streaming_chat_task(
         transcript_ids: 转录ID列表
         chat_max_windows: 聊天最大窗口
         db_url: 数据库URL
+        mode: 回答模式（auto / summary / retrieval）
 
     Returns:
         任务结果字典
@@ -198,6 +367,7 @@ def process_streaming_chat_task(
             job_id=job_id,
             set_task_progress=set_task_progress,
             progress_redis_client=progress_redis_client,
+            mode=mode,
         )
 
         # 完成任务
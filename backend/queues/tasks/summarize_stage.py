@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""总结任务处理阶段"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+
+def handle_summarize_stage(
+    transcript_id: int,
+    lock_token: Optional[str],
+    db_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """处理总结任务阶段。
+
+    在 worker 中生成并保存总结，进度写入 summarize_task:{transcript_id}，
+    由总结 SSE 接口推送给前端。结束时释放投递时获取的转录锁。
+
+    Args:
+        transcript_id: 转写记录ID
+        lock_token: 投递时获取的转录锁令牌
+        db_url: 数据库连接URL
+
+    Returns:
+        总结结果统计字典
+    """
+    # 延迟导入以避免循环依赖
+    from backend.services.summarize_service import (release_summarize_lock,
+                                                    run_summarize_job)
+
+    logger = logging.getLogger(__name__)
+    logger.info(f"handle_summarize_stage 开始，transcript_id={transcript_id}")
+
+    try:
+        return asyncio.run(run_summarize_job(transcript_id, db_url))
+    except Exception as e:
+        logger.error(f"总结任务失败: {e}")
+        raise
+    finally:
+        if lock_token:
+            release_summarize_lock(transcript_id, lock_token)
+
+
+def dispatch_summarize_after_asr(transcript_id: int, db_url: Optional[str] = None) -> None:
+    """ASR 完成后投递分层总结任务（主题总结 + 全文概要）。
+
+    预生成的总结供总结页直接展示，也供聊天回答概括性问题时使用。
+    投递失败只记录日志，不影响 ASR 任务本身的结果。
+
+    Args:
+        transcript_id: 转写记录ID
+        db_url: 数据库连接URL
+    """
+    from backend.config import settings
+
+    if not settings.auto_summarize_after_asr:
+        return
+
+    # 延迟导入以避免循环依赖
+    from backend.services.summarize_service import dispatch_summarize_task
+
+    logger = logging.getLogger(__name__)
+    try:
+        status = dispatch_summarize_task(transcript_id, db_url)
+        logger.info(f"转录 {transcript_id} 的分层总结任务投递结果: {status}")
+    except Exception as e:
+        logger.warning(f"投递分层总结任务失败，transcript_id={transcript_id}: {e}")
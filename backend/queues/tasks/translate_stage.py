@@ -3,82 +3,68 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
-
-from backend.text_process.translate import translate_segments_async
-from .progress_utils import update_task_progress, create_progress_info
+from typing import Any, Dict, Optional
 
 
 def handle_translate_stage(
-    segments: List[Dict],
-    target_lang: str,
-    source_lang: str,
-    job_id: int,
-    set_task_progress: Any,
-    progress_redis_client: Any,
+    transcript_id: int,
+    target_lang_code: str,
+    max_tokens: int,
+    source_lang_code: str,
+    source_lang_display_name: str,
+    target_lang_display_name: str,
+    lock_token: Optional[str],
+    db_url: Optional[str] = None,
+    force_retranslate: bool = False,
 ) -> Dict[str, Any]:
     """处理翻译任务阶段。
 
+    在 worker 中执行翻译并保存结果，进度写入 translate_task:{transcript_id}，
+    由翻译 SSE 接口推送给前端。每批译文完成后立即写入数据库的 segments_json，
+    任务中断后重新投递时，从数据库读取的分句已包含完成的翻译，只翻译剩余分句。
+    无论成功与否，结束时释放投递时获取的转录锁。
+
     Args:
-        segments: 要翻译的分句列表
-        target_lang: 目标语言代码
-        source_lang: 源语言代码
-        job_id: 任务ID
-        set_task_progress: 进度更新函数
-        progress_redis_client: Redis客户端
+        transcript_id: 转写记录ID
+        target_lang_code: 目标语言代码
+        max_tokens: 每批翻译的最大输出token数
+        source_lang_code: 源语言代码
+        source_lang_display_name: 源语言显示名称
+        target_lang_display_name: 目标语言显示名称
+        lock_token: 投递时获取的转录锁令牌
+        db_url: 数据库连接URL
+        force_retranslate: 是否强制重新翻译（不复用翻译记忆）
 
     Returns:
-        翻译结果字典
+        翻译结果统计字典
     """
-    logger = logging.getLogger(__name__)
+    # 延迟导入以避免循环依赖
+    from backend.services.translate_service import (release_translate_lock,
+                                                    run_translate_job)
 
-    print(f"[DEBUG] handle_translate_stage 开始，job_id={job_id}, target_lang={target_lang}, segments_count={len(segments)}")
+    logger = logging.getLogger(__name__)
+    logger.info(
+        f"handle_translate_stage 开始，transcript_id={transcript_id}, target_lang={target_lang_code}"
+    )
 
     try:
-        # 更新进度：开始翻译处理
-        progress_info = create_progress_info(
-            job_id, "in-progress", "translate", 10,
-            message="正在启动翻译处理...",
-        )
-        update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
-
-        # 执行翻译
-        import asyncio
-
-        # 创建进度回调函数
-        def progress_callback(current: int, total: int):
-            progress_percent = int((current / total) * 80) + 10  # 10-90%
-            progress_info = create_progress_info(
-                job_id, "in-progress", "translate", progress_percent,
-                message=f"正在翻译 {current}/{total} 个分句...",
+        return asyncio.run(
+            run_translate_job(
+                transcript_id,
+                target_lang_code,
+                max_tokens,
+                source_lang_code,
+                source_lang_display_name,
+                target_lang_display_name,
+                db_url,
+                force_retranslate,
             )
-            update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
-
-        # 执行异步翻译
-        result = asyncio.run(translate_segments_async(
-            segments=segments,
-            target_lang_code=target_lang,
-            source_lang_code=source_lang,
-            max_tokens=4096,
-            progress_callback=progress_callback,
-        ))
-
-        # 更新进度：翻译完成
-        progress_info = create_progress_info(
-            job_id, "in-progress", "translate", 90,
-            message="翻译完成，正在保存结果...",
         )
-        update_task_progress(set_task_progress, progress_redis_client, job_id, progress_info)
-
-        # 返回翻译结果
-        return {
-            "translations": result,
-            "total_segments": len(segments),
-            "translated_segments": len([s for s in result if s.get("translation")]),
-        }
-
     except Exception as e:
         logger.error(f"翻译任务失败: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if lock_token:
+            release_translate_lock(transcript_id, lock_token)
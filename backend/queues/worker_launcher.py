@@ -36,6 +36,8 @@ def main():
     # 从环境变量读取worker配置
     concurrency = int(os.getenv("CELERY_WORKER_CONCURRENCY", "4"))
     loglevel = os.getenv("CELERY_LOG_LEVEL", "info")
+    # 逗号分隔的队列列表，例如 "translate" 可单独启动翻译 worker；为空时消费全部队列
+    queues = os.getenv("CELERY_WORKER_QUEUES", "")
 
     print(f"启动Celery worker，并发数: {concurrency}, 日志级别: {loglevel}")
     from backend.config import settings
@@ -44,14 +46,18 @@ def main():
 
     # 创建并启动worker
     celery_app = create_celery_app()
-    celery_app.worker_main([
+    worker_args = [
         "worker",
         "--loglevel", loglevel,
         "--concurrency", str(concurrency),
         "--pool", "solo",
         "--time-limit", "3600",
         "--soft-time-limit", "3300",
-    ])
+    ]
+    if queues:
+        print(f"消费队列: {queues}")
+        worker_args += ["--queues", queues]
+    celery_app.worker_main(worker_args)
 
 if __name__ == "__main__":
     main()
@@ -3,11 +3,11 @@
 
 import asyncio
 import json
-import os
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
-from backend.services.chat_service import chat_service
+from backend.config import settings
+from backend.services.chat_service import CHAT_MODES, chat_service
 from backend.db.job_store import create_job
 from .models import ChatRequest, ChatResponse, ChatTaskResponse
 
@@ -23,6 +23,7 @@ def api_chat_with_transcripts_stream(payload: ChatRequest, request: Request):
         - question: str （必需）
         - api_key/base_url/model: 可选（若未提供则从 config 或环境变量读取）
         - transcript_ids: List[int] （必需，转录ID列表，支持单视频或多视频）
+        - mode: str （可选，auto / summary / retrieval，默认 auto：概括性问题用预生成的分层总结回答）
 
     返回：流式响应，带有标记的文本片段
     """
@@ -36,11 +37,13 @@ def api_chat_with_transcripts_stream(payload: ChatRequest, request: Request):
     if not question or not isinstance(question, str):
         raise HTTPException(status_code=400, detail="question (string) is required")
 
+    mode = payload.get("mode") or "auto"
+    if mode not in CHAT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(CHAT_MODES)}")
 
-    # 从配置或环境读取 CHAT_MAX_WINDOWS（优先级：环境变量 -> 默认 1000000）
-    chat_max = int(
-        os.environ.get("CHAT_MAX_WINDOWS") or 1000000
-    )
+
+    # CHAT_MAX_WINDOWS 从配置读取（环境变量 -> .env -> 默认 1000000）
+    chat_max = settings.chat_max_windows
 
     try:
         # 使用多视频流式chat逻辑（支持单视频和多视频）
@@ -48,6 +51,7 @@ def api_chat_with_transcripts_stream(payload: ChatRequest, request: Request):
             question=question,
             transcript_ids=transcript_ids,
             chat_max_windows=chat_max,
+            mode=mode,
         )
 
         return StreamingResponse(
@@ -68,6 +72,7 @@ def api_create_streaming_chat_task(payload: ChatRequest, request: Request) -> Ch
         - question: str （必需）
         - api_key/base_url/model: 可选（若未提供则从 config 或环境变量读取）
         - transcript_ids: List[int] （必需，转录ID列表，支持单视频或多视频）
+        - mode: str （可选，auto / summary / retrieval，默认 auto：概括性问题用预生成的分层总结回答）
 
     返回：{"task_id": int, "status": "pending"}
     """
@@ -80,14 +85,16 @@ def api_create_streaming_chat_task(payload: ChatRequest, request: Request) -> Ch
     if not question or not isinstance(question, str):
         raise HTTPException(status_code=400, detail="question (string) is required")
 
+    mode = payload.get("mode") or "auto"
+    if mode not in CHAT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(CHAT_MODES)}")
+
     api_key = payload.get("api_key")
     base_url = payload.get("base_url") 
     model = payload.get("model")
 
-    # 从配置或环境读取 CHAT_MAX_WINDOWS（优先级：环境变量 -> 默认 1000000）
-    chat_max = int(
-        os.environ.get("CHAT_MAX_WINDOWS") or 1000000
-    )
+    # CHAT_MAX_WINDOWS 从配置读取（环境变量 -> .env -> 默认 1000000）
+    chat_max = settings.chat_max_windows
 
     db_url = request.app.state.db_url
 
@@ -103,6 +110,7 @@ def api_create_streaming_chat_task(payload: ChatRequest, request: Request) -> Ch
             transcript_ids=transcript_ids,
             chat_max_windows=chat_max,
             db_url=db_url,
+            mode=mode,
         )
 
         # 更新任务的 celery_task_id
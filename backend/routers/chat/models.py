@@ -32,6 +32,7 @@ class ChatRequest(TypedDict, total=False):
     base_url: str  # OpenAI API基础URL
     model: str  # 使用的模型
     transcript_ids: Optional[List[int]]  # 可选，转录ID列表，用于知识库检索（支持单视频或多视频）
+    mode: str  # 可选，回答模式：auto（默认）/ summary（基于分层总结）/ retrieval（检索原文）
 
 
 class ChatTaskResponse(TypedDict):
@@ -1,18 +1,30 @@
 # -*- coding: utf-8 -*-
 """总结相关的路由"""
 
-import os
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from backend.text_process.summarize import summarize_segments
+from backend.config import settings
+from backend.services.summarize_service import (get_summarize_progress,
+                                                start_summarize_task)
+from backend.text_process.summarize import summarize_segments_async
+from backend.utils.token_utils.calculate_tokens import \
+    strip_segment_token_counts
 from .models import SummarizeRequest, SummarizeResponse
 
 
+class TranscriptSummarizeRequest(BaseModel):
+    force: bool = False  # 忽略已保存的总结，强制重新生成
+
+
 router = APIRouter()
 
 
 @router.post("/summarize")
-def api_summarize(payload: SummarizeRequest, request: Request) -> SummarizeResponse:
+async def api_summarize(payload: SummarizeRequest, request: Request) -> SummarizeResponse:
     """基于句级片段一次性生成总结。
 
         请求 body 字段：
@@ -24,14 +36,13 @@ def api_summarize(payload: SummarizeRequest, request: Request) -> SummarizeRespo
     segments = payload.get("segments")
     if not segments or not isinstance(segments, list):
         raise HTTPException(status_code=400, detail="segments (list) is required")
+    # 不信任请求中的 token_count，按文本重新计算
+    segments = strip_segment_token_counts(segments)
 
-    # 从配置或环境读取 CHAT_MAX_WINDOWS（优先级：环境变量 -> 默认 1000000）
-    chat_max = int(
-        os.environ.get("CHAT_MAX_WINDOWS") or 1000000
-    )
+    chat_max = settings.chat_max_windows
 
     try:
-        summaries = summarize_segments(
+        summaries = await summarize_segments_async(
             segments=segments,
             chat_max_windows=chat_max,
             max_tokens=4096,
@@ -44,4 +55,128 @@ def api_summarize(payload: SummarizeRequest, request: Request) -> SummarizeRespo
         raise HTTPException(status_code=500, detail=f"summarization failed: {e}")
 
     # 返回直接的 list[SummaryItem] 以简化前端处理
-    return {"summaries": summaries}
\ No newline at end of file
+    return {"summaries": summaries}
+
+
+@router.post("/summarize/stream")
+async def api_summarize_stream(payload: SummarizeRequest, request: Request):
+    """SSE 流式生成总结。
+
+    事件类型：
+        - progress: 分批总结进度 {"completed": int, "total": int}
+        - token: 最终输出的流式文本 {"content": str}
+        - complete: 解析后的总结 {"summaries": List[SummaryItem]}
+        - error: 错误信息 {"message": str}
+    """
+    segments = payload.get("segments")
+    if not segments or not isinstance(segments, list):
+        raise HTTPException(status_code=400, detail="segments (list) is required")
+    # 不信任请求中的 token_count，按文本重新计算
+    segments = strip_segment_token_counts(segments)
+
+    chat_max = settings.chat_max_windows
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_progress(completed: int, total: int):
+        await queue.put({"type": "progress", "completed": completed, "total": total})
+
+    async def on_token(content: str):
+        await queue.put({"type": "token", "content": content})
+
+    async def run_summarize():
+        try:
+            summaries = await summarize_segments_async(
+                segments=segments,
+                chat_max_windows=chat_max,
+                max_tokens=4096,
+                progress_callback=on_progress,
+                token_callback=on_token,
+            )
+            await queue.put({"type": "complete", "summaries": summaries})
+        except Exception as e:
+            await queue.put({"type": "error", "message": f"summarization failed: {e}"})
+
+    async def generate():
+        task = asyncio.create_task(run_summarize())
+        try:
+            while True:
+                event = await queue.get()
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["type"] in ("complete", "error"):
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
+
+
+@router.post("/transcripts/{transcript_id}/summarize")
+async def api_summarize_transcript(
+    transcript_id: int, request: Request, body: TranscriptSummarizeRequest
+):
+    """在后台生成并保存转写记录的总结。
+
+    分句从数据库读取；已保存的总结与当前分句内容一致时直接返回缓存，
+    否则投递后台任务，通过 /transcripts/{transcript_id}/summarize/stream 获取进度。
+
+    返回: {"status": "cached" | "started" | "running", "transcript_id": int, "summaries"?: list}
+    """
+    db_url = request.app.state.db_url
+    try:
+        return await start_summarize_task(transcript_id, db_url, force=body.force)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        # 转录存在但没有可总结的分句
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/transcripts/{transcript_id}/summarize/stream")
+async def api_summarize_progress_stream(transcript_id: int, request: Request):
+    """SSE流式获取总结进度，完成时在 complete 事件中附带总结结果。"""
+
+    def to_event(progress: dict) -> dict:
+        event = {"type": "progress", **progress}
+        if progress["status"] == "completed":
+            event["type"] = "complete"
+            event["is_complete"] = True
+        elif progress["status"] == "error":
+            event["type"] = "error"
+        return event
+
+    async def generate():
+        last_progress = None
+        while True:
+            try:
+                progress = get_summarize_progress(transcript_id)
+            except Exception as e:
+                error_data = {"type": "error", "message": f"获取进度失败: {str(e)}"}
+                yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+                break
+
+            # 只在进度发生变化时发送
+            if progress != last_progress:
+                last_progress = progress
+                event = to_event(progress)
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["type"] in ("complete", "error"):
+                    break
+
+            await asyncio.sleep(1)  # 每秒检查一次进度
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
@@ -18,6 +18,7 @@ class Segment(TypedDict, total=False):
     end_time: float
     spk_id: Optional[str]  # 说话人ID，可为空
     translation: Optional[Dict[str, str]]
+    token_count: int  # 句子的 token 数（默认 tokenizer），首次计算后缓存
 
 
 class SummaryItem(TypedDict):
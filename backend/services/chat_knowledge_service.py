@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 """聊天知识检索服务模块"""
 
+import logging
 import os
 from typing import List, Dict, Optional, Tuple
 
 from backend.schemas import Segment
 from backend.services.knowledge_base_service import knowledge_base
-from backend.db.transcript_crud import get_transcript_by_id
+from backend.db.transcript_crud import get_summary_hierarchy, get_transcript_by_id
+from backend.text_process.summarize import compute_summary_hash
 
 
 class ChatKnowledgeService:
@@ -39,8 +41,23 @@ class ChatKnowledgeService:
                     all_segments.extend(doc_details["sentences"])
         
         
-        # 获取文件名
-        transcript = get_transcript_by_id(None, transcript_id)
+        return all_segments, self._get_transcript_filename(transcript_id)
+
+    def _get_transcript_filename(self, transcript_id: int) -> str:
+        """
+        获取转录对应的来源文件名（优先视频文件）。
+
+        参数：
+        - transcript_id: 转录ID
+
+        返回：
+        - 来源文件名，找不到时为"未知文件"
+        """
+        return self._filename_of(get_transcript_by_id(None, transcript_id))
+
+    @staticmethod
+    def _filename_of(transcript: Optional[Dict]) -> str:
+        """从转录记录中取来源文件名（优先视频文件），找不到时为“未知文件”"""
         filename = "未知文件"
         if transcript:
             video_path = transcript.get("video_path")
@@ -49,8 +66,46 @@ class ChatKnowledgeService:
                 filename = os.path.basename(video_path)
             elif audio_path:
                 filename = os.path.basename(audio_path)
-        
-        return all_segments, filename
+        return filename
+
+    def _load_summary_tier(self, transcript_ids: List[int]) -> Optional[List[Dict]]:
+        """
+        读取预生成的分层总结（全文概要 + 主题总结）。
+
+        只要有一个转录还没有可用的总结就返回 None，由调用方回退到检索模式，
+        避免回答时遗漏部分视频。只使用由总结任务生成、且内容哈希与当前分句
+        一致的总结。
+
+        参数：
+        - transcript_ids: 转录ID列表
+
+        返回：
+        - [{"transcript_id", "filename", "overview", "sections"}, ...]，不可用时为 None
+        """
+        summary_tier = []
+        for transcript_id in transcript_ids:
+            try:
+                hierarchy = get_summary_hierarchy(None, transcript_id)
+                transcript = get_transcript_by_id(None, transcript_id)
+            except Exception as e:
+                logging.warning(f"读取转录 {transcript_id} 的分层总结失败: {e}")
+                return None
+            if not hierarchy or not transcript:
+                return None
+            # 手动保存的总结没有哈希，与当前分句不一致的总结已经过时，都不使用
+            content_hash = compute_summary_hash(transcript.get("segments") or [])
+            if hierarchy.get("hash") != content_hash:
+                logging.info(f"转录 {transcript_id} 的总结缺失哈希或已过时，回退到检索模式")
+                return None
+            summary_tier.append(
+                {
+                    "transcript_id": transcript_id,
+                    "filename": self._filename_of(transcript),
+                    "overview": hierarchy.get("overview"),
+                    "sections": hierarchy.get("sections") or [],
+                }
+            )
+        return summary_tier
 
     def _count_tokens_for_segments(self, segments: List[Segment]) -> int:
         """
@@ -6,10 +6,82 @@ from typing import List, Dict, Optional
 
 from backend.schemas import Segment
 
+# 概括性问题的关键词：命中时可以直接用预生成的分层总结回答，无需检索原文
+BROAD_QUESTION_KEYWORDS = (
+    "讲了什么", "讲的什么", "讲什么", "说了什么", "主要内容", "主要讲", "大概内容",
+    "内容是什么", "总结", "概括", "概要", "摘要", "要点", "大意", "梗概",
+    "what is this video about", "what's this video about", "what is it about",
+    "summary", "summarize", "overview", "main points", "key points", "tl;dr",
+)
+# 超过该长度的问题通常带有具体细节，即使包含关键词也交给检索模式
+BROAD_QUESTION_MAX_LENGTH = 24
+
 
 class ChatPromptService:
     """聊天提示词构建服务类"""
 
+    def _is_broad_question(self, question: str) -> bool:
+        """
+        判断是否为针对整个视频的概括性问题（如"这个视频讲了什么"）。
+
+        参数：
+        - question: 用户问题
+
+        返回：
+        - 是否为概括性问题
+        """
+        text = (question or "").strip().lower()
+        if not text or len(text) > BROAD_QUESTION_MAX_LENGTH:
+            return False
+        return any(keyword in text for keyword in BROAD_QUESTION_KEYWORDS)
+
+    def _build_summary_tier_prompt(self, question: str, summary_tier: List[Dict]) -> str:
+        """
+        构建基于分层总结的问答提示词。
+
+        只包含每个视频的全文概要和带时间范围的主题总结，不包含原始字幕，
+        提示词长度与视频时长基本无关。
+
+        参数：
+        - question: 用户问题
+        - summary_tier: _load_summary_tier 返回的分层总结列表
+
+        返回：
+        - 完整的提示词
+        """
+        header = f"""
+你是一个专业的多视频内容分析助手。下面是每个视频预先生成的全文概要和分主题总结，
+请基于这些内容，使用代码格式回答用户的问题。
+
+要求：
+1) 优先依据全文概要回答视频整体讲了什么，需要展开时再结合主题总结
+2) 引用某个主题时，在段落末尾添加一个时间戳，直接使用该主题的时间范围，格式为：[视频名 开始时间-结束时间]
+3) 时间戳后需要换行，以便区分不同段落；禁止在句子中间添加时间戳
+4) 只依据给出的总结回答，不要编造总结中没有的细节
+5) 保持回答简洁清晰，使用中文
+
+用户问题：{question}
+
+多视频总结内容：
+""".strip()
+
+        body_lines = []
+        for video in summary_tier:
+            filename = video["filename"]
+            body_lines.append(f"[视频开始: {filename}]")
+            overview = (video.get("overview") or "").strip()
+            if overview:
+                body_lines.append(f"  [全文概要] {overview}")
+            for section in video.get("sections", []):
+                st = section.get("start_time", 0.0)
+                ed = section.get("end_time", st)
+                summary = (section.get("summary") or "").replace("\n", " ").strip()
+                body_lines.append(f"  [{filename} {st:.2f}-{ed:.2f}] {section.get('topic', '')}：{summary}")
+            body_lines.append(f"[视频结束: {filename}]")
+            body_lines.append("")  # 视频间空行
+
+        return header + "\n" + "\n".join(body_lines)
+
     def _build_multi_video_prompt(self, segments: List[Segment], question: str, video_info: List[Dict]) -> str:
         """
         构建多视频问答的提示词。
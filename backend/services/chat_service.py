@@ -32,6 +32,9 @@ from backend.services.chat_prompt_service import ChatPromptService
 from backend.services.chat_knowledge_service import ChatKnowledgeService
 from backend.startup import get_llm_router
 
+# 聊天回答模式：auto 按问题自动选择，summary 基于分层总结，retrieval 检索原文
+CHAT_MODES = ("auto", "summary", "retrieval")
+
 
 class ChatService(ChatPromptService, ChatKnowledgeService):
     """聊天服务类"""
@@ -46,6 +49,7 @@ class ChatService(ChatPromptService, ChatKnowledgeService):
         transcript_ids: List[int],
         chat_max_windows: int = 1_000_000,
         stream_callback: Optional[callable] = None,
+        mode: str = "auto",
     ):
         """
         基于多个转录内容进行智能问答（流式版本）。
@@ -55,10 +59,29 @@ class ChatService(ChatPromptService, ChatKnowledgeService):
             transcript_ids: 转录ID列表（支持单视频或多视频）
             chat_max_windows: 最大token限制
             stream_callback: 流式回调函数，如果提供则使用回调，否则使用yield
+            mode: 回答模式
+                - "auto": 概括性问题使用预生成的分层总结回答，其余问题检索原文
+                - "summary": 始终使用分层总结回答
+                - "retrieval": 始终检索原文片段
+                总结尚未生成时回退到检索模式。
 
         生成器函数，逐个返回带有标记的文本片段。
         标记格式：[chunk]文本内容[/chunk]
         """
+        # 概括性问题直接用分层总结回答，跳过向量检索，提示词也小得多
+        if mode == "summary" or (mode == "auto" and self._is_broad_question(question)):
+            summary_tier = self._load_summary_tier(transcript_ids)
+            if summary_tier:
+                logger.info(f"使用分层总结回答问题，transcript_ids={transcript_ids}")
+                prompt = self._build_summary_tier_prompt(question, summary_tier)
+                for item in self._perform_streaming_completion(
+                    prompt=prompt,
+                    stream_callback=stream_callback
+                ):
+                    yield item
+                return
+            logger.info("分层总结尚未生成，回退到检索模式")
+
         # 对每个transcript_id执行检索
         all_segments = []
         video_info = []
@@ -0,0 +1,219 @@
+"""总结服务层"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from backend.config import settings
+from backend.db.transcript_crud import (get_summaries_with_hash,
+                                        get_transcript_by_id, save_summaries)
+from backend.text_process.summarize import (compute_summary_hash,
+                                            summarize_overview_async,
+                                            summarize_segments_async)
+from backend.startup import get_db_url
+from backend.routers.progress_router import redis_client
+
+
+def _lock_key(transcript_id: int) -> str:
+    """同一转录同一时间只允许一个总结任务"""
+    return f"summarize_lock:{transcript_id}"
+
+
+def _task_key(transcript_id: int) -> str:
+    """总结任务状态，供 SSE 进度接口读取"""
+    return f"summarize_task:{transcript_id}"
+
+
+def _set_task_data(transcript_id: int, task_data: Dict[str, Any]) -> None:
+    """写入总结任务状态"""
+    redis_client.set(_task_key(transcript_id), json.dumps(task_data, ensure_ascii=False))
+
+
+def release_summarize_lock(transcript_id: int, lock_token: str) -> None:
+    """释放总结锁（只释放自己持有的锁）"""
+    key = _lock_key(transcript_id)
+    try:
+        if redis_client.get(key) == lock_token:
+            redis_client.delete(key)
+    except Exception as e:
+        logging.warning(f"释放总结锁失败: {e}")
+
+
+def dispatch_summarize_task(transcript_id: int, db_url: Optional[str] = None) -> str:
+    """
+    加锁去重后把总结任务投递到 Celery 的 summarize 队列（同步，可在 worker 中调用）。
+
+    返回 "started"；同一转录已有总结任务在执行时返回 "running"。
+    """
+    db_url = db_url or get_db_url()
+    lock_token = uuid.uuid4().hex
+    acquired = redis_client.set(
+        _lock_key(transcript_id),
+        lock_token,
+        nx=True,
+        ex=settings.celery_task_time_limit,
+    )
+    if not acquired:
+        logging.info(f"转录 {transcript_id} 已有总结任务在执行，跳过投递")
+        return "running"
+
+    _set_task_data(
+        transcript_id,
+        {"status": "summarizing", "progress": 0, "message": "总结任务排队中..."},
+    )
+
+    from backend.queues.tasks import summarize_transcript_task
+
+    try:
+        summarize_transcript_task.apply_async(
+            kwargs={
+                "transcript_id": transcript_id,
+                "lock_token": lock_token,
+                "db_url": db_url,
+            },
+            queue="summarize",
+        )
+    except Exception:
+        release_summarize_lock(transcript_id, lock_token)
+        raise
+    return "started"
+
+
+async def start_summarize_task(
+    transcript_id: int, db_url: Optional[str] = None, force: bool = False
+) -> Dict[str, Any]:
+    """
+    启动总结任务。
+
+    已保存的总结与当前分句内容哈希一致时直接返回缓存结果；
+    否则加锁去重后投递到 Celery 的 summarize 队列。
+
+    转录不存在时抛出 LookupError，转录没有分句时抛出 ValueError。
+    """
+    db_url = db_url or get_db_url()
+    data = await asyncio.to_thread(get_transcript_by_id, db_url, transcript_id)
+    if not data:
+        raise LookupError(f"transcript not found: {transcript_id}")
+    segments = data.get("segments", [])
+    if not segments:
+        raise ValueError("No segments to summarize")
+
+    content_hash = compute_summary_hash(segments)
+    if not force:
+        summaries, saved_hash = await asyncio.to_thread(
+            get_summaries_with_hash, db_url, transcript_id
+        )
+        if summaries and saved_hash == content_hash:
+            logging.info(f"转录 {transcript_id} 的总结命中缓存")
+            _set_task_data(
+                transcript_id,
+                {
+                    "status": "completed",
+                    "progress": 100,
+                    "message": "总结完成（缓存）",
+                    "summaries": summaries,
+                },
+            )
+            return {
+                "status": "cached",
+                "transcript_id": transcript_id,
+                "summaries": summaries,
+            }
+
+    # 同一转录已有总结任务在执行时不重复投递
+    status = await asyncio.to_thread(dispatch_summarize_task, transcript_id, db_url)
+    return {"status": status, "transcript_id": transcript_id}
+
+
+async def run_summarize_job(
+    transcript_id: int, db_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    执行总结任务（在 Celery worker 中运行）。
+
+    从数据库读取分句，先生成带时间范围的主题总结，再由主题总结归纳全文概要，
+    两层总结连同内容哈希一起保存，进度写入 Redis。概要生成失败时只保存主题总结。
+    """
+    db_url = db_url or get_db_url()
+    try:
+        data = await asyncio.to_thread(get_transcript_by_id, db_url, transcript_id)
+        if not data:
+            raise ValueError(f"transcript not found: {transcript_id}")
+        segments = data.get("segments", [])
+        content_hash = compute_summary_hash(segments)
+
+        _set_task_data(
+            transcript_id,
+            {"status": "summarizing", "progress": 0, "message": "正在生成总结..."},
+        )
+
+        def progress_callback(completed: int, total: int):
+            """更新分批总结进度（归并阶段保留 10% 余量）"""
+            progress = round(completed / total * 90) if total > 0 else 0
+            _set_task_data(
+                transcript_id,
+                {
+                    "status": "summarizing",
+                    "progress": progress,
+                    "message": f"总结进度：{completed}/{total} 批",
+                },
+            )
+
+        summaries = await summarize_segments_async(
+            segments,
+            chat_max_windows=settings.chat_max_windows,
+            max_tokens=4096,
+            progress_callback=progress_callback,
+        )
+
+        _set_task_data(
+            transcript_id,
+            {"status": "summarizing", "progress": 95, "message": "正在生成全文概要..."},
+        )
+        try:
+            overview = await summarize_overview_async(summaries) or None
+        except Exception as e:
+            logging.warning(f"全文概要生成失败，只保存主题总结: {e}")
+            overview = None
+
+        saved = await asyncio.to_thread(
+            save_summaries, db_url, transcript_id, summaries, content_hash, overview
+        )
+        if not saved:
+            raise RuntimeError("保存总结到数据库失败")
+
+        _set_task_data(
+            transcript_id,
+            {
+                "status": "completed",
+                "progress": 100,
+                "message": f"总结完成：{len(summaries)} 个主题",
+                "summaries": summaries,
+                "overview": overview,
+            },
+        )
+        return {"transcript_id": transcript_id, "summary_count": len(summaries)}
+
+    except Exception as e:
+        logging.error(f"总结出错: {e}")
+        _set_task_data(
+            transcript_id,
+            {"status": "error", "progress": 0, "message": str(e)},
+        )
+        raise
+
+
+def get_summarize_progress(transcript_id: int) -> Dict[str, Any]:
+    """获取总结进度"""
+    task_data_json = redis_client.get(_task_key(transcript_id))
+    if not task_data_json:
+        return {"status": "idle", "progress": 0, "message": "未进行总结"}
+
+    try:
+        return json.loads(task_data_json)
+    except json.JSONDecodeError:
+        return {"status": "error", "progress": 0, "message": "进度数据格式错误"}
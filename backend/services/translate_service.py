@@ -5,14 +5,41 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from typing import Any, Callable, Dict, Optional
+import uuid
+from typing import Any, Dict, Optional
 
-from backend.db.transcript_crud import (get_translations, save_translations,
-                                        update_transcript)
-from backend.text_process.translate import translate_segments_async
+from backend.config import settings
+from backend.db.transcript_crud import (get_transcript_by_id, get_translations,
+                                        save_segment_translations,
+                                        save_translations, update_transcript)
+from backend.text_process.translate import (TranslationMemory,
+                                            translate_segments_async)
 from backend.startup import get_db_url
 from backend.routers.progress_router import redis_client
 
+# 全局翻译记忆：跨转录复用重复句子的译文，并累计命中率统计
+translation_memory = TranslationMemory(get_db_url())
+
+
+def _lock_key(transcript_id: int) -> str:
+    """同一转录同一时间只允许一个翻译任务"""
+    return f"translate_lock:{transcript_id}"
+
+
+def _set_task_data(transcript_id: int, task_data: Dict[str, Any]) -> None:
+    """写入翻译任务状态，供 SSE 进度接口读取"""
+    redis_client.set(f"translate_task:{transcript_id}", json.dumps(task_data))
+
+
+def release_translate_lock(transcript_id: int, lock_token: str) -> None:
+    """释放翻译锁（只释放自己持有的锁）"""
+    key = _lock_key(transcript_id)
+    try:
+        if redis_client.get(key) == lock_token:
+            redis_client.delete(key)
+    except Exception as e:
+        logging.warning(f"释放翻译锁失败: {e}")
+
 
 async def start_translate_task(
     transcript_id: int,
@@ -24,11 +51,27 @@ async def start_translate_task(
     target_lang_display_name: str,
     force_retranslate: bool = False,
 ) -> Dict[str, Any]:
-    """启动翻译任务"""
+    """启动翻译任务：加锁去重后投递到 Celery 的 translate 队列"""
     logging.info(
         f"翻译请求开始 - transcript_id: {transcript_id}, target_lang_code: {target_lang_code}, force_retranslate: {force_retranslate}"
     )
 
+    # 同一转录已有翻译任务在执行时不重复投递
+    lock_token = uuid.uuid4().hex
+    acquired = redis_client.set(
+        _lock_key(transcript_id),
+        lock_token,
+        nx=True,
+        ex=settings.celery_task_time_limit,
+    )
+    if not acquired:
+        logging.info(f"转录 {transcript_id} 已有翻译任务在执行，跳过投递")
+        return {
+            "status": "running",
+            "transcript_id": transcript_id,
+            "total_count": len(segments),
+        }
+
     # 如果是强制重新翻译，清除之前的翻译结果
     if force_retranslate:
         db_url = get_db_url()
@@ -41,45 +84,61 @@ async def start_translate_task(
                 del existing_translations[target_lang_code]
                 await asyncio.to_thread(save_translations, db_url, transcript_id, existing_translations)
                 logging.info(f"清除之前的翻译结果: {target_lang_code}")
-            
-            # 清除segments中的翻译内容
-            for seg in segments:
+
+            # 清除数据库中segments的翻译内容（修改数据库中的副本，不用请求体覆盖，
+            # 避免写入请求方传入的 token_count 等字段）
+            data = await asyncio.to_thread(get_transcript_by_id, db_url, transcript_id)
+            db_segments = (data or {}).get("segments") or []
+            cleared = False
+            for seg in db_segments:
                 if seg.get("translation") and target_lang_code in seg.get("translation", {}):
                     del seg["translation"][target_lang_code]
                     # 如果translation为空，删除整个字段
                     if not seg["translation"]:
                         del seg["translation"]
-            
+                    cleared = True
+
             # 更新数据库中的segments
-            await asyncio.to_thread(update_transcript, db_url, transcript_id, segments)
-            logging.info(f"清除segments中的翻译内容: {target_lang_code}")
+            if cleared:
+                await asyncio.to_thread(update_transcript, db_url, transcript_id, db_segments)
+                logging.info(f"清除segments中的翻译内容: {target_lang_code}")
         except Exception as e:
             logging.warning(f"清除之前的翻译结果失败: {e}")
 
     # 初始化任务状态到Redis（重置进度）
-    task_data = {
-        "status": "translating",
-        "progress": 0,
-        "translated_count": 0,
-        "total_count": len(segments),
-        "target_lang_code": target_lang_code,
-        "message": "翻译中...",
-    }
-    redis_client.set(f"translate_task:{transcript_id}", json.dumps(task_data))
+    _set_task_data(
+        transcript_id,
+        {
+            "status": "translating",
+            "progress": 0,
+            "translated_count": 0,
+            "total_count": len(segments),
+            "target_lang_code": target_lang_code,
+            "message": "翻译任务排队中...",
+        },
+    )
 
-    # 启动后台翻译任务
-    asyncio.create_task(
-        _background_translate(
-            transcript_id,
-            segments,
-            target_lang_code,
-            max_tokens,
-            source_lang_code,
-            source_lang_display_name,
-            target_lang_display_name,
-            force_retranslate,
+    # 投递到 Celery 翻译队列，由 worker 执行，API 进程不再承担翻译负载
+    from backend.queues.tasks import translate_transcript_task
+
+    try:
+        translate_transcript_task.apply_async(
+            kwargs={
+                "transcript_id": transcript_id,
+                "target_lang_code": target_lang_code,
+                "max_tokens": max_tokens,
+                "source_lang_code": source_lang_code,
+                "source_lang_display_name": source_lang_display_name,
+                "target_lang_display_name": target_lang_display_name,
+                "force_retranslate": force_retranslate,
+                "lock_token": lock_token,
+                "db_url": get_db_url(),
+            },
+            queue="translate",
         )
-    )
+    except Exception:
+        release_translate_lock(transcript_id, lock_token)
+        raise
 
     return {
         "status": "started",
@@ -88,38 +147,81 @@ async def start_translate_task(
     }
 
 
-async def _background_translate(
+async def run_translate_job(
     transcript_id: int,
-    segments: list,
     target_lang_code: str,
     max_tokens: int,
     source_lang_code: str,
     source_lang_display_name: str,
     target_lang_display_name: str,
+    db_url: Optional[str] = None,
     force_retranslate: bool = False,
-):
-    """后台翻译任务"""
-    db_url = get_db_url()
+) -> Dict[str, Any]:
+    """
+    执行翻译任务（在 Celery worker 中运行）。
+
+    每批翻译完成后立即增量写入数据库的 segments_json，任务被中断后重新执行时
+    从数据库读取的分句已包含完成的翻译，只会翻译剩余的分句。
+    强制重新翻译时不复用翻译记忆，所有分句都重新送入 LLM，新译文回写到记忆中。
+    """
+    db_url = db_url or get_db_url()
+    total_count = 0
     try:
+        data = await asyncio.to_thread(get_transcript_by_id, db_url, transcript_id)
+        if not data:
+            raise ValueError(f"transcript not found: {transcript_id}")
+        segments = data.get("segments", [])
         total_count = len(segments)
 
-        def progress_callback(translated_count: int, total: int):
-            """更新翻译进度"""
-            progress = round(translated_count / total * 100) if total > 0 else 0
-            task_data = {
+        # 进度从数据库中的实际状态开始（中断后恢复时包含已完成的分句）
+        done_count = sum(
+            1
+            for seg in segments
+            if target_lang_code in (seg.get("translation") or {})
+        )
+        if done_count:
+            logging.info(f"数据库中已有 {done_count} 个分句完成翻译，从剩余分句继续")
+        _set_task_data(
+            transcript_id,
+            {
                 "status": "translating",
-                "progress": progress,
-                "translated_count": translated_count,
+                "progress": round(done_count / total_count * 100) if total_count else 0,
+                "translated_count": done_count,
                 "total_count": total_count,
                 "target_lang_code": target_lang_code,
-                "message": f"翻译进度：{translated_count}/{total_count}",
-            }
-            redis_client.set(f"translate_task:{transcript_id}", json.dumps(task_data))
+                "message": f"翻译进度：{done_count}/{total_count}",
+            },
+        )
+
+        async def save_batch(batch_translations: Dict[int, str]):
+            """每批完成后立即提交到数据库"""
+            await asyncio.to_thread(
+                save_segment_translations,
+                db_url,
+                transcript_id,
+                target_lang_code,
+                batch_translations,
+            )
+
+        def progress_callback(translated_count: int, total: int):
+            """更新翻译进度"""
+            progress = round(translated_count / total * 100) if total > 0 else 0
+            _set_task_data(
+                transcript_id,
+                {
+                    "status": "translating",
+                    "progress": progress,
+                    "translated_count": translated_count,
+                    "total_count": total_count,
+                    "target_lang_code": target_lang_code,
+                    "message": f"翻译进度：{translated_count}/{total_count}",
+                },
+            )
             logging.info(
                 f"翻译进度 - {translated_count}/{total_count} ({progress:.1f}%)"
             )
 
-        # 执行翻译
+        # 执行翻译（强制重译时旧结果已在投递前清除，翻译记忆也不再查询）
         logging.info(f"开始翻译 {total_count} 个分句")
         translated_segments = await translate_segments_async(
             segments,
@@ -130,15 +232,10 @@ async def _background_translate(
             target_lang_display_name=target_lang_display_name,
             progress_callback=progress_callback,
             force_retranslate=force_retranslate,
+            translation_memory=translation_memory,
+            on_batch_translated=save_batch,
         )
-        logging.info(f"翻译完成，开始保存到数据库")
-
-        # 更新segments中的翻译内容
-        logging.info(f"更新segments中的翻译内容")
-        success_update_segments = await asyncio.to_thread(
-            update_transcript, db_url, transcript_id, translated_segments
-        )
-        logging.info(f"Segments数据库保存结果: success={success_update_segments}")
+        logging.info(f"翻译完成，分句翻译已逐批保存，开始汇总翻译结果")
 
         # 构建翻译结果对象并保存
         translations_dict = {target_lang_code: []}
@@ -170,42 +267,57 @@ async def _background_translate(
         )
         logging.info(f"翻译结果保存结果: success={success_save_trans}")
 
-        if success_update_segments and success_save_trans:
-            translated_count = len(translations_dict[target_lang_code])
+        translated_count = len(translations_dict[target_lang_code])
+        if success_save_trans:
             logging.info(f"最终统计: {translated_count}/{total_count} 个分句已翻译")
-            task_data = {
-                "status": "completed",
-                "progress": 100,
-                "translated_count": translated_count,
-                "total_count": total_count,
-                "target_lang_code": target_lang_code,
-                "message": f"翻译完成：{translated_count}/{total_count}",
-            }
-            redis_client.set(f"translate_task:{transcript_id}", json.dumps(task_data))
+            _set_task_data(
+                transcript_id,
+                {
+                    "status": "completed",
+                    "progress": 100,
+                    "translated_count": translated_count,
+                    "total_count": total_count,
+                    "target_lang_code": target_lang_code,
+                    "message": f"翻译完成：{translated_count}/{total_count}",
+                    "memory_stats": translation_memory.get_stats(),
+                },
+            )
             logging.info(f"翻译完成 - {translated_count}/{total_count}")
         else:
-            task_data = {
+            _set_task_data(
+                transcript_id,
+                {
+                    "status": "error",
+                    "progress": 0,
+                    "translated_count": 0,
+                    "total_count": total_count,
+                    "target_lang_code": target_lang_code,
+                    "message": "保存到数据库失败",
+                },
+            )
+            logging.error(f"保存翻译结果失败")
+
+        return {
+            "transcript_id": transcript_id,
+            "target_lang_code": target_lang_code,
+            "translated_count": translated_count,
+            "total_count": total_count,
+        }
+
+    except Exception as e:
+        logging.error(f"翻译出错: {e}")
+        _set_task_data(
+            transcript_id,
+            {
                 "status": "error",
                 "progress": 0,
                 "translated_count": 0,
                 "total_count": total_count,
                 "target_lang_code": target_lang_code,
-                "message": "保存到数据库失败",
-            }
-            redis_client.set(f"translate_task:{transcript_id}", json.dumps(task_data))
-            logging.error(f"保存翻译结果失败")
-
-    except Exception as e:
-        logging.error(f"翻译出错: {e}")
-        task_data = {
-            "status": "error",
-            "progress": 0,
-            "translated_count": 0,
-            "total_count": len(segments),
-            "target_lang_code": target_lang_code,
-            "message": str(e),
-        }
-        redis_client.set(f"translate_task:{transcript_id}", json.dumps(task_data))
+                "message": str(e),
+            },
+        )
+        raise
 
 
 def get_translate_progress(transcript_id: int) -> Dict[str, Any]:
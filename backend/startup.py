@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 
 from backend.db.transcript_init import init_transcript_table
 from backend.db.job_base_store import init_job_table
+from backend.db.translation_memory_crud import init_translation_memory_table
 from backend.config import settings
 from litellm import Router
 
@@ -113,6 +114,7 @@ def initialize_app() -> tuple[Path, str | None]:
     db_url = os.environ.get("POSTGRES_DSN") or os.environ.get("DATABASE_URL") or f"postgresql://{settings.postgres_user}:{settings.postgres_password}@{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}"
     init_transcript_table(db_url)
     init_job_table(db_url)
+    init_translation_memory_table(db_url)
 
     # 初始化 LLM Router
     initialize_llm_router()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ReAct 动作解析：同一步内的多组动作，以及流式输出时提前结束生成的判断。
+"""
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.ReAct import action_parser  # noqa: E402
+
+
+def test_parse_multiple_actions_in_order():
+    text = (
+        "Thought: 需要分别检索两个视频\n"
+        "Action: knowledge_retrieval\n"
+        'Action Input: {"query": "索引", "transcript_ids": [1]}\n'
+        "Action: web_search\n"
+        'Action Input: {"query": "向量数据库"}\n'
+    )
+
+    assert action_parser.parse_actions(text) == [
+        ("knowledge_retrieval", {"query": "索引", "transcript_ids": [1]}),
+        ("web_search", {"query": "向量数据库"}),
+    ]
+
+
+def test_parse_actions_missing_or_invalid_input():
+    text = (
+        "Action: first\n"
+        "Action: second\n"
+        "Action Input: not json\n"
+        'Action Input: {"ignored": true}\n'
+    )
+
+    assert action_parser.parse_actions(text) == [("first", None), ("second", {})]
+
+
+def test_parse_actions_with_indented_lines():
+    text = (
+        "Thought: 需要检索\n"
+        "  Action: knowledge_retrieval\n"
+        '  Action Input: {"query": "索引"}\n'
+    )
+
+    assert action_parser.parse_actions(text) == [
+        ("knowledge_retrieval", {"query": "索引"}),
+    ]
+    # 流式解析同样识别缩进的动作块，并在其后停止
+    parser = action_parser.StreamingActionParser()
+    assert _feed_all(parser, text + "Observation: 编造\n") is not None
+    assert action_parser.parse_actions(parser.response_text) == [
+        ("knowledge_retrieval", {"query": "索引"}),
+    ]
+
+
+def test_parse_actions_without_actions():
+    assert action_parser.parse_actions("Thought: 可以直接回答\nFinal Answer: 你好") == []
+
+
+def _feed_all(parser, text):
+    """逐字符输入，返回判定停止时已输入的字符数（未停止时为 None）"""
+    for i, ch in enumerate(text):
+        if parser.feed(ch):
+            return i + 1
+    return None
+
+
+def test_streaming_stops_after_action_block():
+    text = (
+        "Thought: 需要检索\n"
+        "Action: knowledge_retrieval\n"
+        'Action Input: {"query": "索引"}\n'
+        "Observation: 模型编造的观察结果\n"
+    )
+    parser = action_parser.StreamingActionParser()
+
+    stopped_at = _feed_all(parser, text)
+
+    # "O" 不可能是 "Action:" 的开头，读到它就可以停止
+    assert stopped_at == text.index("Observation") + 1
+    assert parser.response_text == text[: text.index("Observation")].rstrip()
+    assert action_parser.parse_actions(parser.response_text) == [
+        ("knowledge_retrieval", {"query": "索引"})
+    ]
+
+
+def test_streaming_keeps_consecutive_actions():
+    text = 'Action: a\nAction Input: {"x": 1}\nAct'
+    parser = action_parser.StreamingActionParser()
+
+    # 未完整的 "Act" 仍可能是下一组动作
+    assert _feed_all(parser, text) is None
+    assert not parser.feed('ion: b\nAction Input: {"y": 2}\n')
+    assert parser.feed("Thought")
+    actions = action_parser.parse_actions(parser.response_text)
+    assert [name for name, _ in actions] == ["a", "b"]
+
+
+def test_streaming_waits_for_action_input():
+    parser = action_parser.StreamingActionParser()
+
+    assert not parser.feed("Action: a\nThought: 还没有输入\n")
+    assert not parser.stopped
+
+
+def test_streaming_never_stops_in_final_answer():
+    parser = action_parser.StreamingActionParser()
+    text = "Thought: 可以直接回答\nFinal Answer: 第一行\nAction: 文本内容\n其他内容\n"
+
+    assert _feed_all(parser, text) is None
+    assert parser.response_text == text
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+测试分句 token 数计算：缓存字段的复用与外部传入字段的清理。
+"""
+import os
+import sys
+
+import pytest
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.utils.token_utils import calculate_tokens  # noqa: E402
+
+
+class _WordCalculator(calculate_tokens.TokenCalculator):
+    """按空格分词计数，结果确定，便于断言"""
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+
+@pytest.fixture(autouse=True)
+def word_calculator(monkeypatch):
+    monkeypatch.setattr(
+        calculate_tokens, "get_token_calculator", lambda *args: _WordCalculator()
+    )
+
+
+def test_strip_segment_token_counts():
+    segments = [{"index": 0, "sentence": "a b c", "token_count": 1}]
+    stripped = calculate_tokens.strip_segment_token_counts(segments)
+
+    assert "token_count" not in stripped[0]
+    assert segments[0]["token_count"] == 1
+    assert calculate_tokens.count_segment_tokens(stripped) == [3]
+
+
+def _token_index(counts):
+    segments = [
+        {"index": i, "sentence": "x", "token_count": count}
+        for i, count in enumerate(counts)
+    ]
+    return calculate_tokens.SegmentTokenIndex(segments)
+
+
+def test_segment_token_index_range_tokens():
+    index = _token_index([3, 1, 4, 1, 5])
+
+    assert len(index) == 5
+    assert index.range_tokens(1, 4) == 6
+    assert index.total_tokens() == 14
+
+
+def test_find_range_end_matches_linear_scan():
+    counts = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+    index = _token_index(counts)
+
+    for start in range(len(counts)):
+        for budget in range(0, 40):
+
+            def fits(batch_start, batch_end):
+                return index.range_tokens(batch_start, batch_end) <= budget
+
+            expected = start + 1
+            while expected < len(counts) and fits(start, expected + 1):
+                expected += 1
+            assert index.find_range_end(start, len(counts), fits) == expected
+
+
+def test_find_range_end_respects_max_end():
+    index = _token_index([1] * 10)
+
+    assert index.find_range_end(2, 5, lambda s, e: True) == 5
+    # 单个分句超出约束时仍返回只含一个分句的区间
+    assert index.find_range_end(2, 5, lambda s, e: False) == 3
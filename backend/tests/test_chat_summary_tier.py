@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+测试基于分层总结的问答路由：概括性问题的判断、总结哈希校验，
+以及 auto/summary/retrieval 模式下的选择。
+"""
+import os
+import sys
+
+import pytest
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.services import chat_knowledge_service  # noqa: E402
+from backend.services.chat_service import ChatService  # noqa: E402
+from backend.text_process.summarize import compute_summary_hash  # noqa: E402
+
+SEGMENTS = [{"index": 0, "sentence": "你好", "start_time": 0.0, "end_time": 1.0}]
+SECTIONS = [{"topic": "问候", "summary": "打招呼", "start_time": 0.0, "end_time": 1.0}]
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("这个视频讲了什么？", True),
+        ("总结一下", True),
+        ("Give me a summary", True),
+        ("第三分钟提到的那个实验具体用了哪些材料，为什么要先加热再总结结果？", False),
+        ("作者的名字是什么", False),
+        ("", False),
+    ],
+)
+def test_is_broad_question(question, expected):
+    assert ChatService()._is_broad_question(question) is expected
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """替换数据库读取，返回可修改的分层总结记录"""
+    hierarchy = {
+        "overview": "概要",
+        "sections": SECTIONS,
+        "hash": compute_summary_hash(SEGMENTS),
+    }
+    transcript = {"segments": SEGMENTS, "video_path": "/data/demo.mp4"}
+    monkeypatch.setattr(
+        chat_knowledge_service, "get_summary_hierarchy", lambda db_url, tid: hierarchy
+    )
+    monkeypatch.setattr(
+        chat_knowledge_service, "get_transcript_by_id", lambda db_url, tid: transcript
+    )
+    return hierarchy
+
+
+def test_load_summary_tier_when_hash_matches(stored):
+    assert ChatService()._load_summary_tier([1]) == [
+        {
+            "transcript_id": 1,
+            "filename": "demo.mp4",
+            "overview": "概要",
+            "sections": SECTIONS,
+        }
+    ]
+
+
+@pytest.mark.parametrize("saved_hash", [None, "stale"])
+def test_load_summary_tier_ignores_missing_or_stale_hash(stored, saved_hash):
+    stored["hash"] = saved_hash
+
+    assert ChatService()._load_summary_tier([1]) is None
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    """记录问答走的是分层总结还是检索原文"""
+    calls = []
+    service = ChatService()
+    monkeypatch.setattr(
+        service,
+        "_load_summary_tier",
+        lambda ids: calls.append("summary") or [{"sections": []}],
+    )
+    monkeypatch.setattr(
+        service, "_build_summary_tier_prompt", lambda question, tier: "prompt"
+    )
+    monkeypatch.setattr(
+        service,
+        "_perform_streaming_completion",
+        lambda prompt, stream_callback: iter(["ok"]),
+    )
+    monkeypatch.setattr(
+        service,
+        "_perform_knowledge_retrieval",
+        lambda question, tid: calls.append("retrieval") or ([], ""),
+    )
+    return service, calls
+
+
+@pytest.mark.parametrize(
+    "question, mode, expected",
+    [
+        ("这个视频讲了什么", "auto", ["summary"]),
+        ("作者的名字是什么", "auto", ["retrieval"]),
+        ("作者的名字是什么", "summary", ["summary"]),
+        ("这个视频讲了什么", "retrieval", ["retrieval"]),
+    ],
+)
+def test_chat_mode_routing(routed, question, mode, expected):
+    service, calls = routed
+
+    list(service.chat_with_transcripts_stream(question, [1], mode=mode))
+
+    assert calls == expected
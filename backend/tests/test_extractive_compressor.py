@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+测试检索结果的抽取式压缩：
+- 使用与 knowledge_base_service.get_doc_details 返回的 sentences 相同结构的片段
+  （sentence / start_time / end_time）；
+- 内容超出长度限制时应直接得到抽取结果，不调用 LLM。
+"""
+import asyncio
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.ReAct.extractive_compressor import \
+    ExtractiveCompressor  # noqa: E402
+from backend.ReAct.summary_compressor import \
+    RetrievalSummaryCompressor  # noqa: E402
+
+
+class _NoLLMRouter:
+    """被调用即失败的 LLM 路由"""
+
+    async def acompletion(self, **kwargs):
+        raise AssertionError("抽取式压缩成功时不应调用 LLM")
+
+
+def _doc_details_sentences(transcript_id: int, count: int):
+    """构造与 get_doc_details 相同结构的句子"""
+    sentences = []
+    for i in range(count):
+        if i % 5 == 0:
+            text = f"第{i}句：向量数据库使用近似最近邻索引加速检索。"
+        else:
+            text = f"第{i}句：今天的天气很好，我们一起去公园散步吧。"
+        sentences.append(
+            {
+                "index": i,
+                "sentence": text,
+                "start_time": i * 2.0,
+                "end_time": i * 2.0 + 1.5,
+                "spk_id": "0",
+                "transcript_id": transcript_id,
+            }
+        )
+    return sentences
+
+
+def test_score_segments_reads_sentence_field():
+    segments = _doc_details_sentences(1, 10)
+    scores = ExtractiveCompressor().score_segments("向量数据库的索引", segments)
+    assert scores[0] > 0
+    assert scores[5] > 0
+    assert scores[1] == 0
+
+
+def test_compress_without_llm():
+    compressor = RetrievalSummaryCompressor.__new__(RetrievalSummaryCompressor)
+    compressor.llm_router = _NoLLMRouter()
+    compressor.extractive_compressor = ExtractiveCompressor()
+
+    results = [
+        {"filename": "a.mp4", "segments": _doc_details_sentences(1, 60)},
+        {"filename": "b.mp4", "segments": _doc_details_sentences(2, 60)},
+    ]
+    output = asyncio.run(
+        compressor.compress_multiple_files_results("向量数据库的索引", results, 1500)
+    )
+
+    assert output.startswith("检索结果概览")
+    assert "近似最近邻" in output
+    assert "[0.00-1.50]" in output
+    assert "散步" not in output
+    assert len(output.split("相关内容:\n", 1)[1]) <= 1500
+
+
+if __name__ == "__main__":
+    test_score_segments_reads_sentence_field()
+    test_compress_without_llm()
+    print("全部通过")
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+测试快速分块器：基于 token 位置的线性分块、分隔符对齐、边界 token 数校验和二分查找回退。
+"""
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.utils.token_utils.calculate_tokens import (  # noqa: E402
+    TokenCalculator, TransformerTokenCalculator)
+from backend.utils.token_utils.fast_token_splitter import \
+    FastTokenSplitter  # noqa: E402
+
+TEXT = "".join(f"这是第{i}句测试文本，用于验证分块。" for i in range(40))
+
+
+class _CharCalculator(TokenCalculator):
+    """每个字符一个 token，并提供 token 位置"""
+
+    def __init__(self, extra_tokens: int = 0):
+        # extra_tokens 模拟单独分词时多出的边界 token
+        self.extra_tokens = extra_tokens
+        self.offset_calls = 0
+
+    def count_tokens(self, text: str) -> int:
+        return len(text) + self.extra_tokens if text else 0
+
+    def token_offsets(self, text: str):
+        self.offset_calls += 1
+        return list(range(len(text)))
+
+
+class _NoOffsetCalculator(_CharCalculator):
+    """不支持 token 位置的计算器"""
+
+    def token_offsets(self, text: str):
+        return None
+
+
+def test_split_with_offsets_aligns_to_separators():
+    calculator = _CharCalculator()
+    chunks = FastTokenSplitter(calculator, chunk_size=50, chunk_overlap=0).split_text(
+        TEXT
+    )
+
+    assert calculator.offset_calls == 1
+    assert "".join(chunks) == TEXT
+    assert all(calculator.count_tokens(chunk) <= 50 for chunk in chunks)
+    # 上限前的搜索范围内没有句号时退而在逗号处切分
+    assert all(chunk[-1] in "。，" for chunk in chunks)
+
+
+def test_split_with_offsets_shrinks_when_standalone_count_differs():
+    calculator = _CharCalculator(extra_tokens=3)
+    chunks = FastTokenSplitter(calculator, chunk_size=50, chunk_overlap=0).split_text(
+        TEXT
+    )
+
+    assert "".join(chunks) == TEXT
+    assert all(calculator.count_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_split_without_offsets_falls_back_to_binary_search():
+    calculator = _NoOffsetCalculator()
+    chunks = FastTokenSplitter(calculator, chunk_size=50, chunk_overlap=0).split_text(
+        TEXT
+    )
+
+    assert "".join(chunks) == TEXT
+    assert all(calculator.count_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_short_text_is_single_chunk():
+    calculator = _CharCalculator()
+    assert FastTokenSplitter(calculator, chunk_size=50).split_text("短文本。") == ["短文本。"]
+    assert calculator.offset_calls == 0
+
+
+class _SlowTokenizer:
+    """按字符分词的慢速分词器，与 transformers 一样不支持 offsets"""
+
+    is_fast = False
+
+    def __call__(self, text, return_offsets_mapping=False, **kwargs):
+        if return_offsets_mapping:
+            raise NotImplementedError("return_offset_mapping is not available")
+        return {"input_ids": list(range(len(text)))}
+
+
+def test_slow_transformer_tokenizer_falls_back_to_binary_search():
+    calculator = TransformerTokenCalculator.__new__(TransformerTokenCalculator)
+    calculator.tokenizer = _SlowTokenizer()
+
+    assert calculator.token_offsets(TEXT) is None
+    chunks = FastTokenSplitter(calculator, chunk_size=50, chunk_overlap=0).split_text(
+        TEXT
+    )
+    assert "".join(chunks) == TEXT
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+测试工具观察结果缓存：键与字段顺序无关、LRU 淘汰、TTL 过期和命中统计，
+以及工具以返回值报告的失败不写入缓存。
+"""
+import asyncio
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.ReAct import observation_cache  # noqa: E402
+from backend.ReAct.actions import ActionExecutor  # noqa: E402
+from backend.ReAct.observation_cache import ObservationCache  # noqa: E402
+
+
+def test_make_key_ignores_field_order():
+    key1 = ObservationCache.make_key("knowledge_retrieval", {"a": 1, "b": [1, 2]})
+    key2 = ObservationCache.make_key("knowledge_retrieval", {"b": [1, 2], "a": 1})
+
+    assert key1 == key2
+    assert key1 != ObservationCache.make_key("web_search", {"a": 1, "b": [1, 2]})
+
+
+def test_lru_eviction():
+    cache = ObservationCache(max_entries=2)
+    cache.set(("t", "1"), "one")
+    cache.set(("t", "2"), "two")
+    # 读取后 "1" 变为最近使用，写入第三条时淘汰 "2"
+    assert cache.get(("t", "1")) == "one"
+    cache.set(("t", "3"), "three")
+
+    assert cache.get(("t", "2")) is None
+    assert cache.get(("t", "1")) == "one"
+    assert cache.get(("t", "3")) == "three"
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(observation_cache.time, "monotonic", lambda: now[0])
+    cache = ObservationCache(ttl=10)
+    cache.set(("t", "1"), "one")
+
+    now[0] += 5
+    assert cache.get(("t", "1")) == "one"
+    now[0] += 6
+    assert cache.get(("t", "1")) is None
+    assert cache.get_cache_stats()["cache_size"] == 0
+
+
+def test_cache_stats_and_clear():
+    cache = ObservationCache()
+    cache.set(("t", "1"), "one")
+    cache.get(("t", "1"))
+    cache.get(("t", "2"))
+
+    stats = cache.get_cache_stats()
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+    assert stats["hit_rate"] == "50.00%"
+
+    cache.clear()
+    assert cache.get_cache_stats()["cache_size"] == 0
+
+
+def test_executor_does_not_cache_failed_results():
+    calls = []
+    results = [
+        "检索失败: connection refused",
+        "No relevant content found in the selected transcripts",
+        "相关内容: ...",
+    ]
+
+    async def knowledge_retrieval(input_str):
+        calls.append(input_str)
+        return results[len(calls) - 1]
+
+    observation_cache.shared_observation_cache.clear()
+    tools = {"knowledge_retrieval": knowledge_retrieval}
+    action_input = {"question": "缓存测试", "transcript_ids": [1]}
+
+    def run():
+        executor = ActionExecutor(None, "", cacheable_tools=["knowledge_retrieval"])
+        return asyncio.run(
+            executor.execute_action("knowledge_retrieval", action_input, tools)
+        )
+
+    # 失败和空结果每次都重新调用工具，新会话也不会拿到共享缓存中的失败结果
+    assert run() == results[0]
+    assert run() == results[1]
+    assert run() == results[2]
+    assert run() == results[2]
+    assert len(calls) == 3
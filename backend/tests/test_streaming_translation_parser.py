@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+测试流式翻译解析：对象闭合即解析，跨片段、转义字符和截断输出都能保留已完成的句子。
+"""
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.text_process.translate.parser import \
+    StreamingTranslationParser  # noqa: E402
+
+RESPONSE = (
+    "translation_content:\n```json\n[\n"
+    '  {"index": 0, "translation": "你好，世界"},\n'
+    '  {"index": 1, "translation": "他说：\\"{别走}\\""},\n'
+    '  {"index": 2, "translation": "  "},\n'
+    '  {"index": 3, "translation": "再见"}\n'
+    "]\n```"
+)
+
+
+def test_feed_char_by_char():
+    parser = StreamingTranslationParser()
+    new_items = {}
+    for ch in RESPONSE:
+        new_items.update(parser.feed(ch))
+
+    expected = {0: "你好，世界", 1: '他说："{别走}"', 3: "再见"}
+    assert parser.translations == expected
+    assert new_items == expected
+
+
+def test_feed_returns_only_new_translations():
+    parser = StreamingTranslationParser()
+    split = RESPONSE.index('{"index": 1')
+
+    assert parser.feed(RESPONSE[:split]) == {0: "你好，世界"}
+    assert parser.feed(RESPONSE[split:]) == {1: '他说："{别走}"', 3: "再见"}
+
+
+def test_truncated_output_keeps_completed_objects():
+    parser = StreamingTranslationParser()
+    truncated = RESPONSE[: RESPONSE.index('{"index": 3') + len('{"index": 3, "transl')]
+
+    parser.feed(truncated)
+
+    assert parser.translations == {0: "你好，世界", 1: '他说："{别走}"'}
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+测试长内容的 map-reduce 总结（不调用 LLM，_complete 替换为按提示词生成结果的桩函数）：
+- map 阶段的并发上限和进度回调；
+- reduce 阶段超过 REDUCE_FAN_IN 时的分组递归归并，以及解析失败时保留分段总结；
+- 模型给出的时间戳限制在批次的整体时间范围内。
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.text_process import summarize  # noqa: E402
+
+_TIME_RANGE = re.compile(r"^\[(\d+\.\d+)-(\d+\.\d+)\]", re.MULTILINE)
+
+
+def _segments(count):
+    """每句 100 token、时长 10 秒的分句"""
+    return [
+        {
+            "index": i,
+            "sentence": f"第{i}句",
+            "start_time": i * 10.0,
+            "end_time": i * 10.0 + 10.0,
+            "token_count": 100,
+        }
+        for i in range(count)
+    ]
+
+
+def _response(items):
+    return (
+        "START_SUMMARIES\n" + json.dumps(items, ensure_ascii=False) + "\nEND_SUMMARIES"
+    )
+
+
+class _FakeComplete:
+    """按提示词中的时间范围生成一个主题，记录调用次数和最大并发数"""
+
+    def __init__(self, reduce_output=None):
+        self.reduce_output = reduce_output
+        self.map_calls = 0
+        self.reduce_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, prompt, max_tokens, token_callback=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        ranges = [(float(s), float(e)) for s, e in _TIME_RANGE.findall(prompt)]
+        start, end = ranges[0][0], max(e for _, e in ranges)
+        if "归并" in prompt:
+            self.reduce_calls += 1
+            if self.reduce_output is not None:
+                return self.reduce_output
+            topic = "归并"
+        else:
+            self.map_calls += 1
+            topic = "分段"
+        return _response(
+            [{"topic": topic, "summary": "内容", "start_time": start, "end_time": end}]
+        )
+
+
+def test_map_concurrency_and_progress(monkeypatch):
+    fake = _FakeComplete()
+    monkeypatch.setattr(summarize, "_complete", fake)
+    progress = []
+
+    # 每批预估输出 130 token/句，max_tokens=400 时每批 3 句，共 4 批
+    summaries = asyncio.run(
+        summarize.summarize_segments_async(
+            _segments(12),
+            chat_max_windows=10,
+            max_tokens=400,
+            max_concurrency=2,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+    )
+
+    assert fake.map_calls == 4
+    assert fake.max_in_flight <= 2
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert fake.reduce_calls == 1
+    assert [(s["topic"], s["start_time"], s["end_time"]) for s in summaries] == [
+        ("归并", 0.0, 120.0)
+    ]
+
+
+def test_short_content_single_call(monkeypatch):
+    fake = _FakeComplete()
+    monkeypatch.setattr(summarize, "_complete", fake)
+
+    summaries = asyncio.run(summarize.summarize_segments_async(_segments(3)))
+
+    assert (fake.map_calls, fake.reduce_calls) == (1, 0)
+    assert summaries[0]["topic"] == "分段"
+
+
+def _partials(count):
+    return [
+        {
+            "topic": f"主题{i}",
+            "summary": "内容",
+            "start_time": i * 10.0,
+            "end_time": i * 10.0 + 5,
+        }
+        for i in range(count)
+    ]
+
+
+def test_reduce_fan_in_recursion(monkeypatch):
+    fake = _FakeComplete()
+    monkeypatch.setattr(summarize, "_complete", fake)
+    monkeypatch.setattr(summarize, "REDUCE_FAN_IN", 3)
+
+    # 7 个主题分为 3+3+1 三组归并，得到 3 个主题后再归并一次
+    reduced = asyncio.run(
+        summarize._reduce_summaries(
+            list(reversed(_partials(7))), 1024, asyncio.Semaphore(2)
+        )
+    )
+
+    assert fake.reduce_calls == 4
+    assert [(s["start_time"], s["end_time"]) for s in reduced] == [(0.0, 65.0)]
+
+
+def test_reduce_keeps_partials_when_unparsable(monkeypatch):
+    fake = _FakeComplete(reduce_output="无法解析的输出")
+    monkeypatch.setattr(summarize, "_complete", fake)
+
+    partials = _partials(3)
+    reduced = asyncio.run(
+        summarize._reduce_summaries(
+            list(reversed(partials)), 1024, asyncio.Semaphore(1)
+        )
+    )
+
+    assert reduced == partials
+
+
+def test_to_summary_items_clamps_timestamps():
+    response = _response(
+        [
+            {"topic": "越界", "summary": "a", "start_time": -5, "end_time": 500},
+            {"topic": "倒置", "summary": "b", "start_time": 80, "end_time": 30},
+            {"topic": "缺失", "summary": "c"},
+        ]
+    )
+
+    items = summarize._to_summary_items(response, 10.0, 100.0)
+
+    assert [(i["topic"], i["start_time"], i["end_time"]) for i in items] == [
+        ("越界", 10.0, 100.0),
+        ("倒置", 80.0, 80.0),
+        ("缺失", 10.0, 100.0),
+    ]
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+测试总结任务的启动：内容哈希一致时直接返回已保存的总结，否则投递后台任务；
+转录不存在与没有分句分别报告。
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+# 与应用启动顺序一致，先加载路由包，避免 summarize_service 与路由之间的循环导入
+import backend.routers  # noqa: E402,F401
+from backend.services import summarize_service  # noqa: E402
+
+SEGMENTS = [{"index": 0, "sentence": "你好", "start_time": 0.0, "end_time": 1.0}]
+SUMMARIES = [{"topic": "问候", "summary": "打招呼", "start_time": 0.0, "end_time": 1.0}]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """替换数据库和 Redis 访问，记录投递的任务"""
+    state = {"transcript": {"segments": SEGMENTS}, "saved_hash": None, "dispatched": []}
+
+    monkeypatch.setattr(
+        summarize_service,
+        "get_transcript_by_id",
+        lambda db_url, transcript_id: state["transcript"],
+    )
+    monkeypatch.setattr(
+        summarize_service,
+        "get_summaries_with_hash",
+        lambda db_url, transcript_id: (SUMMARIES, state["saved_hash"]),
+    )
+    monkeypatch.setattr(summarize_service, "_set_task_data", lambda *args: None)
+
+    def fake_dispatch(transcript_id, db_url=None):
+        state["dispatched"].append(transcript_id)
+        return "started"
+
+    monkeypatch.setattr(summarize_service, "dispatch_summarize_task", fake_dispatch)
+    return state
+
+
+def _start(force=False):
+    return asyncio.run(summarize_service.start_summarize_task(1, "db", force=force))
+
+
+def test_cache_hit_when_hash_matches(service):
+    service["saved_hash"] = summarize_service.compute_summary_hash(SEGMENTS)
+
+    result = _start()
+
+    assert result["status"] == "cached"
+    assert result["summaries"] == SUMMARIES
+    assert service["dispatched"] == []
+
+
+def test_dispatch_when_hash_differs_or_forced(service):
+    service["saved_hash"] = "stale"
+    assert _start()["status"] == "started"
+
+    service["saved_hash"] = summarize_service.compute_summary_hash(SEGMENTS)
+    assert _start(force=True)["status"] == "started"
+    assert service["dispatched"] == [1, 1]
+
+
+def test_missing_transcript_and_empty_segments(service):
+    service["transcript"] = None
+    with pytest.raises(LookupError):
+        _start()
+
+    service["transcript"] = {"segments": []}
+    with pytest.raises(ValueError):
+        _start()
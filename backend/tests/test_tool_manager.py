@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+测试工具配置加载：兼容 JSON 数组格式和对象格式，配置只读取一次。
+"""
+import json
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.ReAct.tool_manager import ToolManager  # noqa: E402
+
+
+def _write_config(tmp_path, content):
+    path = tmp_path / "chat_tools_config.json"
+    path.write_text(json.dumps(content), encoding="utf-8")
+    return str(path)
+
+
+def test_list_config_still_loads(tmp_path):
+    path = _write_config(tmp_path, ["knowledge_retrieval"])
+    manager = ToolManager("http://localhost:8000/mcp", config_path=path)
+
+    assert manager.load_tool_config() == ["knowledge_retrieval"]
+    assert manager.get_cacheable_tools() == []
+
+
+def test_object_config_read_once(tmp_path):
+    path = _write_config(
+        tmp_path,
+        {
+            "allowed_tools": ["knowledge_retrieval", "web_search"],
+            "cacheable_tools": ["knowledge_retrieval"],
+        },
+    )
+    manager = ToolManager("http://localhost:8000/mcp", config_path=path)
+    os.remove(path)
+
+    assert manager.get_allowed_tools() == ["knowledge_retrieval", "web_search"]
+    assert manager.get_cacheable_tools() == ["knowledge_retrieval"]
+
+
+def test_missing_config(tmp_path):
+    manager = ToolManager(
+        "http://localhost:8000/mcp", config_path=str(tmp_path / "missing.json")
+    )
+
+    assert manager.load_tool_config() == []
+    assert manager.get_cacheable_tools() == []
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+测试翻译自适应分批：token 比例学习、截断后收缩批次、按最新估算逐批生成。
+"""
+import os
+import sys
+
+import pytest
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.text_process.translate.batch import (  # noqa: E402
+    SEGMENT_OUTPUT_OVERHEAD, BatchSizeEstimator, iter_adaptive_batches)
+
+LANG_PAIR = ("en", "zh")
+
+
+def _segments(token_counts):
+    """构造已带 token_count 的分句，不需要分词器"""
+    return [
+        {"index": i, "sentence": f"sentence {i}", "token_count": count}
+        for i, count in enumerate(token_counts)
+    ]
+
+
+def test_record_batch_smooths_ratio_and_restores_fill():
+    estimator = BatchSizeEstimator(initial_ratio=1.5, smoothing=0.3, max_fill=0.85)
+    estimator.record_truncation(LANG_PAIR)
+    assert estimator.get_fill(LANG_PAIR) == pytest.approx(0.51)
+
+    # 观测比例 2.0：(224 - 2 * 12) / 100
+    estimator.record_batch(LANG_PAIR, 100, 200 + 2 * SEGMENT_OUTPUT_OVERHEAD, 2)
+
+    assert estimator.get_ratio(LANG_PAIR) == pytest.approx(1.65)
+    assert estimator.get_fill(LANG_PAIR) == pytest.approx(0.561)
+    # 其他语言对不受影响
+    assert estimator.get_ratio(("zh", "en")) == 1.5
+
+
+def test_record_truncation_respects_min_fill():
+    estimator = BatchSizeEstimator(min_fill=0.3)
+    for _ in range(10):
+        estimator.record_truncation(LANG_PAIR)
+    assert estimator.get_fill(LANG_PAIR) == 0.3
+
+
+def test_iter_adaptive_batches_fills_budget():
+    estimator = BatchSizeEstimator(initial_ratio=1.0, max_fill=1.0)
+    # 每句预估输出 10 + 12 = 22 token，预算 100 时每批 4 句
+    batches = list(
+        iter_adaptive_batches(_segments([10] * 10), 100, LANG_PAIR, estimator)
+    )
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_iter_adaptive_batches_shrinks_after_truncation():
+    estimator = BatchSizeEstimator(initial_ratio=1.0, max_fill=1.0)
+    batches = iter_adaptive_batches(_segments([10] * 10), 100, LANG_PAIR, estimator)
+
+    assert len(next(batches)) == 4
+    # 截断后填充率降为 0.6，预算 60，后续批次只能容纳 2 句
+    estimator.record_truncation(LANG_PAIR)
+    assert [len(batch) for batch in batches] == [2, 2, 2]
+
+
+def test_iter_adaptive_batches_oversized_segment_and_max_batch_size():
+    estimator = BatchSizeEstimator(initial_ratio=1.0, max_fill=1.0)
+    segments = _segments([1000, 1, 1, 1, 1, 1])
+
+    batches = list(
+        iter_adaptive_batches(segments, 100, LANG_PAIR, estimator, max_batch_size=3)
+    )
+
+    assert [[s["index"] for s in batch] for batch in batches] == [
+        [0],
+        [1, 2, 3],
+        [4, 5],
+    ]
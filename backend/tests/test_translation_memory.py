@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+测试翻译记忆：意译失败时退回的直译结果不写入记忆；强制重译时不复用记忆中的旧译文。
+"""
+import asyncio
+import os
+import sys
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from backend.text_process.translate import core, memory  # noqa: E402
+from backend.text_process.translate.two_step_translate import \
+    BatchTranslations  # noqa: E402
+
+
+def test_store_skips_fallback_translations(monkeypatch):
+    saved = []
+
+    def fake_save(db_url, entries, source_lang, target_lang, model):
+        saved.extend(entries)
+        return len(entries)
+
+    monkeypatch.setattr(memory, "save_translation_memory", fake_save)
+
+    segments = [
+        {"index": 0, "sentence": "Hello world"},
+        {"index": 1, "sentence": "Welcome back"},
+    ]
+    translations = BatchTranslations({0: "你好，世界", 1: "欢迎回来"}, fallback_indices={1})
+    tm = memory.TranslationMemory()
+    stored = asyncio.run(
+        tm.store(
+            segments,
+            translations,
+            "en",
+            "zh",
+            "test-model",
+            skip_indices=translations.fallback_indices,
+        )
+    )
+
+    assert stored == 1
+    assert [entry[2] for entry in saved] == ["你好，世界"]
+
+
+class _FakeMemory:
+    """总是命中旧译文的翻译记忆"""
+
+    def __init__(self):
+        self.stored = {}
+
+    async def lookup(self, segments, source_lang, target_lang, model):
+        return {seg["index"]: "旧译文" for seg in segments}
+
+    async def store(
+        self, segments, translations, source_lang, target_lang, model, skip_indices=()
+    ):
+        self.stored.update(translations)
+        return len(translations)
+
+    def get_stats(self):
+        return {}
+
+
+class _FakeTranslator:
+    """记录送入 LLM 的分句，返回固定的新译文"""
+
+    translated = []
+
+    async def translate_batches(self, batches, *args):
+        for batch_idx, batch in enumerate(batches):
+            _FakeTranslator.translated.extend(seg["index"] for seg in batch)
+            yield batch_idx, batch, {seg["index"]: "新译文" for seg in batch}, None
+
+
+def test_force_retranslate_skips_memory_lookup(monkeypatch):
+    monkeypatch.setattr(core, "TwoStepTranslator", _FakeTranslator)
+    _FakeTranslator.translated = []
+    segments = [
+        {"index": 0, "sentence": "Hello world", "token_count": 2},
+        {"index": 1, "sentence": "Welcome back", "token_count": 2},
+    ]
+    tm = _FakeMemory()
+
+    result = asyncio.run(
+        core.translate_segments_async(
+            segments,
+            target_lang_code="zh",
+            source_lang_code="en",
+            force_retranslate=True,
+            translation_memory=tm,
+        )
+    )
+
+    assert _FakeTranslator.translated == [0, 1]
+    assert [seg["translation"]["zh"] for seg in result] == ["新译文", "新译文"]
+    assert tm.stored == {0: "新译文", 1: "新译文"}
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, List, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 from backend.startup import get_llm_router
 
 # 动态导入配置
@@ -19,15 +22,51 @@ except ImportError:
     from backend.config import settings
     from backend.schemas import Segment, SummaryItem
 
-from backend.utils.token_utils.calculate_tokens import OpenAITokenCalculator
+from backend.utils.token_utils.calculate_tokens import (SegmentTokenIndex,
+                                                        count_segments_tokens)
+
+# 未配置速率限制时的默认并发批次数
+DEFAULT_SUMMARIZE_CONCURRENCY = 4
+# 并发批次数上限
+MAX_SUMMARIZE_CONCURRENCY = 8
+# 单次归并最多输入的主题数，超过时先分组归并再合并
+REDUCE_FAN_IN = 40
+# 总结提示词或流程变化时递增，使已保存的总结缓存失效
+SUMMARY_VERSION = 3
+# 全文概要的最大输出token数
+OVERVIEW_MAX_TOKENS = 1024
+
+# 回调既可以是普通函数也可以是协程函数
+TokenCallback = Callable[[str], Union[None, Awaitable[None]]]
+ProgressCallback = Callable[[int, int], Union[None, Awaitable[None]]]
+
+
+def compute_summary_hash(segments: List[Segment]) -> str:
+    """
+    计算总结缓存键：分句内容、时间戳、模型和总结版本共同决定总结结果。
+
+    参数:
+    - segments: 句级片段
+
+    返回: 十六进制哈希字符串
+    """
+    payload = {
+        "version": SUMMARY_VERSION,
+        "model": settings.llm_model,
+        "segments": [
+            [s.get("sentence", ""), s.get("start_time"), s.get("end_time")]
+            for s in segments
+        ],
+    }
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
 
 def _count_tokens_for_segments(segments: List[Segment]) -> int:
     """
     最小实现：仅按文本字段统计 token 数。
-    使用统一的 OpenAI token 计算器。
+    使用共享的 OpenAI token 计算器，分句的 token 数缓存在分句上。
     """
-    from backend.utils.token_utils.calculate_tokens import count_segments_tokens
     return count_segments_tokens(segments)
 
 
@@ -46,27 +85,20 @@ def _split_segments_by_output_tokens(
     if not segments:
         return []
 
-    calculator = OpenAITokenCalculator()
+    token_index = SegmentTokenIndex(segments)
+
+    def fits(start: int, end: int) -> bool:
+        # 估算总结输出的token数（原文的0.8倍作为总结大小，每句另加50）
+        estimated_tokens = int(token_index.range_tokens(start, end) * 0.8) + 50 * (end - start)
+        return estimated_tokens <= max_tokens
+
     batches = []
-    current_batch = []
-    current_output_tokens = 0
-
-    for seg in segments:
-        sentence = seg.get("sentence", "")
-        # 估算总结输出的token数（原文的0.8倍作为总结大小）
-        estimated_tokens = int(calculator.count_tokens(sentence) * 0.8) + 50
-
-        if current_output_tokens + estimated_tokens > max_tokens and current_batch:
-            # 当前批次满了，开始新批次
-            batches.append(current_batch)
-            current_batch = [seg]
-            current_output_tokens = estimated_tokens
-        else:
-            current_batch.append(seg)
-            current_output_tokens += estimated_tokens
-
-    if current_batch:
-        batches.append(current_batch)
+    start = 0
+    while start < len(segments):
+        # 当前批次装满时开始新批次，每批至少一句
+        end = token_index.find_range_end(start, len(segments), fits)
+        batches.append(segments[start:end])
+        start = end
 
     return batches
 
@@ -117,6 +149,78 @@ END_SUMMARIES
     return "\n".join([header, *body_lines, "", footer])
 
 
+def _build_reduce_prompt(summaries: List[SummaryItem]) -> str:
+    """构建归并提示词：合并各批次总结中重复或相近的主题"""
+
+    header = """
+你是一个专业的内容总结助手。下面是同一个视频按时间顺序分段总结得到的主题列表，
+不同分段可能出现重复或相近的主题。请将它们归并为一份完整的主题总结。
+
+# 格式要求
+1. 禁止使用Markdown、代码块（```）、加粗、列表、编号等特殊格式
+2. 禁止输出任何与总结无关的文字或说明
+3. 只能输出纯文本格式的JSON数组
+
+# 输出格式（必须严格遵守，不要多也不要少）
+START_SUMMARIES
+[
+  {"topic": "<主题短句>", "summary": "<中文总结，允许换行但不包含引号>", "start_time": <起始时间戳>, "end_time": <结束时间戳>}
+]
+END_SUMMARIES
+
+# 要求说明
+1. 合并重复或高度相关的主题，合并后的总结要涵盖被合并主题的全部要点
+2. 合并后主题的时间范围取被合并主题的最早起始时间和最晚结束时间
+3. 不相关的主题保持独立，不要遗漏任何主题的信息
+4. 按起始时间先后排列主题
+5. 总结中如果需要换行，使用\\n表示，不要真实换行
+
+下面是带时间范围的分段主题：
+""".strip()
+
+    body_lines: list[str] = []
+    for item in summaries:
+        st = item.get("start_time", 0.0)
+        ed = item.get("end_time", st)
+        summary = item.get("summary", "").replace("\n", "\\n")
+        body_lines.append(f"[{st:.2f}-{ed:.2f}] {item.get('topic', '')}：{summary}")
+
+    footer = """
+
+请严格按上述格式输出，只输出START_SUMMARIES到END_SUMMARIES之间的内容。
+""".strip(
+        "\n"
+    )
+
+    return "\n".join([header, *body_lines, "", footer])
+
+
+def _build_overview_prompt(summaries: List[SummaryItem]) -> str:
+    """构建全文概要提示词：由主题总结归纳出整个视频的概要"""
+
+    header = """
+你是一个专业的内容总结助手。下面是同一个视频按时间顺序排列的主题总结，
+请据此写一段全文概要，说明这个视频主要讲了什么。
+
+# 要求说明
+1. 概要控制在300字以内，使用中文纯文本，禁止使用Markdown、列表、编号等特殊格式
+2. 先用一句话概括视频的核心内容，再按先后顺序交代主要内容和结论
+3. 只依据给出的主题总结，不要编造其中没有的信息
+4. 直接输出概要正文，不要输出任何说明文字
+
+下面是带时间范围的主题总结：
+""".strip()
+
+    body_lines: list[str] = []
+    for item in summaries:
+        st = item.get("start_time", 0.0)
+        ed = item.get("end_time", st)
+        summary = item.get("summary", "").replace("\n", " ")
+        body_lines.append(f"[{st:.2f}-{ed:.2f}] {item.get('topic', '')}：{summary}")
+
+    return "\n".join([header, *body_lines])
+
+
 def _extract_summaries(response_text: str) -> List[Dict[str, Any]]:
     """
     从模型响应中提取总结数据。
@@ -165,76 +269,84 @@ def _extract_summaries(response_text: str) -> List[Dict[str, Any]]:
     return summaries
 
 
-def summarize_segments(
-    segments: List[Segment],
-    chat_max_windows: int = 1_000_000,
-    max_tokens: int = 4096,
-) -> List[SummaryItem]:
-    """生成多个主题的总结，支持分批处理长内容。
+def _resolve_summarize_concurrency(max_tokens: int) -> int:
+    """根据 llm_rpm / llm_tpm 配置估算可同时进行的总结批次数（每批一次调用）"""
+    limits = []
+    if settings.llm_rpm:
+        limits.append(settings.llm_rpm)
+    if settings.llm_tpm:
+        limits.append(settings.llm_tpm // (2 * max(max_tokens, 1)))
 
-    参数：
-    - segments：句级片段
-    - chat_max_windows：用于限制输入的近似 token 上限（项目内称为 CHAT_MAX_WINDOWS）
-    - max_tokens：每批总结的最大输出token数（默认4096）
+    if not limits:
+        return DEFAULT_SUMMARIZE_CONCURRENCY
+    return max(1, min(min(limits), MAX_SUMMARIZE_CONCURRENCY))
 
-    返回：list[SummaryItem]
-    - 生成多个主题的总结，每个总结有独立的时间范围
-    """
-    if not segments:
-        return []
-
-    tokens = _count_tokens_for_segments(segments)
-    if tokens > chat_max_windows:
-        # 超限时进行分批处理
-        batches = _split_segments_by_output_tokens(segments, max_tokens)
-        all_summaries: List[SummaryItem] = []
-
-        for batch in batches:
-            batch_summaries = summarize_segments(
-                batch,
-                chat_max_windows=chat_max_windows,
-                max_tokens=max_tokens,
-            )
-            all_summaries.extend(batch_summaries)
 
-        return all_summaries
+async def _invoke_callback(callback: Optional[Callable], *args) -> None:
+    """调用普通函数或协程函数形式的回调"""
+    if callback is None:
+        return
+    result = callback(*args)
+    if asyncio.iscoroutine(result):
+        await result
 
-    prompt = _build_prompt(segments)
 
-    # 使用全局 LLM Router
+async def _complete(
+    prompt: str, max_tokens: int, token_callback: Optional[TokenCallback] = None
+) -> str:
+    """流式调用 LLM，返回完整文本；提供 token_callback 时逐段回调输出内容"""
     router = get_llm_router()
-
-    # 使用 LiteLLM Router 调用
-    response = router.completion(
+    response = await router.acompletion(
         model=settings.llm_model,
         messages=[{"role": "user", "content": prompt}],
         max_tokens=max_tokens,
         temperature=0.6,
+        stream=True,
     )
-    topic_and_summary = response.choices[0].message.content.strip()
 
-    # 初始化返回值
-    summaries = []
-    overall_start_time = min(s.get("start_time", 0.0) for s in segments)
-    overall_end_time = max(s.get("end_time", overall_start_time) for s in segments)
+    response_text = ""
+    async for chunk in response:
+        if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+            content = chunk.choices[0].delta.content
+            response_text += content
+            await _invoke_callback(token_callback, content)
+    return response_text.strip()
 
-    # 使用新函数提取总结
-    extracted_summaries = _extract_summaries(topic_and_summary)
 
-    # 为每个提取到的主题创建SummaryItem
-    for item in extracted_summaries:
+def _to_summary_items(
+    response_text: str, overall_start_time: float, overall_end_time: float
+) -> List[SummaryItem]:
+    """将模型输出解析为 SummaryItem 列表，时间戳限制在整体范围内"""
+    summaries = []
+    for item in _extract_summaries(response_text):
         # 如果模型提供了时间戳信息，则使用模型提供的时间戳，否则使用整体时间范围
         start_time = item.get("start_time", overall_start_time)
         end_time = item.get("end_time", overall_end_time)
+        start_time = min(max(start_time, overall_start_time), overall_end_time)
+        end_time = min(max(end_time, start_time), overall_end_time)
 
         summaries.append(
             SummaryItem(
                 topic=item["topic"],
                 summary=item["summary"],
-                start_time=start_time,
-                end_time=end_time,
+                start_time=float(start_time),
+                end_time=float(end_time),
             )
         )
+    return summaries
+
+
+async def _summarize_batch(
+    segments: List[Segment],
+    max_tokens: int,
+    token_callback: Optional[TokenCallback] = None,
+) -> List[SummaryItem]:
+    """总结一批句子（map 阶段的单个任务，或内容较短时的唯一一次调用）"""
+    overall_start_time = min(s.get("start_time", 0.0) for s in segments)
+    overall_end_time = max(s.get("end_time", overall_start_time) for s in segments)
+
+    topic_and_summary = await _complete(_build_prompt(segments), max_tokens, token_callback)
+    summaries = _to_summary_items(topic_and_summary, overall_start_time, overall_end_time)
 
     # 如果解析失败或没有解析到任何内容，回退为将整个响应作为单个总结
     if not summaries:
@@ -246,5 +358,159 @@ def summarize_segments(
                 end_time=float(overall_end_time),
             )
         )
-
     return summaries
+
+
+async def _reduce_summaries(
+    summaries: List[SummaryItem],
+    max_tokens: int,
+    semaphore: asyncio.Semaphore,
+    token_callback: Optional[TokenCallback] = None,
+) -> List[SummaryItem]:
+    """
+    reduce 阶段：合并去重各批次的主题。
+
+    主题数超过 REDUCE_FAN_IN 时先分组并行归并，再对结果继续归并，
+    只有最后一轮的输出通过 token_callback 流式返回。
+    归并结果解析失败时保留归并前的主题。
+    """
+    summaries = sorted(summaries, key=lambda s: s.get("start_time", 0.0))
+
+    if len(summaries) > REDUCE_FAN_IN:
+        groups = [
+            summaries[i : i + REDUCE_FAN_IN]
+            for i in range(0, len(summaries), REDUCE_FAN_IN)
+        ]
+        reduced_groups = await asyncio.gather(
+            *(_reduce_summaries(group, max_tokens, semaphore) for group in groups)
+        )
+        merged = [item for group in reduced_groups for item in group]
+        # 分组归并没有减少主题数时直接返回，避免无限递归
+        if len(merged) >= len(summaries):
+            return merged
+        return await _reduce_summaries(merged, max_tokens, semaphore, token_callback)
+
+    overall_start_time = min(s.get("start_time", 0.0) for s in summaries)
+    overall_end_time = max(s.get("end_time", overall_start_time) for s in summaries)
+
+    try:
+        async with semaphore:
+            response_text = await _complete(
+                _build_reduce_prompt(summaries), max_tokens, token_callback
+            )
+    except Exception as e:
+        logging.warning(f"主题归并失败，保留分段总结: {e}")
+        return summaries
+
+    reduced = _to_summary_items(response_text, overall_start_time, overall_end_time)
+    if not reduced:
+        logging.warning("主题归并结果解析失败，保留分段总结")
+        return summaries
+    return sorted(reduced, key=lambda s: s.get("start_time", 0.0))
+
+
+async def summarize_segments_async(
+    segments: List[Segment],
+    chat_max_windows: int = 1_000_000,
+    max_tokens: int = 4096,
+    max_concurrency: Optional[int] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    token_callback: Optional[TokenCallback] = None,
+) -> List[SummaryItem]:
+    """以 map-reduce 方式生成多个主题的总结。
+
+    内容在 chat_max_windows 以内时一次调用完成；超限时分批并行总结（map），
+    再归并去重各批主题并合并时间范围（reduce）。
+
+    参数：
+    - segments：句级片段
+    - chat_max_windows：用于限制输入的近似 token 上限（项目内称为 CHAT_MAX_WINDOWS）
+    - max_tokens：每批总结的最大输出token数（默认4096）
+    - max_concurrency：map 阶段同时进行的最大批次数，为空时根据 llm_rpm/llm_tpm 自动估算
+    - progress_callback：每完成一个 map 批次回调 (已完成批次数, 总批次数)
+    - token_callback：最终输出（单次总结或最后一轮归并）的流式文本回调
+
+    返回：list[SummaryItem]
+    - 生成多个主题的总结，每个总结有独立的时间范围
+    """
+    if not segments:
+        return []
+
+    tokens = _count_tokens_for_segments(segments)
+    if tokens <= chat_max_windows:
+        summaries = await _summarize_batch(segments, max_tokens, token_callback)
+        await _invoke_callback(progress_callback, 1, 1)
+        return summaries
+
+    # map：分批并行总结
+    batches = _split_segments_by_output_tokens(segments, max_tokens)
+    concurrency = max_concurrency or _resolve_summarize_concurrency(max_tokens)
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = 0
+    logging.info(f"总结分成 {len(batches)} 批，并发数 {concurrency}")
+
+    async def map_batch(batch: List[Segment]) -> List[SummaryItem]:
+        nonlocal completed
+        async with semaphore:
+            batch_summaries = await _summarize_batch(batch, max_tokens)
+        completed += 1
+        await _invoke_callback(progress_callback, completed, len(batches))
+        return batch_summaries
+
+    batch_results = await asyncio.gather(*(map_batch(batch) for batch in batches))
+    partial_summaries = [item for result in batch_results for item in result]
+
+    if len(batches) == 1:
+        return partial_summaries
+
+    # reduce：合并去重主题和时间范围，最终输出流式返回
+    return await _reduce_summaries(
+        partial_summaries, max_tokens, semaphore, token_callback
+    )
+
+
+async def summarize_overview_async(
+    summaries: List[SummaryItem],
+    max_tokens: int = OVERVIEW_MAX_TOKENS,
+    token_callback: Optional[TokenCallback] = None,
+) -> str:
+    """由主题总结生成全文概要（分层总结的最上层：分句 -> 主题总结 -> 全文概要）。
+
+    输入只有主题总结，不再读取原始分句，调用成本与视频长度基本无关。
+
+    参数：
+    - summaries：summarize_segments_async 生成的主题总结
+    - max_tokens：概要的最大输出token数
+    - token_callback：概要的流式文本回调
+
+    返回：全文概要文本，没有主题总结时返回空字符串
+    """
+    if not summaries:
+        return ""
+    summaries = sorted(summaries, key=lambda s: s.get("start_time", 0.0))
+    return await _complete(_build_overview_prompt(summaries), max_tokens, token_callback)
+
+
+def summarize_segments(
+    segments: List[Segment],
+    chat_max_windows: int = 1_000_000,
+    max_tokens: int = 4096,
+) -> List[SummaryItem]:
+    """summarize_segments_async 的同步封装，供同步调用方使用。
+
+    不能在正在运行的事件循环中调用，异步代码请直接使用 summarize_segments_async。
+
+    参数：
+    - segments：句级片段
+    - chat_max_windows：用于限制输入的近似 token 上限（项目内称为 CHAT_MAX_WINDOWS）
+    - max_tokens：每批总结的最大输出token数（默认4096）
+
+    返回：list[SummaryItem]
+    """
+    return asyncio.run(
+        summarize_segments_async(
+            segments,
+            chat_max_windows=chat_max_windows,
+            max_tokens=max_tokens,
+        )
+    )
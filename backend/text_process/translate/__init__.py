@@ -3,5 +3,6 @@
 翻译模块：支持分批翻译、上下文感知、JSON格式化输出。
 """
 from .core import translate_segments_async
+from .memory import TranslationMemory
 
-__all__ = ["translate_segments_async"]
+__all__ = ["translate_segments_async", "TranslationMemory"]
@@ -2,76 +2,171 @@
 """
 分批处理模块：将分句按照数量和token限制进行分批。
 """
-from typing import List
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from backend.schemas import Segment
-from backend.utils.token_utils.calculate_tokens import OpenAITokenCalculator
+from backend.utils.token_utils.calculate_tokens import (SegmentTokenIndex,
+                                                        get_token_calculator)
 
+# 每个分句在输出 JSON 中的固定开销（index 字段、引号、括号等）
+SEGMENT_OUTPUT_OVERHEAD = 12
+# 单批最多句子数，避免单次输出过长导致 JSON 格式出错
+DEFAULT_MAX_BATCH_SIZE = 40
 
-def split_segments_by_output_tokens(
-    segments: List[Segment], max_tokens: int = 4096
-) -> List[List[Segment]]:
+LangPair = Tuple[str, str]
+
+
+def count_text_tokens(text: str) -> int:
+    """计算文本的 token 数"""
+    return get_token_calculator().count_tokens(text or "")
+
+
+class BatchSizeEstimator:
+    """
+    按语言对学习翻译输出/输入 token 比例，决定每批能容纳多少句子。
+
+    - 每批完成后用实际输出 token 数修正比例（指数平滑）
+    - 输出被截断（finish_reason == "length"）时降低填充率，后续批次自动变小
+    - 连续成功后填充率逐步恢复
     """
-    根据预估的翻译输出token数和句子数量，将分句分批。
-    目标：每批约 10 句左右，但不超过 max_tokens 限制。
+
+    def __init__(
+        self,
+        initial_ratio: float = 1.5,
+        smoothing: float = 0.3,
+        max_fill: float = 0.85,
+        min_fill: float = 0.3,
+    ):
+        """
+        参数:
+        - initial_ratio: 未观测到数据时的输出/输入 token 比例
+        - smoothing: 指数平滑系数，越大越偏向最新观测
+        - max_fill: 预估输出占 max_tokens 的最大比例（为估算误差留余量）
+        - min_fill: 多次截断后填充率的下限
+        """
+        self.initial_ratio = initial_ratio
+        self.smoothing = smoothing
+        self.max_fill = max_fill
+        self.min_fill = min_fill
+        self._ratios: Dict[LangPair, float] = {}
+        self._fills: Dict[LangPair, float] = {}
+
+    def get_ratio(self, lang_pair: LangPair) -> float:
+        """当前语言对的输出/输入 token 比例"""
+        return self._ratios.get(lang_pair, self.initial_ratio)
+
+    def get_fill(self, lang_pair: LangPair) -> float:
+        """当前语言对的填充率"""
+        return self._fills.get(lang_pair, self.max_fill)
+
+    def estimate_output_tokens(
+        self, input_tokens: int, lang_pair: LangPair, segment_count: int = 1
+    ) -> int:
+        """预估 segment_count 个分句（原文共 input_tokens 个 token）的输出 token 数"""
+        return (
+            int(input_tokens * self.get_ratio(lang_pair))
+            + SEGMENT_OUTPUT_OVERHEAD * segment_count
+        )
+
+    def record_batch(
+        self,
+        lang_pair: LangPair,
+        input_tokens: int,
+        output_tokens: int,
+        segment_count: int,
+    ) -> None:
+        """
+        记录一次完整（未截断）输出的实际 token 数。
+
+        参数:
+        - lang_pair: (源语言, 目标语言)
+        - input_tokens: 本批原文的 token 数
+        - output_tokens: 本次输出的 token 数
+        - segment_count: 本批句子数
+        """
+        if input_tokens <= 0 or segment_count <= 0:
+            return
+
+        observed = max(output_tokens - SEGMENT_OUTPUT_OVERHEAD * segment_count, 0)
+        observed_ratio = min(max(observed / input_tokens, 0.2), 5.0)
+        ratio = self.get_ratio(lang_pair)
+        self._ratios[lang_pair] = ratio + self.smoothing * (observed_ratio - ratio)
+        self._fills[lang_pair] = min(self.get_fill(lang_pair) * 1.1, self.max_fill)
+
+    def record_truncation(self, lang_pair: LangPair) -> None:
+        """记录一次输出截断，降低后续批次的填充率"""
+        fill = max(self.get_fill(lang_pair) * 0.6, self.min_fill)
+        self._fills[lang_pair] = fill
+        logging.warning(f"翻译输出被截断，{lang_pair} 的批次填充率降至 {fill:.2f}")
+
+
+# 全局估算器：跨任务累积各语言对的 token 比例
+batch_size_estimator = BatchSizeEstimator()
+
+
+def iter_adaptive_batches(
+    segments: List[Segment],
+    max_tokens: int = 4096,
+    lang_pair: LangPair = ("", ""),
+    estimator: Optional[BatchSizeEstimator] = None,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> Iterator[List[Segment]]:
+    """
+    按需生成批次：每次取下一批时使用估算器的最新比例和填充率，
+    在不超过 max_tokens 的前提下尽量多装句子。
 
     参数:
     - segments: 要分批的分句列表
-    - max_tokens: 每批最大输出token数（默认4096）
+    - max_tokens: 每批最大输出token数
+    - lang_pair: (源语言, 目标语言)，用于查找对应的 token 比例
+    - estimator: 批次大小估算器，为空时使用全局估算器
+    - max_batch_size: 单批最多句子数
 
-    返回: 分批后的分句列表
+    返回: 批次迭代器
     """
-    if not segments:
-        return []
+    estimator = estimator or batch_size_estimator
+    # 优先使用分句上保存的 token 数，前缀和使任意区间的 token 数 O(1) 可得
+    token_index = SegmentTokenIndex(segments)
+
+    start = 0
+    while start < len(segments):
+        budget = max_tokens * estimator.get_fill(lang_pair)
 
-    # 目标：每批约 10 句
-    target_batch_size = 10
-
-    # 先按数量分批，然后检查 token 限制
-    batches = []
-    for i in range(0, len(segments), target_batch_size):
-        batch = segments[i : i + target_batch_size]
-        batches.append(batch)
-
-    # 如果某个批次过大（token 超限），则进一步拆分
-    calculator = OpenAITokenCalculator()
-    final_batches = []
-
-    for batch in batches:
-        # 估算这个批次的总 token 数
-        total_tokens = 0
-        for seg in batch:
-            sentence = seg.get("sentence", "")
-            estimated_tokens = int(calculator.count_tokens(sentence) * 1.5) + 20
-            total_tokens += estimated_tokens
-
-        # 如果在 token 限制内，直接使用
-        if total_tokens <= max_tokens:
-            final_batches.append(batch)
-        else:
-            # 否则进一步拆分为更小的批次
-            import logging
-
-            logging.warning(
-                f"批次 token 数 ({total_tokens}) 超过限制 ({max_tokens})，"
-                f"将 {len(batch)} 句拆分为更小的批次"
+        def fits(batch_start: int, batch_end: int) -> bool:
+            estimated = estimator.estimate_output_tokens(
+                token_index.range_tokens(batch_start, batch_end),
+                lang_pair,
+                batch_end - batch_start,
             )
-            current_sub_batch = []
-            current_tokens = 0
+            return estimated <= budget
 
-            for seg in batch:
-                sentence = seg.get("sentence", "")
-                estimated_tokens = int(calculator.count_tokens(sentence) * 1.5) + 20
+        # 每批至少一句，即使单句超出预算
+        end = token_index.find_range_end(
+            start, min(start + max_batch_size, len(segments)), fits
+        )
+        yield segments[start:end]
+        start = end
 
-                if current_tokens + estimated_tokens > max_tokens and current_sub_batch:
-                    final_batches.append(current_sub_batch)
-                    current_sub_batch = [seg]
-                    current_tokens = estimated_tokens
-                else:
-                    current_sub_batch.append(seg)
-                    current_tokens += estimated_tokens
 
-            if current_sub_batch:
-                final_batches.append(current_sub_batch)
+def split_segments_by_output_tokens(
+    segments: List[Segment],
+    max_tokens: int = 4096,
+    lang_pair: LangPair = ("", ""),
+    estimator: Optional[BatchSizeEstimator] = None,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> List[List[Segment]]:
+    """
+    根据预估的翻译输出token数将分句分批，一次性返回全部批次。
+
+    参数与 iter_adaptive_batches 相同。
 
-    return final_batches
+    返回: 分批后的分句列表
+    """
+    if not segments:
+        return []
+    return list(
+        iter_adaptive_batches(
+            segments, max_tokens, lang_pair, estimator, max_batch_size
+        )
+    )
@@ -5,7 +5,7 @@
 import asyncio
 import logging
 import os
-from typing import Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 # 动态导入配置
 try:
@@ -21,9 +21,34 @@ except ImportError:
     from backend.config import settings
     from backend.schemas import Segment
 
-from .batch import split_segments_by_output_tokens
+from .batch import iter_adaptive_batches
+from .memory import TranslationMemory
 from .two_step_translate import TwoStepTranslator
 
+# 未配置速率限制时的默认并发批次数
+DEFAULT_TRANSLATE_CONCURRENCY = 4
+# 并发批次数上限，避免瞬时请求过多
+MAX_TRANSLATE_CONCURRENCY = 8
+
+
+def _resolve_translate_concurrency(max_tokens: int) -> int:
+    """
+    根据 llm_rpm / llm_tpm 配置估算可同时进行的翻译批次数。
+
+    每批包含直译和意译两次调用，按单批约一分钟完成估算：
+    - RPM 限制：每批占用 2 次请求
+    - TPM 限制：每批最多消耗约 2 * (输入 + 输出) ≈ 4 * max_tokens 个 token
+    """
+    limits = []
+    if settings.llm_rpm:
+        limits.append(settings.llm_rpm // 2)
+    if settings.llm_tpm:
+        limits.append(settings.llm_tpm // (4 * max(max_tokens, 1)))
+
+    if not limits:
+        return DEFAULT_TRANSLATE_CONCURRENCY
+    return max(1, min(min(limits), MAX_TRANSLATE_CONCURRENCY))
+
 
 async def translate_segments_async(
     segments: List[Segment],
@@ -34,6 +59,9 @@ async def translate_segments_async(
     target_lang_display_name: str = "",
     progress_callback: Optional[Callable[[int, int], None]] = None,
     force_retranslate: bool = False,
+    max_concurrency: Optional[int] = None,
+    translation_memory: Optional[TranslationMemory] = None,
+    on_batch_translated: Optional[Callable[[Dict[int, str]], Any]] = None,
 ) -> List[Segment]:
     """
     异步翻译分句。根据输出token限制自动分批处理。只翻译未翻译的分句。
@@ -48,6 +76,11 @@ async def translate_segments_async(
     - source_lang_display_name: 源语言的显示名称，如"English"、"中文"，为空时使用默认值"原文"
     - target_lang_display_name: 目标语言的显示名称，如"中文"、"English"，为空时根据target_lang_code自动推断
     - force_retranslate: 是否强制重新翻译所有分句（包括已翻译的），默认False
+    - max_concurrency: 同时翻译的最大批次数，为空时根据 llm_rpm/llm_tpm 自动估算
+    - translation_memory: 翻译记忆，提供时先复用历史译文，翻译完成后回写新译文；
+      强制重新翻译时不查询记忆，只用新译文覆盖记忆中的旧译文
+    - on_batch_translated: 每批（含重试批次）翻译完成后回调 {index: translation}，
+      可以是普通函数或协程函数，用于逐批保存译文
 
     返回: 包含翻译结果的分句列表，每个分句的translation字段会包含目标语言的翻译
     """
@@ -96,27 +129,90 @@ async def translate_segments_async(
     source_name = source_lang_display_name or lang_names.get(source_lang_code, "原文")  # 源语言名称
     target_name = target_lang_display_name or lang_names.get(target_lang_code, target_lang_code)  # 目标语言名称
 
-    # 按输出token分批（只对未翻译的分句）
-    batches = split_segments_by_output_tokens(untranslated_segments, max_tokens)
-    logging.info(f"分成 {len(batches)} 批进行翻译")
-
     all_translations: Dict[int, str] = {}
     failed_indices: List[int] = []
+    # 意译失败时退回直译的分句，不写入翻译记忆
+    fallback_indices: Set[int] = set()
+
+    # 查询翻译记忆，命中的分句不再送入LLM（强制重译时跳过，否则会原样取回旧译文）
+    memory_source_lang = source_lang_code or "auto"
+    segments_to_translate = untranslated_segments
+    if translation_memory is not None and not force_retranslate:
+        memory_hits = await translation_memory.lookup(
+            untranslated_segments, memory_source_lang, target_lang_code, settings.llm_model
+        )
+        if memory_hits:
+            all_translations.update(memory_hits)
+            segments_to_translate = [
+                seg for seg in untranslated_segments if seg.get("index", 0) not in memory_hits
+            ]
+        logging.info(
+            f"翻译记忆命中 {len(memory_hits)}/{len(untranslated_segments)} 个分句，"
+            f"累计统计: {translation_memory.get_stats()}"
+        )
 
-    # 第一阶段：主翻译循环
-    translator = TwoStepTranslator()
-
-    for batch_idx, batch in enumerate(batches):
-        logging.info(f"翻译第 {batch_idx + 1}/{len(batches)} 批（{len(batch)} 个分句）")
+    # 按输出token分批（只对未翻译的分句）
+    # 批次按需生成，每批大小依据已完成批次观测到的 token 比例和截断情况动态调整
+    batches = iter_adaptive_batches(
+        segments_to_translate, max_tokens, (source_name, target_name)
+    )
 
-        try:
-            # 使用两步翻译法
-            batch_translations = await translator.translate_batch(
-                batch, source_name, target_name, segments, max_tokens
-            )
+    # 第一阶段：主翻译循环（直译/意译两阶段流水线，每阶段并发数受限）
+    translator = TwoStepTranslator()
+    concurrency = max_concurrency or _resolve_translate_concurrency(max_tokens)
+    logging.info(f"翻译并发批次数: {concurrency}，待翻译 {len(segments_to_translate)} 个分句")
+    last_reported_count = -1
+
+    # 进度集合：已有翻译的分句 + 本次已完成（含流式逐句完成）的分句，只增不减
+    pending_indices = {seg.get("index", 0) for seg in segments_to_translate}
+    progress_indices = {
+        seg.get("index") for seg in segments if seg.get("translation")
+    } | set(all_translations)
+
+    async def report_progress():
+        """回调进度（只在数量增加时回调，保证单调）"""
+        nonlocal last_reported_count
+        if not progress_callback:
+            return
+        translated_count = len(progress_indices)
+        if translated_count > last_reported_count:
+            last_reported_count = translated_count
+            if asyncio.iscoroutinefunction(progress_callback):
+                await progress_callback(translated_count, len(segments))
+            else:
+                progress_callback(translated_count, len(segments))
 
-        except Exception as e:
-            logging.error(f"第 {batch_idx + 1} 批翻译失败: {e}")
+    async def notify_batch_translated(batch_translations: Dict[int, str]):
+        """把一批新完成的翻译交给调用方保存"""
+        if not on_batch_translated or not batch_translations:
+            return
+        result = on_batch_translated(batch_translations)
+        if asyncio.iscoroutine(result):
+            await result
+
+    # 翻译记忆命中的分句同样视为已完成的一批
+    if all_translations:
+        await notify_batch_translated(dict(all_translations))
+        await report_progress()
+
+    async def on_streamed_translation(index: int, translation: str):
+        """意译输出中每完成一句就上报进度"""
+        if index in pending_indices and index not in progress_indices:
+            progress_indices.add(index)
+            await report_progress()
+
+    # 按完成顺序处理结果；结果以 index 为键合并，最终按原顺序输出
+    async for batch_idx, batch, batch_translations, error in translator.translate_batches(
+        batches,
+        source_name,
+        target_name,
+        segments,
+        max_tokens,
+        concurrency,
+        on_streamed_translation if progress_callback else None,
+    ):
+        if error is not None:
+            logging.error(f"第 {batch_idx + 1} 批翻译失败: {error}")
             # 记录失败的索引，稍后处理
             for seg in batch:
                 failed_indices.append(seg.get("index", 0))
@@ -144,21 +240,10 @@ async def translate_segments_async(
                 failed_indices.append(index)
 
         all_translations.update(quality_checked)
-
-        # 回调进度
-        if progress_callback:
-            translated_count = sum(
-                1
-                for seg in segments
-                if seg.get("translation") or seg.get("index") in all_translations
-            )
-            if asyncio.iscoroutinefunction(progress_callback):
-                await progress_callback(translated_count, len(segments))
-            else:
-                progress_callback(translated_count, len(segments))
-
-        # 让出控制权，允许其他任务执行
-        await asyncio.sleep(0)
+        fallback_indices.update(getattr(batch_translations, "fallback_indices", ()))
+        progress_indices.update(quality_checked)
+        await notify_batch_translated(quality_checked)
+        await report_progress()
 
     # 第二阶段：重试失败的翻译（分组重试，每组最多 5 个句子）
     if failed_indices:
@@ -189,11 +274,15 @@ async def translate_segments_async(
                 )
 
                 # 统计重试成功的数量
-                success_count = 0
+                retry_success = {}
                 for idx in retry_indices:
                     if idx in retry_trans and idx not in all_translations:
                         all_translations[idx] = retry_trans[idx]
-                        success_count += 1
+                        retry_success[idx] = retry_trans[idx]
+                        if idx in getattr(retry_trans, "fallback_indices", ()):
+                            fallback_indices.add(idx)
+                success_count = len(retry_success)
+                await notify_batch_translated(retry_success)
 
                 if success_count > 0:
                     logging.info(f"重试成功: {success_count}/{len(retry_batch)} 个分句")
@@ -203,6 +292,23 @@ async def translate_segments_async(
             except Exception as e:
                 logging.error(f"重试批次失败 (indices: {retry_indices}): {e}")
 
+    # 回写本次新翻译的分句到翻译记忆
+    if translation_memory is not None:
+        new_translations = {
+            index: all_translations[index]
+            for index in (seg.get("index", 0) for seg in segments_to_translate)
+            if index in all_translations
+        }
+        stored = await translation_memory.store(
+            segments_to_translate,
+            new_translations,
+            memory_source_lang,
+            target_lang_code,
+            settings.llm_model,
+            skip_indices=fallback_indices,
+        )
+        logging.info(f"翻译记忆写入 {stored} 条")
+
     # 第三阶段：更新结果，保留原有翻译
     result = []
     for seg in segments:
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+翻译记忆模块：复用重复句子（片头、广告、口头禅等）的历史译文。
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from backend.db.translation_memory_crud import (
+    get_translation_memory,
+    save_translation_memory,
+)
+from backend.schemas import Segment
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_source_text(text: str) -> str:
+    """规范化原文：统一全半角、合并空白（大小写可能影响译法，予以保留）"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def make_source_hash(text: str) -> str:
+    """计算规范化原文的哈希，作为翻译记忆的键"""
+    return hashlib.sha256(normalize_source_text(text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    基于 Postgres 的翻译记忆。
+
+    以 (规范化原文, 源语言, 目标语言, 模型) 为键，翻译前批量查询，
+    翻译成功后回写。数据库不可用时只记录日志，不影响翻译流程。
+    """
+
+    def __init__(self, db_url: Optional[str] = None, min_length: int = 2):
+        """
+        参数:
+        - db_url: 数据库连接 URL，为空时使用环境变量
+        - min_length: 参与记忆的最短原文长度（规范化后字符数）
+        """
+        self.db_url = db_url
+        self.min_length = min_length
+        self._hits = 0
+        self._misses = 0
+        self._stored = 0
+
+    def _memory_keys(self, segments: List[Segment]) -> Dict[int, str]:
+        """为可参与记忆的分句计算 {index: source_hash}"""
+        keys = {}
+        for seg in segments:
+            sentence = seg.get("sentence") or ""
+            if len(normalize_source_text(sentence)) < self.min_length:
+                continue
+            keys[seg.get("index", 0)] = make_source_hash(sentence)
+        return keys
+
+    async def lookup(
+        self,
+        segments: List[Segment],
+        source_lang: str,
+        target_lang: str,
+        model: str,
+    ) -> Dict[int, str]:
+        """
+        查询分句的历史译文。
+
+        参数:
+        - segments: 待翻译的分句列表
+        - source_lang: 源语言代码
+        - target_lang: 目标语言代码
+        - model: 翻译所用的模型名称
+
+        返回: 命中的译文 {index: translation}
+        """
+        keys = self._memory_keys(segments)
+        if not keys:
+            return {}
+
+        try:
+            found = await asyncio.to_thread(
+                get_translation_memory,
+                self.db_url,
+                list(keys.values()),
+                source_lang,
+                target_lang,
+                model,
+            )
+        except Exception as e:
+            logging.warning(f"查询翻译记忆失败，跳过: {e}")
+            return {}
+
+        hits = {
+            index: found[source_hash]
+            for index, source_hash in keys.items()
+            if source_hash in found
+        }
+        self._hits += len(hits)
+        self._misses += len(keys) - len(hits)
+        return hits
+
+    async def store(
+        self,
+        segments: List[Segment],
+        translations: Dict[int, str],
+        source_lang: str,
+        target_lang: str,
+        model: str,
+        skip_indices: Iterable[int] = (),
+    ) -> int:
+        """
+        回写新翻译的分句。
+
+        参数:
+        - segments: 分句列表
+        - translations: 新的译文 {index: translation}
+        - source_lang: 源语言代码
+        - target_lang: 目标语言代码
+        - model: 翻译所用的模型名称
+        - skip_indices: 不写入记忆的分句（如意译失败时退回的直译结果）
+
+        返回: 写入的条目数
+        """
+        skip = set(skip_indices)
+        keys = self._memory_keys(
+            [
+                seg
+                for seg in segments
+                if seg.get("index", 0) in translations and seg.get("index", 0) not in skip
+            ]
+        )
+        sentences = {seg.get("index", 0): seg.get("sentence") or "" for seg in segments}
+        entries = [
+            (source_hash, sentences[index], translations[index])
+            for index, source_hash in keys.items()
+        ]
+        if not entries:
+            return 0
+
+        try:
+            stored = await asyncio.to_thread(
+                save_translation_memory,
+                self.db_url,
+                entries,
+                source_lang,
+                target_lang,
+                model,
+            )
+        except Exception as e:
+            logging.warning(f"写入翻译记忆失败: {e}")
+            return 0
+
+        self._stored += stored
+        return stored
+
+    def get_stats(self) -> Dict[str, object]:
+        """获取翻译记忆统计信息（自创建以来累计）"""
+        total_lookups = self._hits + self._misses
+        hit_rate = self._hits / total_lookups if total_lookups > 0 else 0
+
+        return {
+            "memory_hits": self._hits,
+            "memory_misses": self._misses,
+            "hit_rate": f"{hit_rate:.2%}",
+            "stored": self._stored,
+        }
@@ -4,7 +4,7 @@ JSON 解析模块：从 LLM 响应中提取翻译结果。
 """
 import json
 import logging
-from typing import Dict
+from typing import Dict, List
 
 
 def extract_translations(response_text: str) -> Dict[int, str]:
@@ -70,3 +70,77 @@ def extract_translations(response_text: str) -> Dict[int, str]:
         logging.warning(f"翻译结果解析失败: {e}，原始响应: {response_text[:300]}")
 
     return translations
+
+
+class StreamingTranslationParser:
+    """
+    增量 JSON 解析器：在流式输出过程中逐个提取 {index, translation} 对象。
+
+    不依赖外层数组是否完整，每个对象一旦闭合就立即解析，
+    因此输出在 max_tokens 处被截断时，已完成的句子仍然可以保留。
+    """
+
+    def __init__(self):
+        self.translations: Dict[int, str] = {}
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> Dict[int, str]:
+        """
+        输入一段流式文本。
+
+        参数:
+        - text: 新收到的文本片段
+
+        返回: 本次新解析出的翻译 {index: translation}
+        """
+        new_translations = {}
+        for ch in text:
+            if self._depth == 0:
+                # 对象之外的内容（代码块标记、数组括号、说明文字）直接跳过
+                if ch == "{":
+                    self._buffer = [ch]
+                    self._depth = 1
+                    self._in_string = False
+                    self._escape = False
+                continue
+
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    item = self._parse_object("".join(self._buffer))
+                    if item is not None:
+                        index, translation = item
+                        self.translations[index] = translation
+                        new_translations[index] = translation
+                    self._buffer = []
+
+        return new_translations
+
+    @staticmethod
+    def _parse_object(text: str):
+        """解析单个 JSON 对象，不是有效的翻译条目时返回 None"""
+        try:
+            item = json.loads(text)
+        except (json.JSONDecodeError, ValueError):
+            return None
+
+        if isinstance(item, dict) and "index" in item and "translation" in item:
+            trans = item["translation"]
+            if isinstance(trans, str) and trans.strip():
+                return item["index"], trans.strip()
+        return None
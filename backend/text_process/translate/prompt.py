@@ -2,20 +2,116 @@
 """
 提示词生成模块：为两步翻译法构建高质量的提示词。
 """
+import re
+from collections import Counter
 from typing import Dict, List, Optional
 
 from backend.schemas import Segment
 
+# 缩写（AI、GPT4）、驼峰名称（OpenAI）和连续的首字母大写词组（New York）视为术语候选
+_GLOSSARY_PATTERN = re.compile(
+    r"\b[A-Z]{2,}[A-Za-z0-9]*\b"
+    r"|\b[A-Z][a-z]+[A-Z][A-Za-z0-9]*\b"
+    r"|\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b"
+)
+
+
+def extract_glossary_terms(
+    all_segments: List[Segment], max_terms: int = 30, min_count: int = 2
+) -> List[str]:
+    """
+    从完整分句中提取反复出现的术语，用于保持各批次译法一致。
+
+    参数:
+    - all_segments: 完整分句列表
+    - max_terms: 最多返回的术语数
+    - min_count: 术语最少出现次数
+
+    返回: 按出现次数降序排列的术语列表
+    """
+    if max_terms <= 0:
+        return []
+
+    counter = Counter()
+    for seg in all_segments:
+        counter.update(_GLOSSARY_PATTERN.findall(seg.get("sentence") or ""))
+
+    return [
+        term for term, count in counter.most_common(max_terms) if count >= min_count
+    ]
+
+
+def build_context_section(
+    segments: List[Segment],
+    all_segments: Optional[List[Segment]],
+    context_window: int = 2,
+    glossary: Optional[List[str]] = None,
+    positions: Optional[Dict[int, int]] = None,
+) -> str:
+    """
+    构建有界的上下文片段：只包含本批前后各 context_window 个相邻句子的原文和术语表，
+    提示词长度不随转录总长度增长。只使用原文，不依赖其他批次的译文，
+    并发翻译时结果与批次完成顺序无关。
+
+    参数:
+    - segments: 当前批次分句
+    - all_segments: 完整分句列表
+    - context_window: 前后各附带的相邻句子数
+    - glossary: 术语列表
+    - positions: index 到 all_segments 下标的映射，为空时现场计算
+
+    返回: 上下文文本，没有可用上下文时返回空字符串
+    """
+    parts = []
+
+    if glossary:
+        parts.append("术语表（全文保持统一译法）：" + ", ".join(glossary))
+
+    if all_segments and segments and context_window > 0:
+        if positions is None:
+            positions = {
+                seg.get("index", 0): pos for pos, seg in enumerate(all_segments)
+            }
+        batch_positions = [
+            positions[seg.get("index", 0)]
+            for seg in segments
+            if seg.get("index", 0) in positions
+        ]
+        if batch_positions:
+            first, last = min(batch_positions), max(batch_positions)
+
+            before_lines = [
+                f"{seg.get('index', 0)}: {(seg.get('sentence') or '').strip()}"
+                for seg in all_segments[max(0, first - context_window) : first]
+            ]
+
+            after_lines = [
+                f"{seg.get('index', 0)}: {(seg.get('sentence') or '').strip()}"
+                for seg in all_segments[last + 1 : last + 1 + context_window]
+            ]
+
+            if before_lines:
+                parts.append("上文：\n" + "\n".join(before_lines))
+            if after_lines:
+                parts.append("下文：\n" + "\n".join(after_lines))
+
+    if not parts:
+        return ""
+    return "上下文（仅供参考，不需要翻译）：\n" + "\n\n".join(parts) + "\n\n"
+
 
 def build_literal_translate_prompt(
     segments: List[Segment],
     source_lang: str,
     target_lang: str,
     all_segments: Optional[List[Segment]] = None,
+    context: str = "",
 ) -> str:
     """
     构建直译提示词：强调准确传达信息，不遗漏。
     针对双语翻译优化。
+
+    context 为 build_context_section 生成的有界上下文，all_segments 仅为兼容保留。
     """
     header = f"""你是一位专业翻译，擅长中英文互译。我希望你能帮我将以下{source_lang}段落直译成{target_lang}。
 
@@ -25,7 +121,7 @@ def build_literal_translate_prompt(
 - 根据内容直译，保持原文结构和逻辑
 - 这是直译步骤，重点是信息完整性
 
-英文原文：
+{context}英文原文：
 """
 
     # 添加原文句子
@@ -56,10 +152,13 @@ def build_meaning_translate_prompt(
     source_lang: str,
     target_lang: str,
     all_segments: Optional[List[Segment]] = None,
+    context: str = "",
 ) -> str:
     """
     构建意译提示词：基于直译结果优化表达，使其更自然。
     针对双语翻译优化。
+
+    context 为 build_context_section 生成的有界上下文，all_segments 仅为兼容保留。
     """
     header = f"""你是一位专业中英文翻译，擅长对翻译结果进行二次修改和润色。我希望你能帮我将以下{source_lang}的{target_lang}直译结果重新意译和润色。
 
@@ -70,7 +169,7 @@ def build_meaning_translate_prompt(
 - 注意专业术语的准确性
 - 这是意译步骤，重点是自然流畅的表达
 
-英文原文：
+{context}英文原文：
 """
 
     # 添加原文句子
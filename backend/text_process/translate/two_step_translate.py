@@ -4,7 +4,7 @@
 """
 import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
 
 from backend.startup import get_llm_router
 
@@ -22,17 +22,82 @@ except ImportError:
     from backend.config import settings
     from backend.schemas import Segment
 
-from .parser import extract_translations
-from .prompt import build_literal_translate_prompt, build_meaning_translate_prompt
+from backend.utils.token_utils.calculate_tokens import count_segment_tokens
+from .batch import batch_size_estimator, count_text_tokens
+from .parser import StreamingTranslationParser, extract_translations
+from .prompt import (
+    build_context_section,
+    build_literal_translate_prompt,
+    build_meaning_translate_prompt,
+    extract_glossary_terms,
+)
+
+
+class BatchTranslations(dict):
+    """
+    一批译文 {index: translation}。
+
+    意译失败时退回直译结果，这些分句记录在 fallback_indices 中，
+    不作为最终译文写入翻译记忆，下次翻译时仍会重新翻译。
+    """
+
+    def __init__(self, translations: Optional[Dict[int, str]] = None, fallback_indices=()):
+        super().__init__(translations or {})
+        self.fallback_indices = set(fallback_indices)
 
 
 class TwoStepTranslator:
     """
     两步翻译器：先直译，再意译。
+
+    可以按配置为每批提示词附带前后相邻句子的原文和术语表作为上下文（默认不附带），
+    术语表按转录只提取一次。
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        context_window: Optional[int] = None,
+        glossary_size: Optional[int] = None,
+    ):
+        """
+        参数:
+        - context_window: 前后各附带的相邻句子数，为空时使用配置 translate_context_window
+        - glossary_size: 术语表最大术语数，为空时使用配置 translate_glossary_size
+        """
         self.router = get_llm_router()
+        self.context_window = (
+            settings.translate_context_window if context_window is None else context_window
+        )
+        self.glossary_size = (
+            settings.translate_glossary_size if glossary_size is None else glossary_size
+        )
+
+        # 按完整分句列表缓存的上下文数据
+        self._context_source: Optional[List[Segment]] = None
+        self._positions: Dict[int, int] = {}
+        self._glossary: List[str] = []
+
+    def _build_context(
+        self, segments: List[Segment], all_segments: Optional[List[Segment]]
+    ) -> str:
+        """为当前批次构建有界上下文，首次遇到新的完整分句列表时提取术语表"""
+        if not all_segments or (self.context_window <= 0 and self.glossary_size <= 0):
+            return ""
+
+        if all_segments is not self._context_source:
+            self._context_source = all_segments
+            self._positions = {
+                seg.get("index", 0): pos for pos, seg in enumerate(all_segments)
+            }
+            self._glossary = extract_glossary_terms(all_segments, self.glossary_size)
+
+        return build_context_section(
+            segments,
+            all_segments,
+            self.context_window,
+            self._glossary,
+            self._positions,
+        )
 
     async def translate_batch(
         self,
@@ -70,6 +135,154 @@ class TwoStepTranslator:
 
         return final_translations
 
+    async def translate_batches(
+        self,
+        batches: Iterable[List[Segment]],
+        source_lang: str,
+        target_lang: str,
+        all_segments: Optional[List[Segment]] = None,
+        max_tokens: int = 4096,
+        concurrency: int = 1,
+        on_translation: Optional[Callable[[int, str], None]] = None,
+    ) -> AsyncIterator[Tuple[int, List[Segment], Optional[Dict[int, str]], Optional[Exception]]]:
+        """
+        以两阶段流水线翻译多个批次：直译和意译各有一组工作协程，
+        中间通过队列衔接，后一批的直译与前一批的意译可以同时进行。
+
+        参数:
+        - batches: 批次序列，可以是按需生成批次的迭代器
+        - source_lang: 源语言名称
+        - target_lang: 目标语言名称
+        - all_segments: 完整分句列表（上下文）
+        - max_tokens: 最大token数
+        - concurrency: 每个阶段的工作协程数
+        - on_translation: 意译输出中每完成一句就回调一次 (index, translation)，用于逐句上报进度
+
+        返回: 异步迭代器，按完成顺序产出 (批次序号, 批次, {index: final_translation}, 异常)
+        """
+        concurrency = max(1, concurrency)
+        batch_iter = iter(enumerate(batches))
+        # 阶段间队列设置上限，直译不会领先意译太多
+        literal_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        result_queue: asyncio.Queue = asyncio.Queue()
+
+        async def literal_worker():
+            # 多个工作协程共享同一个迭代器，next() 是同步调用，不会重复领取
+            for batch_idx, batch in batch_iter:
+                try:
+                    literal = await self._literal_translate(
+                        batch, source_lang, target_lang, all_segments, max_tokens
+                    )
+                except Exception as e:
+                    await result_queue.put((batch_idx, batch, None, e))
+                    continue
+
+                if not literal:
+                    logging.warning(f"第 {batch_idx + 1} 批直译失败，返回空结果")
+                    await result_queue.put((batch_idx, batch, {}, None))
+                    continue
+                await literal_queue.put((batch_idx, batch, literal))
+
+        async def meaning_worker():
+            while True:
+                item = await literal_queue.get()
+                if item is None:
+                    return
+                batch_idx, batch, literal = item
+                try:
+                    translations = await self._meaning_translate(
+                        batch,
+                        literal,
+                        source_lang,
+                        target_lang,
+                        all_segments,
+                        max_tokens,
+                        on_translation,
+                    )
+                    await result_queue.put((batch_idx, batch, translations, None))
+                except Exception as e:
+                    await result_queue.put((batch_idx, batch, None, e))
+
+        async def run_pipeline():
+            meaning_tasks = [
+                asyncio.create_task(meaning_worker()) for _ in range(concurrency)
+            ]
+            try:
+                await asyncio.gather(*(literal_worker() for _ in range(concurrency)))
+                # 直译全部完成后通知意译工作协程退出
+                for _ in meaning_tasks:
+                    await literal_queue.put(None)
+                await asyncio.gather(*meaning_tasks)
+            finally:
+                for task in meaning_tasks:
+                    task.cancel()
+                await result_queue.put(None)
+
+        pipeline_task = asyncio.create_task(run_pipeline())
+        try:
+            while True:
+                item = await result_queue.get()
+                if item is None:
+                    break
+                yield item
+            # 传播流水线内部的意外异常
+            await pipeline_task
+        finally:
+            if not pipeline_task.done():
+                pipeline_task.cancel()
+
+    async def _stream_translations(
+        self,
+        segments: List[Segment],
+        lang_pair: Tuple[str, str],
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        parser: StreamingTranslationParser,
+        on_translation: Optional[Callable[[int, str], None]] = None,
+    ) -> str:
+        """
+        流式调用 LLM，边接收边用增量解析器提取已完成的句子。
+        on_translation 可以是普通函数或协程函数。
+
+        调用中途出错时异常照常抛出，已解析的句子保留在 parser.translations 中。
+        输出完成后把实际 token 数（或截断情况）反馈给批次大小估算器。
+
+        返回: 完整的响应文本
+        """
+        response = await self.router.acompletion(
+            model=settings.llm_model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            timeout=120,
+            stream=True,
+            temperature=temperature,
+        )
+
+        response_text = ""
+        finish_reason = None
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].finish_reason:
+                finish_reason = chunk.choices[0].finish_reason
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                content = chunk.choices[0].delta.content
+                response_text += content
+                new_translations = parser.feed(content)
+                if on_translation:
+                    for index, translation in new_translations.items():
+                        result = on_translation(index, translation)
+                        if asyncio.iscoroutine(result):
+                            await result
+
+        if finish_reason == "length":
+            batch_size_estimator.record_truncation(lang_pair)
+        else:
+            input_tokens = sum(count_segment_tokens(segments))
+            batch_size_estimator.record_batch(
+                lang_pair, input_tokens, count_text_tokens(response_text), len(segments)
+            )
+        return response_text
+
     async def _literal_translate(
         self,
         segments: List[Segment],
@@ -81,30 +294,26 @@ class TwoStepTranslator:
         """
         执行直译步骤。
         """
-        prompt = build_literal_translate_prompt(segments, source_lang, target_lang, all_segments)
+        context = self._build_context(segments, all_segments)
+        prompt = build_literal_translate_prompt(
+            segments, source_lang, target_lang, all_segments, context
+        )
 
+        parser = StreamingTranslationParser()
         try:
-            response = await self.router.acompletion(
-                model=settings.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                timeout=120,
-                stream=True,
-                temperature=0.3,  # 直译使用较低温度确保准确性
+            # 直译使用较低温度确保准确性
+            response_text = await self._stream_translations(
+                segments, (source_lang, target_lang), prompt, max_tokens, 0.3, parser
             )
 
-            response_text = ""
-            async for chunk in response:
-                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                    response_text += chunk.choices[0].delta.content
-
             logging.info(f"直译完成，解析结果")
-            translations = extract_translations(response_text)
+            # 完整解析失败（如输出被截断）时保留增量解析出的句子
+            translations = {**parser.translations, **extract_translations(response_text)}
             return translations
 
         except Exception as e:
-            logging.error(f"直译失败: {e}")
-            return {}
+            logging.error(f"直译失败，保留已完成的 {len(parser.translations)} 句: {e}")
+            return dict(parser.translations)
 
     async def _meaning_translate(
         self,
@@ -114,34 +323,38 @@ class TwoStepTranslator:
         target_lang: str,
         all_segments: Optional[List[Segment]] = None,
         max_tokens: int = 4096,
+        on_translation: Optional[Callable[[int, str], None]] = None,
     ) -> Dict[int, str]:
         """
         执行意译步骤，基于直译结果优化表达。
         """
+        context = self._build_context(segments, all_segments)
         prompt = build_meaning_translate_prompt(
-            segments, literal_translations, source_lang, target_lang, all_segments
+            segments, literal_translations, source_lang, target_lang, all_segments, context
         )
 
+        parser = StreamingTranslationParser()
         try:
-            response = await self.router.acompletion(
-                model=settings.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                timeout=120,
-                stream=True,
-                temperature=0.6,  # 意译使用适中温度提升自然度
+            # 意译使用适中温度提升自然度
+            response_text = await self._stream_translations(
+                segments,
+                (source_lang, target_lang),
+                prompt,
+                max_tokens,
+                0.6,
+                parser,
+                on_translation,
             )
 
-            response_text = ""
-            async for chunk in response:
-                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                    response_text += chunk.choices[0].delta.content
-
             logging.info(f"意译完成，解析结果")
-            translations = extract_translations(response_text)
+            # 完整解析失败（如输出被截断）时保留增量解析出的句子
+            translations = {**parser.translations, **extract_translations(response_text)}
             return translations
 
         except Exception as e:
             logging.error(f"意译失败，使用直译结果: {e}")
-            # 意译失败时返回直译结果
-            return literal_translations
\ No newline at end of file
+            # 意译失败时返回直译结果，已完成意译的句子优先
+            return BatchTranslations(
+                {**literal_translations, **parser.translations},
+                fallback_indices=set(literal_translations) - set(parser.translations),
+            )
\ No newline at end of file
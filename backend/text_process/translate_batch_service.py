@@ -8,7 +8,7 @@ from __future__ import annotations
 from typing import List
 
 from backend.schemas import Segment
-from backend.utils.token_utils.calculate_tokens import OpenAITokenCalculator
+from backend.utils.token_utils.calculate_tokens import SegmentTokenIndex
 
 
 def _split_segments_by_output_tokens(
@@ -30,45 +30,22 @@ def _split_segments_by_output_tokens(
     # 目标：每批约 10 句
     target_batch_size = 10
 
-    # 先按数量分批，然后检查 token 限制
-    batches = []
-    for i in range(0, len(segments), target_batch_size):
-        batch = segments[i : i + target_batch_size]
-        batches.append(batch)
+    # 分句 token 数的前缀和（优先使用分句上保存的 token_count）
+    token_index = SegmentTokenIndex(segments)
 
-    # 如果某个批次过大（token 超限），则进一步拆分
-    calculator = OpenAITokenCalculator()
-    final_batches = []
-
-    for batch in batches:
-        # 估算这个批次的总 token 数
-        total_tokens = 0
-        for seg in batch:
-            sentence = seg.get("sentence", "")
-            estimated_tokens = int(calculator.count_tokens(sentence) * 1.5) + 20
-            total_tokens += estimated_tokens
-
-        # 如果在 token 限制内，直接使用
-        if total_tokens <= max_tokens:
-            final_batches.append(batch)
-        else:
-            # 否则进一步拆分为更小的批次
-            current_sub_batch = []
-            current_tokens = 0
+    def fits(start: int, end: int) -> bool:
+        # 估算译文 token 数：原文的 1.5 倍，每句另加 20
+        estimated_tokens = int(token_index.range_tokens(start, end) * 1.5) + 20 * (end - start)
+        return estimated_tokens <= max_tokens
 
-            for seg in batch:
-                sentence = seg.get("sentence", "")
-                estimated_tokens = int(calculator.count_tokens(sentence) * 1.5) + 20
-
-                if current_tokens + estimated_tokens > max_tokens and current_sub_batch:
-                    final_batches.append(current_sub_batch)
-                    current_sub_batch = [seg]
-                    current_tokens = estimated_tokens
-                else:
-                    current_sub_batch.append(seg)
-                    current_tokens += estimated_tokens
-
-            if current_sub_batch:
-                final_batches.append(current_sub_batch)
+    # 先按数量分批，某个批次 token 超限时再在批次内拆分
+    final_batches = []
+    for batch_start in range(0, len(segments), target_batch_size):
+        batch_end = min(batch_start + target_batch_size, len(segments))
+        start = batch_start
+        while start < batch_end:
+            end = token_index.find_range_end(start, batch_end, fits)
+            final_batches.append(segments[start:end])
+            start = end
 
     return final_batches
\ No newline at end of file
@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
-from typing import Dict, List
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional
+
+# 分句上缓存 token 数的字段名（按默认 tokenizer 计算）
+SEGMENT_TOKEN_COUNT_KEY = "token_count"
+# 批量编码时使用的线程数
+DEFAULT_ENCODE_THREADS = 8
 
 
 class TokenCalculator(ABC):
@@ -13,6 +18,18 @@ class TokenCalculator(ABC):
         计算并返回给定文本的token数量
         """
         pass
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        """
+        批量计算多段文本的token数量，子类可覆盖为真正的批量实现
+        """
+        return [self.count_tokens(text) for text in texts]
+
+    def token_offsets(self, text: str) -> Optional[List[int]]:
+        """
+        返回每个token在文本中的起始字符位置（升序），不支持时返回None
+        """
+        return None
     
     def calculate_messages_tokens(self, messages: List[Dict[str, str]]) -> int:
         """
@@ -22,6 +39,7 @@ class TokenCalculator(ABC):
 
 
 _global_tokenizers = {}
+_global_encodings = {}
 
 class TransformerTokenCalculator(TokenCalculator):
     """
@@ -45,25 +63,164 @@ class TransformerTokenCalculator(TokenCalculator):
         # tokenizer返回字典，其中input_ids是token id列表
         return len(tokens.get('input_ids', []))
 
+    def count_many(self, texts: List[str]) -> List[int]:
+        # 快速分词器对列表输入会在 Rust 侧批量处理
+        if not texts:
+            return []
+        tokens = self.tokenizer(list(texts), return_tensors=None)
+        return [len(ids) for ids in tokens.get('input_ids', [])]
+
+    def token_offsets(self, text: str) -> Optional[List[int]]:
+        # 快速分词器可直接返回每个token对应的字符区间；
+        # 慢速分词器不支持 return_offsets_mapping，返回None由调用方回退为二分查找
+        if not getattr(self.tokenizer, "is_fast", False):
+            return None
+        tokens = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return [start for start, _ in tokens.get('offset_mapping', [])]
+
 
 class OpenAITokenCalculator(TokenCalculator):
     """
     基于OpenAI tiktoken的token计算器，默认使用gpt-3.5-turbo编码
     """
     def __init__(self, model_name: str = "gpt-3.5-turbo"):
-        import tiktoken
+        global _global_encodings
         self.model_name = model_name
-        try:
-            # 尝试获取模型专用的编码器
-            self.encoding = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            # 回退到通用编码
-            self.encoding = tiktoken.get_encoding("cl100k_base")
+        if model_name not in _global_encodings:
+            import tiktoken
+            try:
+                # 尝试获取模型专用的编码器
+                _global_encodings[model_name] = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                # 回退到通用编码
+                _global_encodings[model_name] = tiktoken.get_encoding("cl100k_base")
+        self.encoding = _global_encodings[model_name]
 
     def count_tokens(self, text: str) -> int:
         # 对文本进行编码并返回token数量
         return len(self.encoding.encode(text))
 
+    def count_many(self, texts: List[str], num_threads: int = DEFAULT_ENCODE_THREADS) -> List[int]:
+        # tiktoken 的 encode_batch 在线程池中并行编码（编码过程释放 GIL）
+        if not texts:
+            return []
+        encoded = self.encoding.encode_batch(list(texts), num_threads=num_threads)
+        return [len(tokens) for tokens in encoded]
+
+    def token_offsets(self, text: str) -> Optional[List[int]]:
+        # 一次编码即可得到全部token的起始字符位置
+        _, offsets = self.encoding.decode_with_offsets(self.encoding.encode(text))
+        return offsets
+
+
+_global_calculators: Dict[str, OpenAITokenCalculator] = {}
+
+
+def get_token_calculator(model_name: str = "gpt-3.5-turbo") -> OpenAITokenCalculator:
+    """
+    获取共享的token计算器，同一模型只加载一次编码器
+
+    Args:
+        model_name: tiktoken 模型名称
+
+    Returns:
+        token计算器实例
+    """
+    if model_name not in _global_calculators:
+        _global_calculators[model_name] = OpenAITokenCalculator(model_name)
+    return _global_calculators[model_name]
+
+
+def count_segment_tokens(segments: List[Dict[str, any]]) -> List[int]:
+    """
+    计算每个句子片段的token数，结果缓存在片段的 token_count 字段上
+
+    已有缓存的片段直接复用，其余片段一次批量编码。
+
+    Args:
+        segments: 句子片段列表，每个片段应包含'sentence'字段
+
+    Returns:
+        与 segments 一一对应的token数列表
+    """
+    missing = [s for s in segments if s.get(SEGMENT_TOKEN_COUNT_KEY) is None]
+    if missing:
+        counts = get_token_calculator().count_many([s.get("sentence", "") for s in missing])
+        for seg, count in zip(missing, counts):
+            seg[SEGMENT_TOKEN_COUNT_KEY] = count
+    return [s[SEGMENT_TOKEN_COUNT_KEY] for s in segments]
+
+
+def strip_segment_token_counts(segments: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    """
+    去掉外部传入的片段上的 token_count 字段
+
+    token_count 只信任 ASR 阶段写入数据库的值；通过 HTTP 传入的片段
+    需要先去掉该字段，由 count_segment_tokens 重新计算，避免请求方篡改分批预算。
+
+    Args:
+        segments: 外部传入的句子片段列表
+
+    Returns:
+        不含 token_count 字段的片段副本列表
+    """
+    return [
+        {key: value for key, value in seg.items() if key != SEGMENT_TOKEN_COUNT_KEY}
+        if isinstance(seg, dict)
+        else seg
+        for seg in segments
+    ]
+
+
+class SegmentTokenIndex:
+    """
+    分句 token 数的前缀和，O(1) 查询任意连续区间的 token 总数
+
+    分句上已保存 token_count（ASR 后处理时写入）时不再重新分词。
+    """
+
+    def __init__(self, segments: List[Dict[str, any]]):
+        """
+        Args:
+            segments: 句子片段列表
+        """
+        self.prefix_sums = list(accumulate(count_segment_tokens(segments), initial=0))
+
+    def __len__(self) -> int:
+        return len(self.prefix_sums) - 1
+
+    def range_tokens(self, start: int, end: int) -> int:
+        """返回分句 [start, end) 的 token 总数"""
+        return self.prefix_sums[end] - self.prefix_sums[start]
+
+    def total_tokens(self) -> int:
+        """返回全部分句的 token 总数"""
+        return self.prefix_sums[-1]
+
+    def find_range_end(self, start: int, max_end: int, fits: Callable[[int, int], bool]) -> int:
+        """
+        二分查找以 start 开头、满足 fits(start, end) 的最大 end
+
+        fits 需要随 end 单调（区间越长越难满足），区间至少包含一个分句，
+        即使单个分句已不满足 fits。
+
+        Args:
+            start: 区间起点（包含）
+            max_end: end 的上限（不包含的区间终点）
+            fits: 判断区间 [start, end) 是否满足约束
+
+        Returns:
+            区间终点（不包含）
+        """
+        low, high = start + 1, max_end
+        while low < high:
+            mid = (low + high + 1) // 2
+            if fits(start, mid):
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
 
 def count_segments_tokens(segments: List[Dict[str, any]]) -> int:
     """
@@ -75,10 +232,8 @@ def count_segments_tokens(segments: List[Dict[str, any]]) -> int:
     Returns:
         总token数
     """
-    calculator = OpenAITokenCalculator()
-    # 仅统计句子文本，避免引入其他结构性字符的误差
-    text = "\n".join(s.get("sentence", "") for s in segments)
-    return calculator.count_tokens(text)
+    # 仅统计句子文本，句子之间按换行分隔计入一个token
+    return sum(count_segment_tokens(segments)) + max(len(segments) - 1, 0)
 # 测试下moonshotai/Kimi-K2-Instruct
 if __name__ == "__main__":
     calculator = TransformerTokenCalculator(model_name="deepseek-ai/DeepSeek-V3-0324")
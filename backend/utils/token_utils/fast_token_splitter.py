@@ -3,6 +3,8 @@
 优化了token计算和字符串操作的性能
 """
 import re
+from bisect import bisect_left
+from collections import OrderedDict
 from typing import List, Optional, Tuple
 from .calculate_tokens import TokenCalculator, OpenAITokenCalculator
 
@@ -10,10 +12,10 @@ from .calculate_tokens import TokenCalculator, OpenAITokenCalculator
 class FastTokenSplitter:
     """
     高性能的Token分块器，优化了以下方面：
-    1. 减少token计算次数
-    2. 优化字符串操作
-    3. 使用二分查找确定分块边界
-    4. 缓存token计算结果
+    1. 整个文本只分词一次，按token起始字符位置直接确定分块边界（线性时间）
+    2. 在分块上限之前反向查找分隔符，不再对前缀重复分词
+    3. 计算器不支持token位置时，回退为二分查找确定分块边界
+    4. 使用LRU缓存token计算结果
     """
     
     def __init__(
@@ -21,11 +23,13 @@ class FastTokenSplitter:
         token_calculator: TokenCalculator,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
-        separators: Optional[List[str]] = None
+        separators: Optional[List[str]] = None,
+        cache_size: int = 10000
     ):
         self.token_calculator = token_calculator
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.cache_size = cache_size
         
         # 优化的分隔符列表，按优先级排序
         self.separators = separators or [
@@ -37,28 +41,25 @@ class FastTokenSplitter:
             " ",  # 词分隔
         ]
         
-        # Token计算缓存
-        self._token_cache = {}
+        # Token计算缓存（LRU）
+        self._token_cache: OrderedDict = OrderedDict()
         self._cache_hits = 0
         self._cache_misses = 0
     
     def _get_token_count_cached(self, text: str) -> int:
-        """带缓存的token计算"""
+        """带LRU缓存的token计算"""
         if text in self._token_cache:
             self._cache_hits += 1
+            self._token_cache.move_to_end(text)
             return self._token_cache[text]
         
         self._cache_misses += 1
         count = self.token_calculator.count_tokens(text)
         
-        # 限制缓存大小，避免内存泄漏
-        if len(self._token_cache) > 10000:
-            # 清理一半的缓存
-            keys_to_remove = list(self._token_cache.keys())[:5000]
-            for key in keys_to_remove:
-                del self._token_cache[key]
-        
+        # 限制缓存大小，淘汰最久未使用的条目
         self._token_cache[text] = count
+        if len(self._token_cache) > self.cache_size:
+            self._token_cache.popitem(last=False)
         return count
     
     def _find_best_split_point(self, text: str, max_chars: int) -> int:
@@ -86,9 +87,65 @@ class FastTokenSplitter:
         
         return best_pos
     
-    def _find_separator_near_position(self, text: str, target_pos: int, search_range: int = 200) -> int:
+    def _find_separator_before(self, text: str, start: int, limit: int) -> int:
+        """
+        在 (start, limit] 的末尾一段内反向查找优先级最高的分隔符，
+        返回分隔符之后的位置；找不到时返回 limit
+        """
+        search_range = min(200, max((limit - start) // 4, 1))
+        search_start = max(start + 1, limit - search_range)
+        
+        for separator in self.separators:
+            pos = text.rfind(separator, search_start, limit)
+            if pos != -1:
+                return pos + len(separator)
+        
+        return limit
+    
+    def _shrink_to_fit(self, text: str, start: int, end: int, offsets: List[int]) -> int:
+        """
+        单独分词时边界处的token可能与整体分词略有不同，
+        校验分块的token数，超出时按超出的token数回退到更早的token边界
         """
-        在目标位置附近寻找最佳的分隔符位置
+        count = self._get_token_count_cached(text[start:end])
+        while count > self.chunk_size and end > start + 1:
+            end_token = bisect_left(offsets, end)
+            new_end = offsets[max(end_token - (count - self.chunk_size), 0)]
+            end = new_end if new_end > start else start + 1
+            count = self._get_token_count_cached(text[start:end])
+        return end
+    
+    def _split_with_offsets(self, text: str, offsets: List[int]) -> List[str]:
+        """
+        基于整体分词得到的token起始位置分块：
+        每个分块的上限直接取第 chunk_size 个token的起始位置，再在上限之前找分隔符
+        """
+        chunks = []
+        current_pos = 0
+        text_len = len(text)
+        
+        while current_pos < text_len:
+            limit_token = bisect_left(offsets, current_pos) + self.chunk_size
+            if limit_token >= len(offsets):
+                absolute_end = text_len
+            else:
+                absolute_end = self._find_separator_before(text, current_pos, offsets[limit_token])
+            absolute_end = self._shrink_to_fit(text, current_pos, absolute_end, offsets)
+            
+            # 提取chunk
+            chunk = text[current_pos:absolute_end].strip()
+            if chunk:
+                chunks.append(chunk)
+            
+            current_pos = max(absolute_end, current_pos + 1)
+        
+        return chunks
+    
+    def _find_separator_near_position(
+        self, text: str, target_pos: int, search_range: int = 200, chunk_start: int = 0
+    ) -> int:
+        """
+        在目标位置附近寻找最佳的分隔符位置（计算器不支持token位置时使用）
         """
         # 搜索范围：target_pos前后search_range个字符
         start_search = max(0, target_pos - search_range)
@@ -106,7 +163,7 @@ class FastTokenSplitter:
                 # 优先选择更接近目标位置且优先级更高的分隔符
                 if priority < best_priority or (priority == best_priority and abs(abs_pos - target_pos) < abs(best_pos - target_pos)):
                     # 确保分割后的chunk不超过token限制
-                    if self._get_token_count_cached(text[:abs_pos]) <= self.chunk_size:
+                    if self._get_token_count_cached(text[chunk_start:abs_pos]) <= self.chunk_size:
                         best_pos = abs_pos
                         best_priority = priority
         
@@ -123,6 +180,22 @@ class FastTokenSplitter:
         if self._get_token_count_cached(text) <= self.chunk_size:
             return [text]
         
+        offsets = self.token_calculator.token_offsets(text)
+        if offsets:
+            chunks = self._split_with_offsets(text, offsets)
+        else:
+            chunks = self._split_with_binary_search(text)
+        
+        # 添加重叠（如果需要）
+        if self.chunk_overlap > 0 and len(chunks) > 1:
+            chunks = self._add_overlap_optimized(chunks)
+        
+        return chunks
+    
+    def _split_with_binary_search(self, text: str) -> List[str]:
+        """
+        二分查找确定分块边界（计算器不支持token位置时使用）
+        """
         chunks = []
         current_pos = 0
         text_len = len(text)
@@ -147,7 +220,8 @@ class FastTokenSplitter:
             # 如果不是最后一个chunk，尝试在分隔符处分割
             if absolute_end < text_len:
                 better_end = self._find_separator_near_position(
-                    text, absolute_end, search_range=min(200, estimated_chars_per_chunk // 4)
+                    text, absolute_end, search_range=min(200, estimated_chars_per_chunk // 4),
+                    chunk_start=current_pos
                 )
                 if better_end > current_pos:  # 确保有进展
                     absolute_end = better_end
@@ -163,10 +237,6 @@ class FastTokenSplitter:
             else:
                 current_pos = absolute_end
         
-        # 添加重叠（如果需要）
-        if self.chunk_overlap > 0 and len(chunks) > 1:
-            chunks = self._add_overlap_optimized(chunks)
-        
         return chunks
     
     def _add_overlap_optimized(self, chunks: List[str]) -> List[str]: